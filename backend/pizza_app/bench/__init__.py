@@ -0,0 +1,7 @@
+"""
+Load tests and benchmarks for the pizza API.
+
+Most of these drive a running server over HTTP; start one first, e.g.
+    python -m pizza_app.main
+startup.py measures worker cold start on its own.
+"""
@@ -0,0 +1,88 @@
+"""
+Sustained order-intake load test.
+
+    python -m pizza_app.bench.order_load --concurrency 64 --duration 10
+
+Each worker posts random valid orders back to back for the given duration;
+the report shows committed orders/sec and latency percentiles.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def random_order(menu, rng: random.Random) -> dict:
+    items = []
+    for _ in range(rng.randint(1, 3)):
+        pizza = rng.choice(menu)
+        items.append({
+            "pizza_id": pizza["id"],
+            "size_id": rng.choice(pizza["sizes"])["id"],
+            "quantity": rng.randint(1, 2),
+        })
+    return {"customer_name": f"load-{rng.randint(1, 10_000)}", "items": items}
+
+
+async def worker(client, menu, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.post("/orders/", json=random_order(menu, rng))
+        if response.status_code == 201:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(response.status_code)
+
+
+async def run(url: str, concurrency: int, duration: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        pizzas = (await client.get("/pizza/get_designer_pizzas")).json()
+        menu = [p for p in pizzas if p["is_available"] and p["sizes"]]
+        if not menu:
+            raise SystemExit("No available pizzas with sizes to order; seed the database first")
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            worker(client, menu, deadline, latencies, errors, seed) for seed in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "orders": len(latencies),
+        "errors": len(errors),
+        "orders_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:9002")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.concurrency, args.duration))
+    for key, value in result.items():
+        print(f"{key:>15}: {value}")
+
+
+if __name__ == "__main__":
+    main()
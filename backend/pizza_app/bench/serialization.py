@@ -0,0 +1,177 @@
+"""
+Serialization micro-benchmark for a large List[Pizza] response.
+
+    cd backend && python -m pizza_app.bench.serialization --pizzas 5000
+
+Builds an in-memory catalog of ORM objects (no database) shaped like a real
+one, then times each way a response body can be produced from it. The
+median of ``--repeat`` runs is reported per response and per pizza.
+
+- validate: ORM objects -> Pydantic models (from_attributes)
+- jsonable_encoder+json: FastAPI's generic path (no response_model)
+- model_dump+json / model_dump+orjson: dicts, then the stdlib / orjson
+- dump_json: Pydantic straight to bytes (the response_model fast path)
+- validate+dump_json: ORM objects validated as one list, then encoded
+- memo+dump_json: ORM objects, each related row validated once and shared
+- snapshot+dump_json: the catalog read path, from the in-memory catalog snapshot
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Callable, Dict, List, Tuple, Type
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+
+from pizza_app.models.pizza_models import (
+    Pizza as PizzaModel, Size as SizeModel, Sauce as SauceModel, Crust as CrustModel,
+    Topping as ToppingModel, ToppingCategory as ToppingCategoryModel,
+)
+from pizza_app.models.pizza_schemas import Pizza, Size, Sauce, Crust, Topping
+from pizza_app.services.catalog_snapshot import (
+    CatalogSnapshot, SizeRecord, SauceRecord, CrustRecord, CategoryRecord, ToppingRecord, PizzaRecord,
+)
+from pizza_app.services.pizza_serialization import SnapshotSchemas
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+
+def build_catalog(pizzas: int, toppings: int, seed: int) -> List[PizzaModel]:
+    rng = random.Random(seed)
+    sizes = [SizeModel(id=i, size=name, base_price=price)
+             for i, (name, price) in enumerate((("Small", 10.0), ("Medium", 15.0), ("Large", 20.0)), 1)]
+    sauces = [SauceModel(id=i, name=f"Sauce {i}", price=1.5) for i in range(1, 5)]
+    crusts = [CrustModel(id=i, name=f"Crust {i}", price=2.0) for i in range(1, 5)]
+    categories = [ToppingCategoryModel(id=i, name=f"Category {i}", description="Toppings") for i in range(1, 11)]
+    topping_rows = []
+    for i in range(1, toppings + 1):
+        topping = ToppingModel(id=i, name=f"Topping {i}", price=round(rng.uniform(0.5, 3.0), 2))
+        topping.categories = rng.sample(categories, rng.randint(1, 2))
+        topping_rows.append(topping)
+    rows = []
+    for i in range(1, pizzas + 1):
+        pizza = PizzaModel(
+            id=i, name=f"Pizza {i}", description=f"Generated pizza number {i}",
+            image_url=f"dist/images/{i}.png", is_available=True,
+        )
+        pizza.sizes = rng.sample(sizes, rng.randint(1, len(sizes)))
+        pizza.sauce = rng.choice(sauces)
+        pizza.crust = rng.choice(crusts)
+        pizza.toppings = rng.sample(topping_rows, rng.randint(1, 6))
+        rows.append(pizza)
+    return rows
+
+
+def to_snapshot(rows: List[PizzaModel]) -> CatalogSnapshot:
+    """The same catalog as a CatalogSnapshot"""
+    toppings = {t.id: t for pizza in rows for t in pizza.toppings}
+    tables = {
+        "sizes": {s.id: SizeRecord(s.id, s.size, s.base_price) for pizza in rows for s in pizza.sizes},
+        "sauces": {p.sauce.id: SauceRecord(p.sauce.id, p.sauce.name, p.sauce.price) for p in rows},
+        "crusts": {p.crust.id: CrustRecord(p.crust.id, p.crust.name, p.crust.price) for p in rows},
+        "categories": {
+            c.id: CategoryRecord(c.id, c.name, c.description) for t in toppings.values() for c in t.categories
+        },
+        "toppings": {
+            t.id: ToppingRecord(t.id, t.name, t.price, tuple(c.id for c in t.categories)) for t in toppings.values()
+        },
+        "pizzas": {
+            p.id: PizzaRecord(
+                p.id, p.name, p.description, p.image_url, p.is_available, p.sauce.id, p.crust.id,
+                tuple(s.id for s in p.sizes), tuple(t.id for t in p.toppings),
+            )
+            for p in rows
+        },
+    }
+    return CatalogSnapshot(0, tables, 0.0)
+
+
+class _Memo:
+    def __init__(self):
+        self._validated: Dict[Tuple[Type[BaseModel], int], BaseModel] = {}
+
+    def get(self, schema: Type[BaseModel], row) -> BaseModel:
+        key = (schema, row.id)
+        value = self._validated.get(key)
+        if value is None:
+            value = self._validated[key] = schema.model_validate(row)
+        return value
+
+
+def memo_schemas(rows: List[PizzaModel]) -> List[Pizza]:
+    """SnapshotSchemas' approach applied to ORM objects, for comparison"""
+    memo = _Memo()
+    return [
+        Pizza.model_construct(
+            id=row.id,
+            name=row.name,
+            description=row.description,
+            image_url=row.image_url,
+            is_available=row.is_available,
+            sizes=[memo.get(Size, size) for size in row.sizes],
+            sauce=memo.get(Sauce, row.sauce),
+            crust=memo.get(Crust, row.crust),
+            toppings=[memo.get(Topping, topping) for topping in row.toppings],
+        )
+        for row in rows
+    ]
+
+
+def time_it(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def run(pizzas: int, toppings: int, repeat: int, seed: int) -> Dict[str, float]:
+    rows = build_catalog(pizzas, toppings, seed)
+    adapter = TypeAdapter(List[Pizza])
+    models = adapter.validate_python(rows, from_attributes=True)
+    snapshot = to_snapshot(rows)
+
+    cases = {
+        "validate": lambda: adapter.validate_python(rows, from_attributes=True),
+        "jsonable_encoder+json": lambda: json.dumps(jsonable_encoder(models)).encode(),
+        "model_dump+json": lambda: json.dumps([model.model_dump() for model in models]).encode(),
+        "dump_json": lambda: adapter.dump_json(models),
+        "validate+dump_json": lambda: adapter.dump_json(adapter.validate_python(rows, from_attributes=True)),
+        "memo+dump_json": lambda: adapter.dump_json(adapter.validate_python(memo_schemas(rows))),
+        "snapshot+dump_json": lambda: adapter.dump_json(
+            adapter.validate_python(SnapshotSchemas(snapshot).pizzas(snapshot.pizzas))
+        ),
+    }
+    if orjson is not None:
+        cases["model_dump+orjson"] = lambda: orjson.dumps([model.model_dump() for model in models])
+
+    size = len(adapter.dump_json(models))
+    assert adapter.dump_json(memo_schemas(rows)) == adapter.dump_json(models)
+    assert adapter.dump_json(SnapshotSchemas(snapshot).pizzas(snapshot.pizzas)) == adapter.dump_json(models)
+    print(f"{pizzas} pizzas, {size / 1024:.0f} KiB of JSON, median of {repeat} runs")
+    results = {}
+    for name, fn in cases.items():
+        seconds = time_it(fn, repeat)
+        results[name] = seconds
+        print(f"{name:>24}: {seconds * 1000:8.2f} ms  {seconds / pizzas * 1e6:6.2f} us/pizza")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pizzas", type=int, default=5000)
+    parser.add_argument("--toppings", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.pizzas, args.toppings, args.repeat, args.seed)
+
+
+if __name__ == "__main__":
+    main()
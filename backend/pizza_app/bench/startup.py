@@ -0,0 +1,62 @@
+"""
+Worker cold-start benchmark.
+
+    cd backend && python -m pizza_app.bench.startup --runs 5 --budget-ms 1500
+
+Each run starts a fresh interpreter, imports pizza_app.main and runs the
+app's startup (migrations check, index rebuild, feeds) against the
+database in the current directory, reporting the median import time and
+time to ready. With ``--budget-ms`` it exits with status 1 when the median
+time to ready exceeds the budget, so it can guard against slow imports
+creeping back into the startup path.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from pizza_app.main import app
+imported = time.perf_counter()
+
+async def start():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+print(json.dumps({"import_ms": (imported - started) * 1000, "ready_ms": (ready - started) * 1000}))
+"""
+
+
+def measure(runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        "runs": runs,
+        "import_ms": round(statistics.median(sample["import_ms"] for sample in samples), 1),
+        "ready_ms": round(statistics.median(sample["ready_ms"] for sample in samples), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, help="fail if the median time to ready is above this")
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    print(json.dumps(result))
+    if args.budget_ms is not None and result["ready_ms"] > args.budget_ms:
+        print(f"Startup took {result['ready_ms']} ms, over the {args.budget_ms} ms budget", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+HTTP benchmark suite for the pizza API.
+
+    python -m pizza_app.bench.suite --pizzas 10000 --concurrency 32 --duration 10 \\
+        --output baseline.json
+    python -m pizza_app.bench.suite --pizzas 10000 --concurrency 32 --duration 10 \\
+        --compare baseline.json
+
+Each scenario (menu/detail reads, search, filter, writes, orders, image
+uploads) runs on its own for the given duration with ``concurrency``
+clients; the report has requests/sec and p50/p95/p99 latency per scenario.
+``--pizzas N`` first adds pizzas through the API until the catalog has at
+least N. ``--compare`` checks the run against a saved report and exits with
+status 1 if any scenario's p95/p99 latency rose or its throughput fell by
+more than ``--threshold``.
+
+Generate a large catalog quickly with ``python -m pizza_app.datagen`` rather
+than ``--pizzas``, which goes through the API.
+
+Runs are reproducible for a given catalog: request parameters come from a
+seeded RNG per client. Write scenarios modify the catalog (pizza
+descriptions) and add orders, so benchmark a copy of the database.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from pizza_app.bench.order_load import percentile, random_order
+
+SEARCH_TERMS = ("pepperoni", "cheese", "veg", "spicy", "chicken", "mushroom", "bbq", "classic", "hawaiian", "supreme")
+
+# A 1x1 transparent PNG
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6300010000000500010d0a2db40000000049454e44ae426082"
+)
+
+
+class Catalog:
+    """IDs the scenarios pick from, read once before the run"""
+
+    def __init__(self, pizzas: List[dict], toppings: List[dict]):
+        self.pizzas = pizzas
+        self.pizza_ids = [pizza["id"] for pizza in pizzas]
+        self.topping_ids = [topping["id"] for topping in toppings]
+        self.menu = [pizza for pizza in pizzas if pizza["is_available"] and pizza["sizes"]]
+
+
+Scenario = Callable[[httpx.AsyncClient, Catalog, random.Random], Awaitable[httpx.Response]]
+
+
+async def read_menu(client, catalog, rng):
+    return await client.get("/pizza/get_designer_pizzas")
+
+
+async def read_menu_graph(client, catalog, rng):
+    return await client.get("/pizza/get_designer_pizzas_graph")
+
+
+async def read_pizza(client, catalog, rng):
+    return await client.get(f"/pizza/{rng.choice(catalog.pizza_ids)}")
+
+
+async def search(client, catalog, rng):
+    return await client.get("/pizza/search", params={"q": rng.choice(SEARCH_TERMS), "limit": 20})
+
+
+async def filter_by_topping(client, catalog, rng):
+    return await client.get("/pizza/filter", params={"topping_id": rng.choice(catalog.topping_ids)})
+
+
+async def update_pizza(client, catalog, rng):
+    return await client.patch(
+        f"/pizza/update_pizza/{rng.choice(catalog.pizza_ids)}",
+        json={"description": f"Benchmark edit {rng.randint(1, 1_000_000)}"},
+    )
+
+
+async def place_order(client, catalog, rng):
+    return await client.post("/orders/", json=random_order(catalog.menu, rng))
+
+
+async def upload_image(client, catalog, rng):
+    response = await client.post("/pizza/upload_image", files={"file": ("bench.png", TINY_PNG, "image/png")})
+    if response.status_code == 200:
+        # Clean up outside the timed request
+        await client.delete(f"/pizza/delete_image/{response.json()['filename']}")
+    return response
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "read_menu": read_menu,
+    "read_menu_graph": read_menu_graph,
+    "read_pizza": read_pizza,
+    "search": search,
+    "filter": filter_by_topping,
+    "update_pizza": update_pizza,
+    "place_order": place_order,
+    "upload_image": upload_image,
+}
+
+
+async def seed_pizzas(client: httpx.AsyncClient, target: int, concurrency: int) -> int:
+    """Add generated pizzas through the API until there are ``target``; returns how many were added"""
+    existing = len((await client.get("/pizza/get_designer_pizzas")).json())
+    missing = target - existing
+    if missing <= 0:
+        return 0
+    sizes = [size["id"] for size in (await client.get("/pizza/get_pizza_sizes")).json()]
+    sauces = [sauce["id"] for sauce in (await client.get("/pizza/get_pizza_sauces")).json()]
+    crusts = [crust["id"] for crust in (await client.get("/pizza/get_pizza_crusts")).json()]
+    toppings = [topping["id"] for topping in (await client.get("/pizza/get_pizza_toppings")).json()]
+    if not (sizes and sauces and crusts):
+        raise SystemExit("Seeding needs at least one size, sauce and crust; seed the database first")
+
+    numbers = iter(range(existing, target))
+
+    async def add(seed: int):
+        rng = random.Random(seed)
+        for number in numbers:
+            response = await client.post("/pizza/add_pizza", json={
+                "name": f"Bench Pizza {number}",
+                "description": f"{rng.choice(SEARCH_TERMS)} pizza number {number}",
+                "is_available": rng.random() < 0.9,
+                "size_ids": rng.sample(sizes, rng.randint(1, len(sizes))),
+                "sauce_id": rng.choice(sauces),
+                "crust_id": rng.choice(crusts),
+                "topping_ids": rng.sample(toppings, min(len(toppings), rng.randint(1, 6))),
+            })
+            response.raise_for_status()
+
+    await asyncio.gather(*(add(seed) for seed in range(concurrency)))
+    return missing
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, catalog: Catalog, concurrency: int, duration: float
+) -> dict:
+    latencies: List[float] = []
+    errors: List[int] = []
+
+    async def worker(seed: int, deadline: float):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await scenario(client, catalog, rng)
+            if response.status_code < 400:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(seed, started + duration) for seed in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+async def run(url: str, scenarios: List[str], concurrency: int, duration: float, pizzas: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        if pizzas:
+            added = await seed_pizzas(client, pizzas, concurrency)
+            if added:
+                print(f"Added {added} pizzas", file=sys.stderr)
+        catalog = Catalog(
+            (await client.get("/pizza/get_designer_pizzas")).json(),
+            (await client.get("/pizza/get_pizza_toppings")).json(),
+        )
+        if not catalog.menu:
+            raise SystemExit("No available pizzas with sizes; seed the database first")
+
+        results = {}
+        for name in scenarios:
+            results[name] = await run_scenario(client, SCENARIOS[name], catalog, concurrency, duration)
+            print(f"{name:>16}: {results[name]}", file=sys.stderr)
+
+    return {
+        "meta": {
+            "url": url,
+            "concurrency": concurrency,
+            "duration": duration,
+            "pizzas": len(catalog.pizzas),
+            "toppings": len(catalog.topping_ids),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "scenarios": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Regressions of ``current`` against ``baseline`` beyond ``threshold`` (a fraction)"""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            if before[metric] and result[metric] > before[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {before[metric]} -> {result[metric]}")
+        if before["rps"] and result["rps"] < before["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {before['rps']} -> {result['rps']}")
+        if result["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {result['errors']}")
+    return regressions
+
+
+def print_comparison(baseline: dict, current: dict) -> None:
+    print(f"{'scenario':>16}  {'rps':>18}  {'p50_ms':>18}  {'p95_ms':>18}  {'p99_ms':>18}")
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name, {})
+        cells = [
+            f"{before.get(metric, '-')!s:>8} -> {result[metric]!s:<8}"
+            for metric in ("rps", "p50_ms", "p95_ms", "p99_ms")
+        ]
+        print(f"{name:>16}  " + "  ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:9002")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="run only these scenarios (repeatable; default: all)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--pizzas", type=int, default=0, help="add pizzas until the catalog has this many")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved JSON report")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative change counted as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    scenarios = args.scenario or list(SCENARIOS)
+    report = asyncio.run(run(args.url, scenarios, args.concurrency, args.duration, args.pizzas))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["pizzas"] != report["meta"]["pizzas"] or \
+                baseline["meta"]["concurrency"] != report["meta"]["concurrency"]:
+            print("warning: catalog size or concurrency differs from the baseline", file=sys.stderr)
+        print_comparison(baseline, report)
+        regressions = compare(baseline, report, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Cache storage backends.
+
+MemoryBackend keeps live Python objects in this process (LRU + TTL) and needs
+no serialization. RedisBackend stores bytes in any server speaking the Redis
+protocol, so every worker and host shares one cache; it needs the optional
+``redis`` package, or any client with the same asyncio API (e.g. fakeredis)
+passed in directly.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional
+    aioredis = None
+
+
+class CacheBackend(ABC):
+    """A backend missing any of these methods fails when it is created, not on first use"""
+    # Whether values must be serialized to bytes before being stored
+    needs_serialization = True
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        ...
+
+    @abstractmethod
+    async def add(self, key: str, value: Any, ttl: Optional[float]) -> bool:
+        """Set ``key`` only if it is not already set (atomically); returns whether it was set"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU with per-entry TTL. Cached values are shared, not copied."""
+    needs_serialization = False
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Cache calls come from the event loop and from threadpool workers
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        # Called with the lock held
+        self._entries[key] = (time.monotonic() + ttl if ttl else 0.0, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    async def add(self, key: str, value: Any, ttl: Optional[float]) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not (entry[0] and entry[0] <= time.monotonic()):
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend(CacheBackend):
+    def __init__(self, url: str = "redis://localhost:6379/0", client=None, prefix: str = "pizza:"):
+        """
+        url: Redis server URL (ignored when ``client`` is given)
+        client: an asyncio Redis-compatible client, e.g. fakeredis.aioredis.FakeRedis()
+        prefix: prepended to every key, so clear() only removes this app's keys
+        """
+        if client is None:
+            if aioredis is None:
+                raise ValueError("The redis cache backend needs the redis package")
+            client = aioredis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        await self.client.set(self.prefix + key, value, px=int(ttl * 1000) if ttl else None)
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float]) -> bool:
+        return bool(await self.client.set(self.prefix + key, value, px=int(ttl * 1000) if ttl else None, nx=True))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
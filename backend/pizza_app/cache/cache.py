@@ -0,0 +1,168 @@
+"""
+Namespaced caches over a pluggable backend.
+
+``get_or_compute`` is the main entry point: on a miss the value is computed
+once, and concurrent callers asking for the same key wait for that single
+computation instead of stampeding the database (see single_flight.py).
+Backend failures are logged and treated as misses, so a cache outage slows
+requests down but does not fail them.
+
+Each cache keeps hit/miss counters; ``cache_stats()`` reports them for every
+cache created with ``create_cache``.
+"""
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pizza_app import settings
+from pizza_app.cache.backends import CacheBackend, MemoryBackend, RedisBackend
+from pizza_app.cache.serializers import Serializer, get_serializer
+from pizza_app.cache.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Serialized values carry a one-byte tag so pre-encoded bytes (e.g. JSON
+# response bodies) are stored as-is whatever the serializer
+_RAW = b"r"
+_SERIALIZED = b"s"
+
+
+class Cache:
+    def __init__(
+        self,
+        namespace: str,
+        backend: CacheBackend,
+        serializer: Optional[Serializer] = None,
+        ttl: Optional[float] = None,
+        enabled: bool = True,
+    ):
+        """
+        namespace: prefix for every key, keeping caches apart on a shared backend
+        ttl: default time-to-live in seconds (None keeps entries until evicted)
+        enabled: when False, get_or_compute always computes (still single-flight)
+        """
+        self.namespace = namespace
+        self.enabled = enabled
+        self.backend = backend
+        self.serializer = serializer or get_serializer("json")
+        self.ttl = ttl
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.errors = 0
+
+    @property
+    def misses(self) -> int:
+        return self._flight.calls
+
+    @property
+    def coalesced(self) -> int:
+        return self._flight.coalesced
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _dump(self, value: Any) -> Any:
+        if not self.backend.needs_serialization:
+            return value
+        if isinstance(value, bytes):
+            return _RAW + value
+        return _SERIALIZED + self.serializer.dumps(value)
+
+    def _load(self, stored: Any) -> Any:
+        if not self.backend.needs_serialization:
+            return stored
+        stored = bytes(stored)
+        if stored[:1] == _RAW:
+            return stored[1:]
+        return self.serializer.loads(stored[1:])
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            stored = await self.backend.get(self._key(key))
+        except Exception:
+            self.errors += 1
+            logger.exception("Cache %s: get failed", self.namespace)
+            return None
+        if stored is None:
+            return None
+        return self._load(stored)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            await self.backend.set(self._key(key), self._dump(value), ttl if ttl is not None else self.ttl)
+        except Exception:
+            self.errors += 1
+            logger.exception("Cache %s: set failed", self.namespace)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.backend.delete(self._key(key))
+        except Exception:
+            self.errors += 1
+            logger.exception("Cache %s: delete failed", self.namespace)
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any]], ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Return the cached value for ``key``, or await ``compute()`` once -
+        however many callers miss at the same time - and cache its result.
+        Exceptions from ``compute`` propagate to every waiting caller and are
+        not cached.
+        """
+        value = await self.get(key) if self.enabled else None
+        if value is not None:
+            self.hits += 1
+            return value
+
+        return await self._flight.do(key, lambda: self._compute_and_store(key, compute, ttl))
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        value = await compute()
+        if value is not None and self.enabled:
+            await self.set(key, value, ttl)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            # Coalesced callers were served without computing, like hits
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+        }
+
+
+_caches: Dict[str, Cache] = {}
+_backend: Optional[CacheBackend] = None
+
+
+def _shared_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        if settings.CACHE_BACKEND == "redis":
+            _backend = RedisBackend(settings.CACHE_REDIS_URL)
+        elif settings.CACHE_BACKEND == "memory":
+            _backend = MemoryBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+        else:
+            raise ValueError(f"Unknown cache backend: {settings.CACHE_BACKEND}")
+    return _backend
+
+
+def create_cache(namespace: str, ttl: Optional[float] = None) -> Cache:
+    """A cache on the configured backend and serializer (see settings)"""
+    cache = Cache(
+        namespace,
+        _shared_backend(),
+        serializer=get_serializer(settings.CACHE_SERIALIZER),
+        ttl=ttl if ttl is not None else settings.CACHE_TTL_SECONDS,
+        enabled=settings.CACHE_ENABLED,
+    )
+    _caches[namespace] = cache
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {namespace: cache.stats() for namespace, cache in _caches.items()}
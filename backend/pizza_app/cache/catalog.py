@@ -0,0 +1,83 @@
+"""
+Cached JSON responses for catalog reads.
+
+Keys include the catalog version this process has applied, so a committed
+catalog change - by any worker, see services/coherence.py - moves readers
+onto fresh keys without deleting anything; superseded entries age out.
+Responses are cached as encoded JSON bytes, so a hit skips both the query
+and serialization. Reads too specific to be worth caching (``/pizza/sync``
+per client version) are still coalesced: identical concurrent requests share
+one query. Reads that the catalog snapshot can answer (snapshot_response)
+never open a session at all.
+"""
+from typing import Any, Callable, Dict
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+
+from sqlalchemy.orm import Session
+
+from pizza_app.cache.cache import create_cache
+from pizza_app.cache.single_flight import SingleFlight
+from pizza_app.database import SessionLocal
+from pizza_app.services import catalog_events
+from pizza_app.services.catalog_snapshot import CatalogSnapshot, catalog_snapshot
+from pizza_app.services.metrics import timed
+
+catalog_cache = create_cache("catalog")
+catalog_flight = SingleFlight()
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def render_json(response_type: Any, value: Any) -> bytes:
+    """Validate ``value`` (ORM objects allowed) against ``response_type`` and encode it"""
+    adapter = _adapters.get(response_type)
+    if adapter is None:
+        adapter = _adapters[response_type] = TypeAdapter(response_type)
+    with timed("serialize"):
+        return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def catalog_key(key: str) -> str:
+    return f"v{catalog_events.dispatched_version()}:{key}"
+
+
+def _render_in_session(response_type: Any, load: Callable[[Session], Any]) -> Callable[[], Any]:
+    def compute() -> bytes:
+        with SessionLocal() as db:
+            return render_json(response_type, load(db))
+
+    return lambda: run_in_threadpool(compute)
+
+
+async def cached_response(key: str, response_type: Any, load: Callable[[Session], Any]) -> Response:
+    """
+    JSON response for a catalog read. On a miss ``load(db)`` runs once, in the
+    threadpool with a session of its own, however many requests are waiting;
+    a hit touches neither the database nor the threadpool.
+    """
+    body = await catalog_cache.get_or_compute(catalog_key(key), _render_in_session(response_type, load))
+    return Response(content=body, media_type="application/json")
+
+
+async def coalesced_response(key: str, response_type: Any, load: Callable[[Session], Any]) -> Response:
+    """Like cached_response, but the result is only shared with requests already waiting"""
+    body = await catalog_flight.do(catalog_key(key), _render_in_session(response_type, load))
+    return Response(content=body, media_type="application/json")
+
+
+async def snapshot_response(key: str, response_type: Any, build: Callable[[CatalogSnapshot], Any]) -> Response:
+    """
+    Like cached_response, but a miss runs ``build(snapshot)`` on the current
+    catalog snapshot instead of querying the database. The key is that
+    snapshot's version, so the body always matches the data it came from.
+    """
+    snapshot = catalog_snapshot.current
+
+    def compute() -> bytes:
+        return render_json(response_type, build(snapshot))
+
+    body = await catalog_cache.get_or_compute(f"v{snapshot.version}:{key}", lambda: run_in_threadpool(compute))
+    return Response(content=body, media_type="application/json")
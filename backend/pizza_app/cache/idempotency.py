@@ -0,0 +1,92 @@
+"""
+Stored responses for requests sent with an Idempotency-Key header (see
+middleware/idempotency.py).
+
+A key is claimed with an atomic add before its request runs, so a duplicate
+arriving meanwhile sees the claim instead of running too; the finished
+response then replaces the claim. Entries are compact bytes - a tag and the
+request fingerprint, then for finished requests one JSON line with the
+status and headers followed by the raw body - so the store works the same
+in memory or on Redis, and entries expire after the TTL either way.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from pizza_app import settings
+from pizza_app.cache.backends import CacheBackend, MemoryBackend, RedisBackend
+
+_PENDING = b"P"
+_DONE = b"D"
+# sha256 digest
+FINGERPRINT_SIZE = 32
+# A claim left by a worker that died mid-request frees the key after this long
+_PENDING_TTL_SECONDS = 60
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: bytes
+    # None while the original request is still running
+    status: Optional[int] = None
+    headers: List[Tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytes = b""
+
+    @property
+    def pending(self) -> bool:
+        return self.status is None
+
+
+def _encode(response: StoredResponse) -> bytes:
+    if response.pending:
+        return _PENDING + response.fingerprint
+    head = json.dumps(
+        [response.status, [[name.decode("latin-1"), value.decode("latin-1")] for name, value in response.headers]],
+        separators=(",", ":"),
+    )
+    return _DONE + response.fingerprint + head.encode("latin-1") + b"\n" + response.body
+
+
+def _decode(data: bytes) -> StoredResponse:
+    data = bytes(data)
+    fingerprint = data[1:1 + FINGERPRINT_SIZE]
+    if data[:1] == _PENDING:
+        return StoredResponse(fingerprint)
+    head, _, body = data[1 + FINGERPRINT_SIZE:].partition(b"\n")
+    status, headers = json.loads(head)
+    return StoredResponse(
+        fingerprint, status, [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers], body
+    )
+
+
+class IdempotencyStore:
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def claim(self, key: str, fingerprint: bytes) -> Optional[StoredResponse]:
+        """None if the key is now claimed for this request, otherwise what it already holds"""
+        while True:
+            if await self.backend.add(key, _encode(StoredResponse(fingerprint)), _PENDING_TTL_SECONDS):
+                return None
+            data = await self.backend.get(key)
+            if data is not None:
+                return _decode(data)
+            # Expired between the two calls; claim it again
+
+    async def save(self, key: str, response: StoredResponse) -> None:
+        await self.backend.set(key, _encode(response), self.ttl)
+
+    async def release(self, key: str) -> None:
+        """Forget the key, so a retry runs the request again"""
+        await self.backend.delete(key)
+
+
+def create_store() -> IdempotencyStore:
+    """A store on the configured cache backend (a separate one from the response caches)"""
+    if settings.CACHE_BACKEND == "redis":
+        # Its own prefix, so clearing the response caches leaves it alone
+        backend = RedisBackend(settings.CACHE_REDIS_URL, prefix="pizza-idempotency:")
+    else:
+        backend = MemoryBackend(max_entries=settings.IDEMPOTENCY_MAX_ENTRIES)
+    return IdempotencyStore(backend, settings.IDEMPOTENCY_TTL_SECONDS)
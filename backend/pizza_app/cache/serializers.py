@@ -0,0 +1,75 @@
+"""
+Value serializers for cache backends that store bytes (Redis).
+
+orjson and msgpack are optional dependencies; asking for one that is not
+installed raises ValueError at startup rather than on the first cache write.
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+
+class Serializer(ABC):
+    name = ""
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        ...
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        ...
+
+
+class JsonSerializer(Serializer):
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(Serializer):
+    name = "orjson"
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    name = "msgpack"
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def get_serializer(name: str) -> Serializer:
+    if name == "json":
+        return JsonSerializer()
+    if name == "orjson":
+        if orjson is None:
+            raise ValueError("The orjson cache serializer needs the orjson package")
+        return OrjsonSerializer()
+    if name == "msgpack":
+        if msgpack is None:
+            raise ValueError("The msgpack cache serializer needs the msgpack package")
+        return MsgpackSerializer()
+    raise ValueError(f"Unknown cache serializer: {name}")
@@ -0,0 +1,49 @@
+"""
+Request coalescing: concurrent calls for the same key share one execution.
+
+The first caller starts the work as a task of its own; callers arriving
+while it runs await the same task instead of repeating the query and
+serialization. Nothing is kept once the task finishes - combine with a
+Cache to also reuse results afterwards.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+def _retrieve_exception(task: asyncio.Future) -> None:
+    # Callers get the exception through shield(); this only keeps asyncio
+    # from logging it when every caller has gone away
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``fn()``, or the already running call for ``key``. A caller that
+        is cancelled (e.g. the client disconnected) does not cancel the call
+        for the others.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(self._run(key, fn))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await fn()
+        finally:
+            del self._inflight[key]
@@ -1,14 +1,25 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from typing import Generator
 
-DATABASE_URL = "sqlite:///./pizza.db"
+from pizza_app import settings
+
+DATABASE_URL = settings.DATABASE_URL
 
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False},  # SQLite only
 )
 
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers keep going while a write (or a migration step) holds the lock"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -18,6 +29,25 @@ SessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+def _catalog_hook(name: str):
+    """Forwards a session event to services/catalog_events, imported on first use as it imports the models"""
+    def hook(*args):
+        from pizza_app.services import catalog_events
+        return getattr(catalog_events, name)(*args)
+    return hook
+
+
+# Every session stamps catalog versions and logs catalog changes, whichever
+# code path opened it (the API, seed_db, scripts)
+for _event, _handler in (
+    ("before_flush", "assign_versions"),
+    ("after_flush", "collect_changes"),
+    ("after_commit", "publish_changes"),
+    ("after_rollback", "discard_changes"),
+):
+    event.listen(SessionLocal, _event, _catalog_hook(_handler))
+
+
 # Dependency to get database session
 def get_db() -> Generator:
     """Dependency function to get database session"""
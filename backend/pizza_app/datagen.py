@@ -0,0 +1,295 @@
+"""
+Synthetic catalog and order generator for performance work.
+
+    cd backend && python -m pizza_app.datagen --pizzas 100000 --toppings 2000 \\
+        --categories 200 --orders 50000 --seed 42
+
+Rows are added to the existing catalog with executemany Core inserts in a
+single transaction, so 100k pizzas take seconds rather than the minutes the
+ORM would need. The same seed on the same starting database always produces
+the same rows.
+
+Core inserts skip the ORM hooks in services/catalog_events.py, so they are
+reproduced here: every generated catalog row gets its own catalog version,
+stamped on the row and recorded in the catalog_changes log. A server that is
+already running picks the new rows up like any other committed change, and
+sync clients receive them.
+"""
+import argparse
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import create_engine, func, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from pizza_app.database import engine as app_engine
+from pizza_app.models.order_models import ORDER_STATUSES, Order, OrderItem, order_item_toppings
+from pizza_app.models.pizza_models import (
+    Pizza, Size, Sauce, Crust, Topping, ToppingCategory, CatalogMeta, CatalogChangeLog,
+    pizza_sizes, pizza_toppings, topping_categories, init_db,
+)
+from pizza_app.migrations import upgrade_database
+
+logger = logging.getLogger(__name__)
+
+SIZES = (("Small", 10.0), ("Medium", 15.0), ("Large", 20.0), ("Extra Large", 25.0))
+SAUCES = (("Tomato", 1.0), ("Alfredo", 2.0), ("Barbecue", 2.0), ("Pesto", 2.5), ("Buffalo", 2.0))
+CRUSTS = (("Thin", 1.0), ("Thick", 2.0), ("Deep Dish", 3.0), ("Gluten Free", 3.0), ("Stuffed", 3.0))
+
+CATEGORY_WORDS = ("Meat", "Vegetable", "Cheese", "Seafood", "Herb", "Spicy", "Fruit", "Nut", "Vegan", "Premium")
+TOPPING_WORDS = (
+    "Pepperoni", "Mushrooms", "Onions", "Peppers", "Spinach", "Anchovies", "Pineapple", "Ham", "Sausage",
+    "Chicken", "Bacon", "Artichoke", "Jalapenos", "Olives", "Tomatoes", "Garlic", "Basil", "Feta",
+    "Ricotta", "Prosciutto", "Salami", "Shrimp", "Arugula", "Corn", "Eggplant", "Zucchini", "Capers",
+)
+TOPPING_STYLES = ("", "Roasted", "Smoked", "Grilled", "Pickled", "Fresh", "Caramelized", "Spicy", "Sun-dried")
+PIZZA_ADJECTIVES = (
+    "Classic", "Supreme", "Rustic", "Fiery", "Garden", "Harvest", "Royal", "Smoky", "Golden", "Wild",
+    "Tuscan", "Coastal", "Midnight", "Alpine", "Urban", "Sunset",
+)
+CUSTOMER_NAMES = ("Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn")
+
+
+def _next_id(connection: Connection, table) -> int:
+    return connection.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar_one() + 1
+
+
+def _insert(connection: Connection, table, rows: List[dict], batch_size: int) -> None:
+    for start in range(0, len(rows), batch_size):
+        connection.execute(insert(table), rows[start:start + batch_size])
+
+
+class _Versions:
+    """Hands out catalog versions and collects the matching change log rows"""
+
+    def __init__(self, first: int, now: datetime):
+        self.next = first
+        self.now = now
+        self.log: List[dict] = []
+
+    def stamp(self, entity: str, row: dict, links: Optional[Dict[str, Sequence[int]]] = None) -> dict:
+        row["version"] = self.next
+        row["updated_at"] = self.now
+        self.log.append({
+            "version": self.next,
+            "entity": entity,
+            "entity_id": row["id"],
+            "op": "create",
+            "links": {name: list(ids) for name, ids in links.items()} if links else None,
+            "changed_at": self.now,
+        })
+        self.next += 1
+        return row
+
+
+def _ensure_basics(connection: Connection, versions: _Versions, batch_size: int) -> None:
+    """Add the standard sizes, sauces and crusts to a database that has none"""
+    for model, entity, values, column in (
+        (Size, "size", SIZES, "size"),
+        (Sauce, "sauce", SAUCES, "name"),
+        (Crust, "crust", CRUSTS, "name"),
+    ):
+        table = model.__table__
+        if connection.execute(select(func.count()).select_from(table)).scalar_one():
+            continue
+        first = _next_id(connection, table)
+        price_column = "base_price" if model is Size else "price"
+        _insert(connection, table, [
+            versions.stamp(entity, {"id": first + i, column: name, price_column: price})
+            for i, (name, price) in enumerate(values)
+        ], batch_size)
+
+
+def generate(
+    engine: Engine,
+    pizzas: int = 1000,
+    toppings: int = 200,
+    categories: int = 20,
+    orders: int = 0,
+    seed: int = 0,
+    batch_size: int = 10_000,
+) -> Dict[str, int]:
+    """Add a generated catalog (and orders) in one transaction; returns the row counts added"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    counts = {"categories": categories, "toppings": toppings, "pizzas": pizzas, "orders": orders}
+
+    with engine.begin() as connection:
+        meta = CatalogMeta.__table__
+        # Taking the write lock first keeps other writers out until commit
+        first_version = connection.execute(
+            update(meta).where(meta.c.id == 1).values(version=meta.c.version).returning(meta.c.version)
+        ).scalar_one() + 1
+        versions = _Versions(first_version, now)
+        _ensure_basics(connection, versions, batch_size)
+
+        size_ids = list(connection.execute(select(Size.id).order_by(Size.id)).scalars())
+        sauce_ids = list(connection.execute(select(Sauce.id).order_by(Sauce.id)).scalars())
+        crust_ids = list(connection.execute(select(Crust.id).order_by(Crust.id)).scalars())
+
+        # Categories
+        first = _next_id(connection, ToppingCategory.__table__)
+        category_ids = list(range(first, first + categories))
+        category_rows = []
+        for number, category_id in enumerate(category_ids):
+            word = CATEGORY_WORDS[number % len(CATEGORY_WORDS)]
+            name = word if number < len(CATEGORY_WORDS) else f"{word} {number // len(CATEGORY_WORDS) + 1}"
+            category_rows.append(versions.stamp("topping_category", {
+                "id": category_id, "name": name, "description": f"{name} toppings",
+            }))
+        _insert(connection, ToppingCategory.__table__, category_rows, batch_size)
+
+        # Toppings, each in one to three categories
+        first = _next_id(connection, Topping.__table__)
+        topping_ids = list(range(first, first + toppings))
+        topping_rows, category_links = [], []
+        for topping_id in topping_ids:
+            name = f"{rng.choice(TOPPING_STYLES)} {rng.choice(TOPPING_WORDS)}".strip()
+            in_categories = sorted(rng.sample(category_ids, min(len(category_ids), rng.randint(1, 3))))
+            topping_rows.append(versions.stamp(
+                "topping",
+                {"id": topping_id, "name": name, "price": round(rng.uniform(0.5, 3.0), 2)},
+                {"categories": in_categories} if in_categories else None,
+            ))
+            category_links.extend({"topping_id": topping_id, "category_id": c} for c in in_categories)
+        _insert(connection, Topping.__table__, topping_rows, batch_size)
+        _insert(connection, topping_categories, category_links, batch_size)
+
+        # Pizzas with their sizes and toppings
+        all_toppings = connection.execute(select(Topping.id)).scalars().all()
+        first = _next_id(connection, Pizza.__table__)
+        pizza_rows, size_links, topping_links = [], [], []
+        for pizza_id in range(first, first + pizzas):
+            with_sizes = sorted(rng.sample(size_ids, rng.randint(1, len(size_ids)))) if size_ids else []
+            with_toppings = sorted(rng.sample(all_toppings, min(len(all_toppings), rng.randint(1, 6))))
+            adjective = rng.choice(PIZZA_ADJECTIVES)
+            pizza_rows.append(versions.stamp(
+                "pizza",
+                {
+                    "id": pizza_id,
+                    "name": f"{adjective} {rng.choice(TOPPING_WORDS)} #{pizza_id}",
+                    "description": f"A {adjective.lower()} pizza with {len(with_toppings)} toppings",
+                    "image_url": None,
+                    "is_available": rng.random() < 0.9,
+                    "sauce_id": rng.choice(sauce_ids),
+                    "crust_id": rng.choice(crust_ids),
+                },
+                {"sizes": with_sizes, "toppings": with_toppings},
+            ))
+            size_links.extend({"pizza_id": pizza_id, "size_id": s} for s in with_sizes)
+            topping_links.extend({"pizza_id": pizza_id, "topping_id": t} for t in with_toppings)
+        # Links before pizzas: the search index trigger on pizzas then reads
+        # each pizza's topping names once, instead of every link insert
+        # rewriting the pizza's index entry
+        _insert(connection, pizza_sizes, size_links, batch_size)
+        _insert(connection, pizza_toppings, topping_links, batch_size)
+        _insert(connection, Pizza.__table__, pizza_rows, batch_size)
+
+        if versions.log:
+            _insert(connection, CatalogChangeLog.__table__, versions.log, batch_size)
+            connection.execute(update(meta).where(meta.c.id == 1).values(version=versions.next - 1))
+
+        if orders:
+            _generate_orders(connection, rng, orders, now, batch_size)
+
+    return counts
+
+
+def _generate_orders(connection: Connection, rng: random.Random, count: int, now: datetime, batch_size: int) -> None:
+    """Orders for designer pizzas over the last 30 days, priced like services/pricing.py"""
+    sizes = dict(connection.execute(select(Size.id, Size.base_price)).all())
+    sauces = dict(connection.execute(select(Sauce.id, Sauce.price)).all())
+    crusts = dict(connection.execute(select(Crust.id, Crust.price)).all())
+    toppings = dict(connection.execute(select(Topping.id, Topping.price)).all())
+    pizza_ids = connection.execute(select(Pizza.id).where(Pizza.is_available)).scalars().all()
+    if not pizza_ids:
+        return
+    # Orders concentrate on a popular subset, as real ones do
+    popular = rng.sample(pizza_ids, min(len(pizza_ids), 500))
+    chosen = {rng.choice(popular) for _ in range(min(count * 3, 5000))}
+    pizzas = {}
+    for row in connection.execute(select(Pizza.id, Pizza.sauce_id, Pizza.crust_id).where(Pizza.id.in_(chosen))):
+        pizzas[row.id] = (row.sauce_id, row.crust_id, [], [])
+    for pizza_id, size_id in connection.execute(
+        select(pizza_sizes.c.pizza_id, pizza_sizes.c.size_id).where(pizza_sizes.c.pizza_id.in_(chosen))
+    ):
+        pizzas[pizza_id][2].append(size_id)
+    for pizza_id, topping_id in connection.execute(
+        select(pizza_toppings.c.pizza_id, pizza_toppings.c.topping_id).where(pizza_toppings.c.pizza_id.in_(chosen))
+    ):
+        pizzas[pizza_id][3].append(topping_id)
+    menu = sorted(pizza_id for pizza_id, pizza in pizzas.items() if pizza[2])
+    if not menu:
+        return
+
+    order_id = _next_id(connection, Order.__table__)
+    item_id = _next_id(connection, OrderItem.__table__)
+    order_rows, item_rows, extra_rows = [], [], []
+    for _ in range(count):
+        total = 0.0
+        for _ in range(rng.randint(1, 3)):
+            pizza_id = rng.choice(menu)
+            sauce_id, crust_id, with_sizes, with_toppings = pizzas[pizza_id]
+            size_id = rng.choice(with_sizes)
+            extras = rng.sample(list(toppings), 1) if rng.random() < 0.2 else []
+            unit_price = round(
+                sizes[size_id] + sauces.get(sauce_id, 0.0) + crusts.get(crust_id, 0.0)
+                + sum(toppings[t] for t in with_toppings) + sum(toppings[t] for t in extras),
+                2,
+            )
+            quantity = rng.randint(1, 2)
+            total += unit_price * quantity
+            item_rows.append({
+                "id": item_id, "order_id": order_id, "pizza_id": pizza_id, "size_id": size_id,
+                "sauce_id": None, "crust_id": None, "quantity": quantity, "unit_price": unit_price,
+            })
+            extra_rows.extend({"order_item_id": item_id, "topping_id": t} for t in extras)
+            item_id += 1
+        order_rows.append({
+            "id": order_id,
+            "customer_name": f"{rng.choice(CUSTOMER_NAMES)} {rng.randint(1, 9999)}",
+            "status": ORDER_STATUSES[-1] if rng.random() < 0.95 else rng.choice(ORDER_STATUSES),
+            "total": round(total, 2),
+            "created_at": now - timedelta(seconds=rng.randint(0, 30 * 24 * 3600)),
+        })
+        order_id += 1
+    _insert(connection, Order.__table__, order_rows, batch_size)
+    _insert(connection, OrderItem.__table__, item_rows, batch_size)
+    _insert(connection, order_item_toppings, extra_rows, batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", help="SQLite file to fill (default: the app database, ./pizza.db)")
+    parser.add_argument("--pizzas", type=int, default=1000)
+    parser.add_argument("--toppings", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--orders", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=10_000, help="rows per executemany")
+    args = parser.parse_args()
+    if args.categories < 1 and args.toppings:
+        parser.error("toppings need at least one category")
+
+    logging.basicConfig(level=logging.INFO)
+    if args.database:
+        engine = create_engine(f"sqlite:///{args.database}")
+        upgrade_database(engine)
+    else:
+        engine = app_engine
+        init_db()
+
+    started = time.perf_counter()
+    counts = generate(
+        engine, pizzas=args.pizzas, toppings=args.toppings, categories=args.categories,
+        orders=args.orders, seed=args.seed, batch_size=args.batch_size,
+    )
+    logger.info("Added %s in %.1fs", ", ".join(f"{n} {name}" for name, n in counts.items()),
+                time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
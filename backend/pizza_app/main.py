@@ -1,12 +1,29 @@
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from uvicorn import run
 from contextlib import asynccontextmanager
+import asyncio
 import logging
-from pizza_app.router import pizza_route, chat_route
+from pizza_app.router import pizza_route, chat_route, order_route, kitchen_route, metrics_route, admin_route
 from pizza_app.models.pizza_models import init_db
+from pizza_app.database import engine
+from pizza_app.services.topping_index import topping_index
+from pizza_app.services.catalog_snapshot import catalog_snapshot
+from pizza_app.services.similarity import pizza_similarity
+from pizza_app.services.order_intake import order_intake
+from pizza_app.services import catalog_events, catalog_feed, chat_agent, kitchen
+from pizza_app.services.coherence import coherence_probe
+from pizza_app.services.metrics import metrics_registry
+from pizza_app.services.profiler import profiler
+from pizza_app.cache.idempotency import create_store
+from pizza_app.middleware.compression import CompressionMiddleware
+from pizza_app.middleware.coherence import CoherenceMiddleware
+from pizza_app.middleware.idempotency import IdempotencyMiddleware
+from pizza_app.middleware.metrics import MetricsMiddleware
+from pizza_app.middleware.profiler import ProfilerMiddleware
+from pizza_app import settings
+from pizza_app.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 # Configure logging
@@ -22,8 +39,27 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     init_db()
+    with engine.connect() as connection:
+        catalog_events.start(connection)
+        topping_index.rebuild(connection)
+        catalog_snapshot.rebuild(connection)
+        pizza_similarity.load(catalog_snapshot.current)
+        catalog_feed.start(connection, asyncio.get_running_loop())
+        kitchen.start(connection, asyncio.get_running_loop())
+    await order_intake.start()
+    # Rows are scored on use until this finishes (or for good, without numpy)
+    asyncio.get_running_loop().run_in_executor(None, pizza_similarity.precompute)
+    if settings.CHAT_ENABLED and settings.CHAT_PRELOAD:
+        # In the background, so the worker is ready without waiting for it
+        asyncio.get_running_loop().run_in_executor(None, chat_agent.get_agent, "pizza_agent")
+    poller = None
+    if settings.COHERENCE_POLL_INTERVAL_MS:
+        poller = asyncio.create_task(coherence_probe.poll(settings.COHERENCE_POLL_INTERVAL_MS / 1000))
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    if poller is not None:
+        poller.cancel()
+    await order_intake.stop()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -32,19 +68,28 @@ app = FastAPI(lifespan=lifespan)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Log validation errors and return detailed error messages"""
     body = await request.body()
+    # Decode once; the same text is logged and returned
+    text = body.decode('utf-8', errors='replace') if body else None
+    errors = exc.errors()
     logger.error(f"Validation error on {request.method} {request.url.path}")
-    logger.error(f"Request body: {body.decode('utf-8') if body else 'Empty body'}")
-    logger.error(f"Validation errors: {exc.errors()}")
-    return JSONResponse(
+    logger.error(f"Request body: {text if text is not None else 'Empty body'}")
+    logger.error(f"Validation errors: {errors}")
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
-            "detail": exc.errors(),
-            "body": body.decode('utf-8') if body else None
+            "detail": errors,
+            "body": text
         },
     )
 
 app.include_router(pizza_route.router)
-app.include_router(chat_route.router)
+if settings.CHAT_ENABLED:
+    app.include_router(chat_route.router)
+app.include_router(order_route.router)
+app.include_router(kitchen_route.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_route.router)
+app.include_router(admin_route.router)
 # Mount dist directory at /dist so images are accessible at /dist/images/
 # This also serves the React app at /dist/
 # app.mount("/dist", StaticFiles(directory="../frontend/dist", html=True))
@@ -67,6 +112,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Run retried writes once; inside compression, so stored responses are uncompressed
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(IdempotencyMiddleware, store=create_store(), paths=settings.IDEMPOTENCY_PATHS)
+
+# Compress JSON/text responses; images are served as-is
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        content_types=settings.COMPRESSION_CONTENT_TYPES,
+    )
+
+# Profile single requests sent with the admin token in an X-Profile header
+if settings.ADMIN_TOKEN:
+    app.add_middleware(ProfilerMiddleware, profiler=profiler, interval_ms=settings.PROFILER_INTERVAL_MS)
+
+# Pick up changes committed by other worker processes before each request
+app.add_middleware(CoherenceMiddleware, probe=coherence_probe)
+
+# Outermost, so timings include everything above and sizes are bytes on the wire
+if settings.METRICS_ENABLED:
+    app.add_middleware(
+        MetricsMiddleware,
+        registry=metrics_registry,
+        server_timing=settings.METRICS_SERVER_TIMING,
+        slow_request_ms=settings.METRICS_SLOW_REQUEST_MS,
+    )
+
 
 if __name__ == "__main__":
     run("pizza_app.main:app", host="127.0.0.1", reload=True, port=9002)
\ No newline at end of file
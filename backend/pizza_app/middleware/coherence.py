@@ -0,0 +1,20 @@
+"""
+Brings this worker's in-memory state up to date before handling a request
+when another process has changed the database (see services/coherence.py).
+"""
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from pizza_app.services.coherence import CoherenceProbe
+
+
+class CoherenceMiddleware:
+    def __init__(self, app: ASGIApp, probe: CoherenceProbe):
+        self.app = app
+        self.probe = probe
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and self.probe.due():
+            # The probe and any replay do database I/O; keep them off the event loop
+            await run_in_threadpool(self.probe.check)
+        await self.app(scope, receive, send)
@@ -0,0 +1,180 @@
+"""
+Response compression middleware (gzip and, when available, brotli).
+
+Only responses whose media type is in the allow list and whose body is at
+least ``minimum_size`` bytes are compressed. Responses that already carry a
+Content-Encoding (or are images/other binary types) pass through untouched.
+
+Every response of an allowed media type carries ``Vary: Accept-Encoding``,
+compressed or not: a small one, or one sent to a client without gzip/br,
+would otherwise let a shared cache serve the same copy to every client.
+"""
+import gzip
+import zlib
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+def _parse_accept_encoding(header: str) -> dict:
+    """Parse an Accept-Encoding header into {encoding: q-value}"""
+    encodings = {}
+    for part in header.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[name.strip().lower()] = q
+    return encodings
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        # wbits=31 produces a gzip container instead of raw zlib
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        content_types: Iterable[str] = ("application/json",),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = tuple(content_types)
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Pick the best encoding the client accepts, preferring brotli"""
+        accepted = _parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+        best, best_q = None, 0.0
+        for encoding in candidates:
+            q = accepted.get(encoding, wildcard)
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """Wraps ``send`` for a single response and compresses its body if eligible"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send):
+        """encoding: the one to compress with, None if the client accepts none"""
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.stream = None
+        self.passthrough = False
+
+    def _allowed_type(self, headers: Headers) -> bool:
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return media_type in self.middleware.content_types
+
+    def _compress_whole(self, body: bytes) -> bytes:
+        if self.encoding == "br":
+            return brotli.compress(body, quality=self.middleware.brotli_quality)
+        return gzip.compress(body, compresslevel=self.middleware.gzip_level, mtime=0)
+
+    def _new_stream(self):
+        if self.encoding == "br":
+            return _BrotliStream(self.middleware.brotli_quality)
+        return _GzipStream(self.middleware.gzip_level)
+
+    def _set_encoding_headers(self, headers: MutableHeaders) -> None:
+        # Vary was added with the start message
+        headers["Content-Encoding"] = self.encoding
+
+    async def __call__(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = MutableHeaders(raw=message["headers"])
+            allowed = self._allowed_type(headers)
+            if allowed:
+                headers.add_vary_header("Accept-Encoding")
+            self.passthrough = self.encoding is None or not allowed or "content-encoding" in headers
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+
+        if self.stream is None and not more_body:
+            # Whole body in one message: apply the size threshold
+            if len(body) < self.middleware.minimum_size:
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            compressed = self._compress_whole(body)
+            self._set_encoding_headers(headers)
+            headers["Content-Length"] = str(len(compressed))
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        if self.stream is None:
+            # Streaming response: compress incrementally, length is unknown
+            self.stream = self._new_stream()
+            self._set_encoding_headers(headers)
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self.send(self.start_message)
+
+        chunk = self.stream.compress(body)
+        if not more_body:
+            chunk += self.stream.flush()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,157 @@
+"""
+Idempotency-Key support for write requests.
+
+A POST/PUT/PATCH sent with an ``Idempotency-Key`` header runs once; a retry
+with the same key gets the first response replayed from the store (marked
+``Idempotent-Replayed: true``) without running the handler again. Following
+the IETF Idempotency-Key draft, reusing a key for a different request
+(method, path, query or body) is a 422, and a retry that arrives while the
+first request is still running is a 409 to be retried later. Server errors
+are not stored, so their retries run again. Requests without the header are
+untouched.
+"""
+import hashlib
+import logging
+from typing import Iterable, List, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from pizza_app.cache.idempotency import IdempotencyStore, StoredResponse
+from pizza_app.responses import ORJSONResponse
+
+logger = logging.getLogger(__name__)
+
+_METHODS = ("POST", "PUT", "PATCH")
+_MAX_KEY_LENGTH = 255
+
+
+def _fingerprint(scope: Scope, body: bytes) -> bytes:
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body):
+        # Length-prefixed, so parts cannot run into each other
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.digest()
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app: ASGIApp, store: IdempotencyStore, paths: Iterable[str]):
+        """paths: prefixes of the request paths that honour the header"""
+        self.app = app
+        self.store = store
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in _METHODS or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+        key = Headers(scope=scope).get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > _MAX_KEY_LENGTH:
+            await self._error(scope, receive, send, 400, f"Idempotency-Key must be 1 to {_MAX_KEY_LENGTH} characters")
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            # The client went away before sending the whole request
+            return
+        fingerprint = _fingerprint(scope, body)
+        try:
+            stored = await self.store.claim(key, fingerprint)
+        except Exception:
+            # Without the store the request still runs, just without deduplication
+            logger.exception("Idempotency store unavailable; running %s %s", scope["method"], scope["path"])
+            await self.app(scope, _replay_body(body, receive), send)
+            return
+
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                await self._error(scope, receive, send, 422, "Idempotency-Key was already used for a different request")
+            elif stored.pending:
+                await self._error(scope, receive, send, 409, "A request with this Idempotency-Key is still being processed")
+            else:
+                await self._replay(stored, send)
+            return
+
+        recorder = _ResponseRecorder(send)
+        try:
+            await self.app(scope, _replay_body(body, receive), recorder)
+        except BaseException:
+            await self._forget(key)
+            raise
+        if recorder.complete and recorder.status < 500:
+            try:
+                await self.store.save(key, StoredResponse(fingerprint, recorder.status, recorder.headers, recorder.body))
+            except Exception:
+                logger.exception("Could not store the response for an Idempotency-Key")
+        else:
+            await self._forget(key)
+
+    async def _forget(self, key: str) -> None:
+        try:
+            await self.store.release(key)
+        except Exception:
+            # The claim still expires on its own
+            logger.exception("Could not release an Idempotency-Key")
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> Optional[bytes]:
+        chunks: List[bytes] = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _replay(stored: StoredResponse, send: Send) -> None:
+        headers = [*stored.headers, (b"idempotent-replayed", b"true")]
+        await send({"type": "http.response.start", "status": stored.status, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body})
+
+    @staticmethod
+    async def _error(scope: Scope, receive: Receive, send: Send, status_code: int, detail: str) -> None:
+        await ORJSONResponse({"detail": detail}, status_code=status_code)(scope, receive, send)
+
+
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    """A receive that hands the app the already-read body, then defers to ``receive``"""
+    sent = False
+
+    async def wrapped() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return wrapped
+
+
+class _ResponseRecorder:
+    """Passes a response through to ``send`` while keeping a copy of it"""
+
+    def __init__(self, send: Send):
+        self.send = send
+        self.status = 0
+        self.headers: list = []
+        self.chunks: List[bytes] = []
+        self.complete = False
+
+    @property
+    def body(self) -> bytes:
+        return b"".join(self.chunks)
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = list(message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            self.chunks.append(message.get("body", b""))
+            self.complete = not message.get("more_body", False)
+        await self.send(message)
@@ -0,0 +1,80 @@
+"""
+Records duration, database time, query count and response size for every
+HTTP request (see services/metrics.py), adds a Server-Timing header and logs
+requests slower than a threshold.
+
+Event streams (/pizza/changes, /kitchen/events) stay open for as long as the
+client listens, so their duration is the time to the first byte; timing them
+to the end would put every one in the top latency bucket and log it as slow.
+WebSocket connections are not measured at all.
+"""
+import logging
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from pizza_app.services.metrics import MetricsRegistry, begin_request, end_request
+
+logger = logging.getLogger(__name__)
+
+
+def _route_label(scope: Scope) -> str:
+    # The route template, not the raw path, keeps the number of series bounded
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        registry: MetricsRegistry,
+        server_timing: bool = True,
+        slow_request_ms: int = 0,
+    ):
+        """
+        server_timing: add a Server-Timing header (db, total and timed phases)
+        slow_request_ms: log requests taking at least this long; 0 disables it
+        """
+        self.app = app
+        self.registry = registry
+        self.server_timing = server_timing
+        self.slow_request_seconds = slow_request_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = begin_request()
+        status = 500
+        size = 0
+        # Set for event streams, which are measured to their first byte
+        first_byte = None
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, size, first_byte
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if Headers(raw=message.get("headers", [])).get("content-type", "").startswith("text/event-stream"):
+                    first_byte = timings.elapsed()
+                if self.server_timing:
+                    # Headers go out first, so this covers the time to the first byte
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            end_request(token)
+            duration = first_byte if first_byte is not None else timings.elapsed()
+            self.registry.observe(scope["method"], _route_label(scope), status, timings, duration, size)
+            if self.slow_request_seconds and duration >= self.slow_request_seconds:
+                logger.warning(
+                    "Slow request: %s %s -> %s in %.0f ms (db %.0f ms, %d queries, %d bytes)",
+                    scope["method"], scope["path"], status, duration * 1000,
+                    timings.db_seconds * 1000, timings.queries, size,
+                )
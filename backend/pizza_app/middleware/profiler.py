@@ -0,0 +1,57 @@
+"""
+Profiles a single request on demand: when the X-Profile header carries the
+admin token, the request is sampled while it runs (see services/profiler.py)
+and the collapsed stacks are returned instead of its response. The original
+status is reported in X-Profile-Status.
+
+Requests without the header pass straight through.
+"""
+import os
+
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from pizza_app.services.admin import is_admin_token
+from pizza_app.services.profiler import ProfilerBusy, SamplingProfiler
+
+
+class ProfilerMiddleware:
+    def __init__(self, app: ASGIApp, profiler: SamplingProfiler, interval_ms: int = 5):
+        self.app = app
+        self.profiler = profiler
+        self.interval = interval_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "x-profile" not in Headers(scope=scope):
+            await self.app(scope, receive, send)
+            return
+        if not is_admin_token(Headers(scope=scope)["x-profile"]):
+            await PlainTextResponse("Invalid profile token", status_code=403)(scope, receive, send)
+            return
+        try:
+            self.profiler.start(self.interval)
+        except ProfilerBusy as e:
+            await PlainTextResponse(str(e), status_code=409)(scope, receive, send)
+            return
+
+        status = 500
+
+        async def discard_response(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        try:
+            await self.app(scope, receive, discard_response)
+        finally:
+            stacks = self.profiler.stop()
+        response = PlainTextResponse(
+            stacks,
+            headers={
+                "X-Profile-Status": str(status),
+                "X-Profile-Pid": str(os.getpid()),
+                "X-Profile-Samples": str(self.profiler.sample_count),
+            },
+        )
+        await response(scope, receive, send)
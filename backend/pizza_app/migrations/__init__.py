@@ -0,0 +1,80 @@
+"""
+Alembic migrations for the pizza database.
+
+upgrade_database() is called at startup. When the stored revision already
+equals the newest script it returns after a single SELECT, without reflecting
+or touching any table - and without importing Alembic, which alone takes a
+noticeable part of a worker's startup. That check relies on the script naming
+convention: revision IDs are zero-padded numbers and each script file starts
+with its revision ID (0007_something.py).
+"""
+import logging
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(connection: Optional[Connection] = None):
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def head_revision() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def newest_script_revision() -> Optional[str]:
+    """Highest revision ID among the script file names (see the naming convention above)"""
+    revisions = [path.name.split("_", 1)[0] for path in (MIGRATIONS_DIR / "versions").glob("[0-9]*_*.py")]
+    return max(revisions, default=None)
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    """Read the stored revision; None if the database has never been migrated"""
+    try:
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except OperationalError:
+        # No alembic_version table yet
+        connection.rollback()
+        return None
+
+
+def upgrade_database(engine: Engine) -> None:
+    """Bring the database schema up to the newest revision"""
+    with engine.connect() as connection:
+        current = current_revision(connection)
+        if current is not None and current == newest_script_revision():
+            return
+
+        from alembic import command
+
+        head = head_revision()
+        if current == head:
+            return
+
+        config = alembic_config(connection)
+        if current is None and inspect(connection).has_table("pizzas"):
+            # Created by create_all() before migrations existed: the baseline
+            # tables are already there, so record them rather than recreate them
+            logger.info("Stamping existing database at baseline revision %s", BASELINE_REVISION)
+            command.stamp(config, BASELINE_REVISION)
+            connection.commit()
+
+        logger.info("Upgrading database schema from %s to %s", current, head)
+        command.upgrade(config, "head")
+        connection.commit()
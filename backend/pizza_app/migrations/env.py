@@ -0,0 +1,71 @@
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from pizza_app.database import Base, DATABASE_URL
+from pizza_app.models import pizza_models, order_models  # noqa: F401  (registers tables on Base.metadata)
+
+config = context.config
+target_metadata = Base.metadata
+
+# Tables created with raw SQL in migrations (not mapped models), including the
+# FTS5 shadow tables SQLite creates for them; autogenerate must not drop them
+UNMANAGED_TABLE_PREFIXES = ("pizza_search",)
+
+
+def include_name(name, type_, parent_names):
+    if type_ == "table":
+        return not name.startswith(UNMANAGED_TABLE_PREFIXES)
+    return True
+
+
+def _configure(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        # SQLite cannot ALTER most things in place; batch mode rebuilds the
+        # table (copy, swap, re-index) inside the migration's transaction
+        render_as_batch=True,
+        # One short transaction per revision instead of one for the whole
+        # upgrade, so readers are only blocked for a single step at a time
+        transaction_per_migration=True,
+    )
+
+
+def run_migrations_offline():
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url") or DATABASE_URL,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    # The app passes its own connection in (see upgrade_database); the alembic
+    # CLI does not, so fall back to a fresh engine for the configured URL
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = engine_from_config(
+        {"sqlalchemy.url": config.get_main_option("sqlalchemy.url") or DATABASE_URL},
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with engine.connect() as connection:
+        _configure(connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
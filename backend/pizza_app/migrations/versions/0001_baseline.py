@@ -0,0 +1,125 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Matches the schema that Base.metadata.create_all() produced before migrations
+were introduced. Existing databases without an alembic_version table are
+stamped at this revision instead of running it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sizes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('size', sa.String(), nullable=False),
+        sa.Column('base_price', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_sizes_id', 'sizes', ['id'])
+
+    op.create_table(
+        'sauces',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_sauces_id', 'sauces', ['id'])
+
+    op.create_table(
+        'crusts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_crusts_id', 'crusts', ['id'])
+
+    op.create_table(
+        'topping_categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_topping_categories_id', 'topping_categories', ['id'])
+
+    op.create_table(
+        'toppings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_toppings_id', 'toppings', ['id'])
+
+    op.create_table(
+        'topping_categories_link',
+        sa.Column('topping_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['topping_id'], ['toppings.id']),
+        sa.ForeignKeyConstraint(['category_id'], ['topping_categories.id']),
+        sa.PrimaryKeyConstraint('topping_id', 'category_id'),
+    )
+
+    op.create_table(
+        'pizzas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column('is_available', sa.Boolean(), nullable=True),
+        sa.Column('sauce_id', sa.Integer(), nullable=True),
+        sa.Column('crust_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['sauce_id'], ['sauces.id']),
+        sa.ForeignKeyConstraint(['crust_id'], ['crusts.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_pizzas_id', 'pizzas', ['id'])
+
+    op.create_table(
+        'pizza_sizes',
+        sa.Column('pizza_id', sa.Integer(), nullable=False),
+        sa.Column('size_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['pizza_id'], ['pizzas.id']),
+        sa.ForeignKeyConstraint(['size_id'], ['sizes.id']),
+        sa.PrimaryKeyConstraint('pizza_id', 'size_id'),
+    )
+
+    op.create_table(
+        'pizza_toppings',
+        sa.Column('pizza_id', sa.Integer(), nullable=False),
+        sa.Column('topping_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['pizza_id'], ['pizzas.id']),
+        sa.ForeignKeyConstraint(['topping_id'], ['toppings.id']),
+        sa.PrimaryKeyConstraint('pizza_id', 'topping_id'),
+    )
+
+
+def downgrade():
+    op.drop_table('pizza_toppings')
+    op.drop_table('pizza_sizes')
+    op.drop_index('ix_pizzas_id', table_name='pizzas')
+    op.drop_table('pizzas')
+    op.drop_table('topping_categories_link')
+    op.drop_index('ix_toppings_id', table_name='toppings')
+    op.drop_table('toppings')
+    op.drop_index('ix_topping_categories_id', table_name='topping_categories')
+    op.drop_table('topping_categories')
+    op.drop_index('ix_crusts_id', table_name='crusts')
+    op.drop_table('crusts')
+    op.drop_index('ix_sauces_id', table_name='sauces')
+    op.drop_table('sauces')
+    op.drop_index('ix_sizes_id', table_name='sizes')
+    op.drop_table('sizes')
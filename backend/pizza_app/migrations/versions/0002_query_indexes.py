@@ -0,0 +1,38 @@
+"""indexes for router query patterns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+Foreign keys, filter/sort columns and the reverse direction of each
+association table. if_not_exists because databases started between the
+index change and the introduction of migrations already have them.
+"""
+from alembic import op
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_pizzas_sauce_id', 'pizzas', ['sauce_id']),
+    ('ix_pizzas_crust_id', 'pizzas', ['crust_id']),
+    ('ix_pizzas_is_available', 'pizzas', ['is_available']),
+    ('ix_toppings_name', 'toppings', ['name']),
+    ('ix_topping_categories_name', 'topping_categories', ['name']),
+    ('ix_pizza_sizes_size_id', 'pizza_sizes', ['size_id', 'pizza_id']),
+    ('ix_pizza_toppings_topping_id', 'pizza_toppings', ['topping_id', 'pizza_id']),
+    ('ix_topping_categories_link_category_id', 'topping_categories_link', ['category_id', 'topping_id']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
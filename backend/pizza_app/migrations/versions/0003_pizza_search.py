@@ -0,0 +1,86 @@
+"""full-text search index over pizzas
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+An FTS5 table keyed by pizza id (rowid) holding the pizza name, description
+and the names of its toppings. Triggers keep it in step with pizzas,
+pizza_toppings and toppings, so every write path (ORM handlers, bulk inserts,
+manual SQL) updates the index incrementally inside its own transaction.
+"""
+from alembic import op
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# Space separated topping names for one pizza
+TOPPING_NAMES = """
+    COALESCE((SELECT group_concat(t.name, ' ')
+              FROM pizza_toppings pt JOIN toppings t ON t.id = pt.topping_id
+              WHERE pt.pizza_id = {pizza_id}), '')
+"""
+
+TRIGGERS = {
+    'pizza_search_pizza_insert': f"""
+        CREATE TRIGGER pizza_search_pizza_insert AFTER INSERT ON pizzas BEGIN
+            INSERT INTO pizza_search (rowid, name, description, toppings)
+            VALUES (new.id, new.name, COALESCE(new.description, ''), {TOPPING_NAMES.format(pizza_id='new.id')});
+        END
+    """,
+    'pizza_search_pizza_update': """
+        CREATE TRIGGER pizza_search_pizza_update AFTER UPDATE OF name, description ON pizzas BEGIN
+            UPDATE pizza_search SET name = new.name, description = COALESCE(new.description, '')
+            WHERE rowid = new.id;
+        END
+    """,
+    'pizza_search_pizza_delete': """
+        CREATE TRIGGER pizza_search_pizza_delete AFTER DELETE ON pizzas BEGIN
+            DELETE FROM pizza_search WHERE rowid = old.id;
+        END
+    """,
+    'pizza_search_link_insert': f"""
+        CREATE TRIGGER pizza_search_link_insert AFTER INSERT ON pizza_toppings BEGIN
+            UPDATE pizza_search SET toppings = {TOPPING_NAMES.format(pizza_id='new.pizza_id')}
+            WHERE rowid = new.pizza_id;
+        END
+    """,
+    'pizza_search_link_delete': f"""
+        CREATE TRIGGER pizza_search_link_delete AFTER DELETE ON pizza_toppings BEGIN
+            UPDATE pizza_search SET toppings = {TOPPING_NAMES.format(pizza_id='old.pizza_id')}
+            WHERE rowid = old.pizza_id;
+        END
+    """,
+    'pizza_search_topping_rename': f"""
+        CREATE TRIGGER pizza_search_topping_rename AFTER UPDATE OF name ON toppings BEGIN
+            UPDATE pizza_search SET toppings = {TOPPING_NAMES.format(pizza_id='pizza_search.rowid')}
+            WHERE rowid IN (SELECT pizza_id FROM pizza_toppings WHERE topping_id = new.id);
+        END
+    """,
+}
+
+
+def upgrade():
+    op.execute("""
+        CREATE VIRTUAL TABLE pizza_search USING fts5(
+            name, description, toppings,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    """)
+    op.execute(f"""
+        INSERT INTO pizza_search (rowid, name, description, toppings)
+        SELECT id, name, COALESCE(description, ''), {TOPPING_NAMES.format(pizza_id='pizzas.id')}
+        FROM pizzas
+    """)
+    for sql in TRIGGERS.values():
+        op.execute(sql)
+
+
+def downgrade():
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS pizza_search")
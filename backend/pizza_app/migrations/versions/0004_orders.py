@@ -0,0 +1,65 @@
+"""orders and order items
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'orders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_name', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('total', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_orders_status', 'orders', ['status'])
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'])
+
+    op.create_table(
+        'order_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('pizza_id', sa.Integer(), nullable=True),
+        sa.Column('size_id', sa.Integer(), nullable=False),
+        sa.Column('sauce_id', sa.Integer(), nullable=True),
+        sa.Column('crust_id', sa.Integer(), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id']),
+        sa.ForeignKeyConstraint(['pizza_id'], ['pizzas.id']),
+        sa.ForeignKeyConstraint(['size_id'], ['sizes.id']),
+        sa.ForeignKeyConstraint(['sauce_id'], ['sauces.id']),
+        sa.ForeignKeyConstraint(['crust_id'], ['crusts.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'])
+
+    op.create_table(
+        'order_item_toppings',
+        sa.Column('order_item_id', sa.Integer(), nullable=False),
+        sa.Column('topping_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['order_item_id'], ['order_items.id']),
+        sa.ForeignKeyConstraint(['topping_id'], ['toppings.id']),
+        sa.PrimaryKeyConstraint('order_item_id', 'topping_id'),
+    )
+
+
+def downgrade():
+    op.drop_table('order_item_toppings')
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_table('order_items')
+    op.drop_index('ix_orders_created_at', table_name='orders')
+    op.drop_index('ix_orders_status', table_name='orders')
+    op.drop_table('orders')
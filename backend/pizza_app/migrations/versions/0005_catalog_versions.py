@@ -0,0 +1,59 @@
+"""catalog versions and change log for delta sync
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Existing rows all start at version 1, so a client syncing from version 0
+receives the whole catalog.
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+CATALOG_TABLES = ['sizes', 'sauces', 'crusts', 'topping_categories', 'toppings', 'pizzas']
+
+
+def upgrade():
+    now = datetime.now(timezone.utc)
+    for table in CATALOG_TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(sa.table(table, sa.column('version'), sa.column('updated_at')).update().values(version=1, updated_at=now))
+        op.create_index(f'ix_{table}_version', table, ['version'])
+
+    catalog_meta = op.create_table(
+        'catalog_meta',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.bulk_insert(catalog_meta, [{'id': 1, 'version': 1}])
+
+    op.create_table(
+        'catalog_changes',
+        sa.Column('version', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('op', sa.String(), nullable=False),
+        sa.Column('links', sa.JSON(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('version'),
+    )
+
+
+def downgrade():
+    op.drop_table('catalog_changes')
+    op.drop_table('catalog_meta')
+    for table in reversed(CATALOG_TABLES):
+        op.drop_index(f'ix_{table}_version', table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
+            batch_op.drop_column('version')
@@ -0,0 +1,90 @@
+# pizza_app/models/order_models.py
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    Column, Integer, String, Float, DateTime, Text,
+    Table, ForeignKey, TypeDecorator
+)
+from sqlalchemy.orm import relationship
+from pizza_app.database import Base
+
+# Kitchen workflow, in order
+ORDER_STATUSES = ("received", "baking", "ready")
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    A UTC timestamp. SQLite stores no offset, so values are written as naive
+    UTC and read back as aware UTC; an order's created_at then serializes the
+    same way whether it was just created or loaded from the database.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+
+# ----------------------
+# Association Tables (Many-to-Many)
+# ----------------------
+order_item_toppings = Table(
+    'order_item_toppings',
+    Base.metadata,
+    Column('order_item_id', ForeignKey('order_items.id'), primary_key=True),
+    Column('topping_id', ForeignKey('toppings.id'), primary_key=True)
+)
+
+# ----------------------
+# Tables
+# ----------------------
+class Order(Base):
+    __tablename__ = 'orders'
+    id = Column(Integer, primary_key=True)
+    customer_name = Column(String, nullable=True)
+    status = Column(String, nullable=False, default=ORDER_STATUSES[0], index=True)
+    total = Column(Float, nullable=False)
+    created_at = Column(UTCDateTime, nullable=False, default=lambda: datetime.now(timezone.utc), index=True)
+
+    items = relationship('OrderItem', back_populates='order', cascade='all, delete-orphan')
+
+
+class OrderItem(Base):
+    """
+    One line of an order: either a designer pizza (pizza_id, optionally with
+    extra toppings) or a build-your-own pizza (sauce_id, crust_id, toppings).
+    """
+    __tablename__ = 'order_items'
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey('orders.id'), nullable=False, index=True)
+    pizza_id = Column(Integer, ForeignKey('pizzas.id'), nullable=True)
+    size_id = Column(Integer, ForeignKey('sizes.id'), nullable=False)
+    sauce_id = Column(Integer, ForeignKey('sauces.id'), nullable=True)
+    crust_id = Column(Integer, ForeignKey('crusts.id'), nullable=True)
+    quantity = Column(Integer, nullable=False, default=1)
+    # Priced from the catalog when the order was placed
+    unit_price = Column(Float, nullable=False)
+
+    order = relationship('Order', back_populates='items')
+    toppings = relationship('Topping', secondary=order_item_toppings)
+
+
+class KitchenEvent(Base):
+    """
+    Order events for the kitchen screens, numbered in commit order. Written
+    in the same transaction as the order change so every worker process can
+    replay events it did not publish itself; only a recent backlog is kept.
+    """
+    __tablename__ = 'kitchen_events'
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String, nullable=False)
+    order_id = Column(Integer, ForeignKey('orders.id'), nullable=False)
+    # The order as sent to the screens (Order schema JSON)
+    payload = Column(Text, nullable=False)
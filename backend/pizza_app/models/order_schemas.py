@@ -0,0 +1,55 @@
+# pizza_app/models/order_schemas.py
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+# ----------------------
+# Order Item Schemas
+# ----------------------
+class OrderItemCreate(BaseModel):
+    """A designer pizza (pizza_id) or a build-your-own pizza (sauce_id + crust_id)"""
+    pizza_id: Optional[int] = None
+    size_id: int
+    sauce_id: Optional[int] = None
+    crust_id: Optional[int] = None
+    # Extra toppings for a designer pizza, or all toppings for build-your-own
+    topping_ids: List[int] = []
+    quantity: int = Field(1, ge=1, le=100)
+
+class OrderItem(BaseModel):
+    id: int
+    pizza_id: Optional[int] = None
+    size_id: int
+    sauce_id: Optional[int] = None
+    crust_id: Optional[int] = None
+    topping_ids: List[int] = []
+    quantity: int
+    unit_price: float
+
+
+# ----------------------
+# Order Schemas
+# ----------------------
+class OrderCreate(BaseModel):
+    customer_name: Optional[str] = None
+    items: List[OrderItemCreate] = Field(..., min_length=1)
+
+class Order(BaseModel):
+    id: int
+    customer_name: Optional[str] = None
+    status: str
+    total: float
+    created_at: datetime
+    items: List[OrderItem] = []
+
+class OrderStatusUpdate(BaseModel):
+    status: Literal["received", "baking", "ready"]
+
+
+# ----------------------
+# Kitchen Schemas
+# ----------------------
+class KitchenQueue(BaseModel):
+    """Open orders plus the feed position to resume events from"""
+    last_event_id: int
+    orders: List[Order] = []
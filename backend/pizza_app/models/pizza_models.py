@@ -1,7 +1,7 @@
 # pizza_app/models/pizza_models.py
 from sqlalchemy import (
-    Column, Integer, String, Float, Boolean,
-    Table, ForeignKey
+    Column, Integer, String, Float, Boolean, DateTime, JSON,
+    Table, ForeignKey, Index
 )
 from sqlalchemy.orm import relationship
 from pizza_app.database import Base, engine
@@ -13,27 +13,42 @@ pizza_sizes = Table(
     'pizza_sizes',
     Base.metadata,
     Column('pizza_id', ForeignKey('pizzas.id'), primary_key=True),
-    Column('size_id', ForeignKey('sizes.id'), primary_key=True)
+    Column('size_id', ForeignKey('sizes.id'), primary_key=True),
+    # Reverse lookup: pizzas offered in a given size
+    Index('ix_pizza_sizes_size_id', 'size_id', 'pizza_id')
 )
 
 pizza_toppings = Table(
     'pizza_toppings',
     Base.metadata,
     Column('pizza_id', ForeignKey('pizzas.id'), primary_key=True),
-    Column('topping_id', ForeignKey('toppings.id'), primary_key=True)
+    Column('topping_id', ForeignKey('toppings.id'), primary_key=True),
+    # Reverse lookup: pizzas containing a given topping
+    Index('ix_pizza_toppings_topping_id', 'topping_id', 'pizza_id')
 )
 
 topping_categories = Table(
     'topping_categories_link',  # link table for many-to-many Topping <-> Category
     Base.metadata,
     Column('topping_id', ForeignKey('toppings.id'), primary_key=True),
-    Column('category_id', ForeignKey('topping_categories.id'), primary_key=True)
+    Column('category_id', ForeignKey('topping_categories.id'), primary_key=True),
+    # Reverse lookup: toppings in a given category
+    Index('ix_topping_categories_link_category_id', 'category_id', 'topping_id')
 )
 
 # ----------------------
 # Tables
 # ----------------------
-class Size(Base):
+class Versioned:
+    """
+    Catalog version of the row's last change (see catalog_events), so sync
+    clients can fetch only rows changed since the version they last saw.
+    """
+    version = Column(Integer, nullable=False, default=0, server_default='0', index=True)
+    updated_at = Column(DateTime, nullable=True)
+
+
+class Size(Versioned, Base):
     __tablename__ = 'sizes'
     id = Column(Integer, primary_key=True, index=True)
     size = Column(String, nullable=False)
@@ -42,7 +57,7 @@ class Size(Base):
     pizzas = relationship('Pizza', secondary=pizza_sizes, back_populates='sizes')
 
 
-class Sauce(Base):
+class Sauce(Versioned, Base):
     __tablename__ = 'sauces'
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -51,7 +66,7 @@ class Sauce(Base):
     pizzas = relationship('Pizza', back_populates='sauce')
 
 
-class Crust(Base):
+class Crust(Versioned, Base):
     __tablename__ = 'crusts'
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -60,46 +75,70 @@ class Crust(Base):
     pizzas = relationship('Pizza', back_populates='crust')
 
 
-class ToppingCategory(Base):
+class ToppingCategory(Versioned, Base):
     __tablename__ = 'topping_categories'
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     description = Column(String, nullable=True)
 
     toppings = relationship('Topping', secondary=topping_categories, back_populates='categories')
 
 
-class Topping(Base):
+class Topping(Versioned, Base):
     __tablename__ = 'toppings'
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     price = Column(Float, nullable=False)
 
     categories = relationship('ToppingCategory', secondary=topping_categories, back_populates='toppings')
     pizzas = relationship('Pizza', secondary=pizza_toppings, back_populates='toppings')
 
 
-class Pizza(Base):
+class Pizza(Versioned, Base):
     __tablename__ = 'pizzas'
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     image_url = Column(String, nullable=True)
-    is_available = Column(Boolean, default=True)
+    is_available = Column(Boolean, default=True, index=True)
 
     # Relationships
     sizes = relationship('Size', secondary=pizza_sizes, back_populates='pizzas')
     toppings = relationship('Topping', secondary=pizza_toppings, back_populates='pizzas')
 
-    sauce_id = Column(Integer, ForeignKey('sauces.id'))
+    sauce_id = Column(Integer, ForeignKey('sauces.id'), index=True)
     sauce = relationship('Sauce', back_populates='pizzas')
 
-    crust_id = Column(Integer, ForeignKey('crusts.id'))
+    crust_id = Column(Integer, ForeignKey('crusts.id'), index=True)
     crust = relationship('Crust', back_populates='pizzas')
 
 
+class CatalogMeta(Base):
+    """Single row (id 1) holding the current catalog version"""
+    __tablename__ = 'catalog_meta'
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class CatalogChangeLog(Base):
+    """
+    One row per committed catalog change, numbered by catalog version.
+    Deletions are the tombstones delta sync reports to clients.
+    """
+    __tablename__ = 'catalog_changes'
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)
+    # Current IDs of owned relationships that changed, e.g. {"toppings": [1, 4]}
+    links = Column(JSON, nullable=True)
+    changed_at = Column(DateTime, nullable=False)
+
+
 # ----------------------
-# Create tables
+# Create / migrate tables
 # ----------------------
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    # Schema changes are versioned Alembic migrations (pizza_app/migrations)
+    from pizza_app.migrations import upgrade_database
+    upgrade_database(engine)
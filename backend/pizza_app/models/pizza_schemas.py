@@ -1,6 +1,6 @@
 # pizza_app/models/schemas.py
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # ----------------------
 # Size Schemas
@@ -149,3 +149,119 @@ class Pizza(PizzaBase):
 
     class Config:
         from_attributes = True
+
+
+# ----------------------
+# Menu Graph Schemas
+# ----------------------
+# Normalized alternative to List[Pizza]: every size, sauce, crust, topping and
+# category is serialized once (keyed by ID) and pizzas reference them by ID.
+class ToppingNode(ToppingBase):
+    id: int
+    category_ids: List[int] = []
+
+class PizzaNode(PizzaBase):
+    id: int
+    size_ids: List[int] = []
+    # Required, as on Pizza: a sauce or crust in use cannot be deleted
+    sauce_id: int
+    crust_id: int
+    topping_ids: List[int] = []
+
+class MenuGraph(BaseModel):
+    sizes: Dict[int, Size] = {}
+    sauces: Dict[int, Sauce] = {}
+    crusts: Dict[int, Crust] = {}
+    toppings: Dict[int, ToppingNode] = {}
+    topping_categories: Dict[int, ToppingCategory] = {}
+    pizzas: List[PizzaNode] = []
+
+
+# ----------------------
+# Search Schemas
+# ----------------------
+class PriceRange(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+class PizzaSearchFacets(BaseModel):
+    """Match counts over the whole result set, keyed by ID (or availability)"""
+    categories: Dict[int, int] = {}
+    sauces: Dict[int, int] = {}
+    crusts: Dict[int, int] = {}
+    availability: Dict[bool, int] = {}
+    price: PriceRange = PriceRange()
+
+class PizzaSearchResults(BaseModel):
+    total: int
+    pizzas: List[Pizza] = []
+    facets: PizzaSearchFacets = PizzaSearchFacets()
+
+
+# ----------------------
+# Builder Schemas
+# ----------------------
+class BuiltPizza(BaseModel):
+    """A build-your-own pizza; order it with these IDs and no pizza_id"""
+    size: Size
+    sauce: Sauce
+    crust: Crust
+    toppings: List[Topping] = []
+    price: float
+    # Jaccard similarity of the toppings to like_pizza_id's, when ranking by it
+    similarity: Optional[float] = None
+
+class PizzaBuilderResults(BaseModel):
+    pizzas: List[BuiltPizza] = []
+    # Partial combinations the search visited
+    explored: int = 0
+
+
+# ----------------------
+# Similar Pizza Schemas
+# ----------------------
+class SimilarPizza(BaseModel):
+    pizza: Pizza
+    # Jaccard similarity of the two pizzas' toppings, sauce and crust
+    similarity: float
+
+
+# ----------------------
+# Multi-get Schemas
+# ----------------------
+class CatalogBatch(BaseModel):
+    """Lookups by ID; each list is in the order requested, with null for IDs not found"""
+    sizes: List[Optional[Size]] = []
+    sauces: List[Optional[Sauce]] = []
+    crusts: List[Optional[Crust]] = []
+    toppings: List[Optional[Topping]] = []
+    topping_categories: List[Optional[ToppingCategory]] = []
+    pizzas: List[Optional[Pizza]] = []
+
+
+# ----------------------
+# Delta Sync Schemas
+# ----------------------
+class Tombstone(BaseModel):
+    """A catalog row deleted after the requested version"""
+    entity: str
+    id: int
+    version: int
+
+class CatalogSync(BaseModel):
+    """
+    Catalog rows created or updated after the requested version, and
+    tombstones for deleted ones. Apply deletions first, then upserts; drop
+    references to deleted IDs (e.g. a pizza's topping_ids) as well.
+    """
+    version: int
+    # True when the client's version is unknown to the server; discard the
+    # local copy and replace it with this (complete) result
+    reset: bool = False
+    sizes: List[Size] = []
+    sauces: List[Sauce] = []
+    crusts: List[Crust] = []
+    toppings: List[ToppingNode] = []
+    topping_categories: List[ToppingCategory] = []
+    pizzas: List[PizzaNode] = []
+    deleted: List[Tombstone] = []
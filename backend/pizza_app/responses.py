@@ -0,0 +1,27 @@
+"""
+JSON response class for handlers that return plain dicts and lists.
+
+Endpoints with a response_model are already serialized straight to bytes by
+Pydantic (FastAPI's fast path), which beats any response class - and setting
+a default response class on the app would switch that path off. So this is
+not the app default; it is for the responses built by hand (exception
+handlers, stats, image endpoints), where it replaces json.dumps with orjson.
+orjson is optional; without it this behaves like JSONResponse.
+"""
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        # default=str mirrors jsonable_encoder for odd values such as the
+        # exceptions inside validation error contexts
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
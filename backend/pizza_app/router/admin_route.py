@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+import asyncio
+import logging
+import os
+from pizza_app import settings
+from pizza_app.services.admin import require_admin
+from pizza_app.services.profiler import ProfilerBusy, profiler
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+################################################################################
+# POST requests
+################################################################################
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(5, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    interval_ms: int = Query(settings.PROFILER_INTERVAL_MS, ge=1, le=1000),
+):
+    """
+    Sample every thread of the worker serving this request for ``seconds``
+    and return collapsed stacks (flamegraph.pl / speedscope input).
+
+    Each worker process is profiled separately; the X-Profile-Pid header
+    tells which one answered. To profile a single request instead, send it
+    with the admin token in an X-Profile header.
+    """
+    try:
+        profiler.start(interval_ms / 1000)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stacks = profiler.stop()
+    logger.info(f"Profiled worker {os.getpid()} for {seconds}s ({profiler.sample_count} samples)")
+    return PlainTextResponse(
+        stacks,
+        headers={"X-Profile-Pid": str(os.getpid()), "X-Profile-Samples": str(profiler.sample_count)},
+    )
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, Header, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload
+from typing import Optional
+import logging
+from pizza_app import settings
+from pizza_app.database import get_db
+from pizza_app.models.order_models import ORDER_STATUSES, Order as OrderModel, OrderItem as OrderItemModel
+from pizza_app.models.order_schemas import KitchenQueue
+from pizza_app.services.broadcast import IDLE, RESET, sse_events
+from pizza_app.services.kitchen import kitchen_feed
+from pizza_app.services.order_intake import order_to_schema
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/kitchen", tags=["kitchen"])
+
+################################################################################
+# GET requests
+################################################################################
+
+@router.get("/queue", response_model=KitchenQueue)
+def get_kitchen_queue(db: Session = Depends(get_db)):
+    """
+    Orders not yet ready, oldest first. Subscribe to the event stream with
+    ``since=last_event_id`` to receive everything that happens afterwards.
+    """
+    # Read the position first: an event racing with the query is delivered
+    # again rather than lost
+    last_event_id = kitchen_feed.last_seq
+    orders = (
+        db.query(OrderModel)
+        .options(selectinload(OrderModel.items).selectinload(OrderItemModel.toppings))
+        .filter(OrderModel.status != ORDER_STATUSES[-1])
+        .order_by(OrderModel.id)
+        .all()
+    )
+    return KitchenQueue(last_event_id=last_event_id, orders=[order_to_schema(order) for order in orders])
+
+@router.get("/events")
+async def stream_kitchen_events(
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[int] = Header(None),
+):
+    """
+    Server-Sent Events stream of order events for kitchen screens.
+
+    Browsers reconnect with the Last-Event-ID header automatically; a
+    ``reset`` event means events were missed and the queue should be reloaded.
+    """
+    after = last_event_id if last_event_id is not None else since
+    return StreamingResponse(
+        sse_events(kitchen_feed, after, settings.KITCHEN_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+################################################################################
+# WebSocket
+################################################################################
+
+@router.websocket("/ws")
+async def kitchen_websocket(websocket: WebSocket, since: Optional[int] = Query(None, ge=0)):
+    """
+    WebSocket stream of order events: one JSON message per event,
+    ``{"id": ..., "type": ..., "order": {...}}``.
+    """
+    await websocket.accept()
+    try:
+        async for seq, event in kitchen_feed.listen(since, idle_timeout=settings.KITCHEN_HEARTBEAT_SECONDS):
+            if event == IDLE:
+                await websocket.send_text(f'{{"id": {seq}, "type": "keep-alive"}}')
+            elif event == RESET:
+                await websocket.send_text(f'{{"id": {seq}, "type": "reset"}}')
+            else:
+                event_type, data = event
+                await websocket.send_text(f'{{"id": {seq}, "type": "{event_type}", "order": {data}}}')
+    except WebSocketDisconnect:
+        logger.info("Kitchen screen disconnected")
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, selectinload
+from typing import List
+import logging
+from pizza_app.database import get_db
+from pizza_app.models.order_models import Order as OrderModel, OrderItem as OrderItemModel
+from pizza_app.models.order_schemas import Order, OrderCreate, OrderStatusUpdate
+from pizza_app.services.order_intake import order_intake, order_to_schema
+from pizza_app.services.kitchen import STATUS_CHANGED, change_status, publish_events, record_event
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/orders", tags=["orders"])
+
+################################################################################
+# GET requests
+################################################################################
+
+@router.get("/", response_model=List[Order])
+def get_orders(
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Get the most recent orders, newest first"""
+    orders = (
+        db.query(OrderModel)
+        .options(selectinload(OrderModel.items).selectinload(OrderItemModel.toppings))
+        .order_by(OrderModel.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [order_to_schema(order) for order in orders]
+
+@router.get("/{order_id}", response_model=Order)
+def get_order(order_id: int, db: Session = Depends(get_db)):
+    """Get a specific order by ID"""
+    order = db.query(OrderModel).filter(OrderModel.id == order_id).first()
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order_to_schema(order)
+
+################################################################################
+# POST requests
+################################################################################
+
+@router.post("/", response_model=Order, status_code=201)
+async def add_order(order: OrderCreate):
+    """
+    Place an order. Items are priced on the server from the current catalog;
+    the order is committed together with other orders arriving at the same time.
+    """
+    return await order_intake.submit(order)
+
+################################################################################
+# PATCH requests
+################################################################################
+
+@router.patch("/{order_id}/status", response_model=Order)
+def update_order_status(order_id: int, update: OrderStatusUpdate, db: Session = Depends(get_db)):
+    """Advance an order to its next kitchen status and notify the kitchen screens"""
+    order = order_to_schema(change_status(db, order_id, update.status))
+    event = record_event(db, STATUS_CHANGED, order)
+    db.commit()
+    publish_events([event])
+    return order
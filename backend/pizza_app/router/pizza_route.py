@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, select
-from typing import List
+from typing import List, Optional
 import logging
 import os
 import shutil
 from pathlib import Path
+from pizza_app import settings
+from pizza_app.cache.cache import cache_stats
+from pizza_app.cache.catalog import cached_response, coalesced_response, snapshot_response
 from pizza_app.database import get_db
+from pizza_app.responses import ORJSONResponse
+from pizza_app.services.broadcast import sse_events
+from pizza_app.services.builder import BuilderConstraints, build_pizzas
+from pizza_app.services.catalog_feed import catalog_feed
+from pizza_app.services.catalog_sync import changes_since
+from pizza_app.services.catalog_snapshot import CatalogSnapshot, catalog_snapshot
+from pizza_app.services.pizza_serialization import SnapshotSchemas
+from pizza_app.services.references import resolve_references
+from pizza_app.services.search import search_pizzas
+from pizza_app.services.similarity import NEIGHBOURS, pizza_similarity
+from pizza_app.services.topping_index import topping_index
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -18,10 +31,10 @@ from pizza_app.models.pizza_models import (
     Crust as CrustModel, 
     Topping as ToppingModel, 
     ToppingCategory as ToppingCategoryModel,
-    topping_categories
 )
 from pizza_app.models.pizza_schemas import (
-    Pizza, Size, Sauce, Crust, Topping, ToppingCategory,
+    Pizza, Size, Sauce, Crust, Topping, ToppingCategory, MenuGraph, CatalogSync,
+    PizzaSearchResults, PizzaSearchFacets, PriceRange, PizzaBuilderResults, SimilarPizza, CatalogBatch,
     PizzaCreate, PizzaUpdate, SizeCreate, SizeUpdate, SauceCreate, SauceUpdate,
     CrustCreate, CrustUpdate, ToppingCreate, ToppingUpdate,
     ToppingCategoryCreate, ToppingCategoryUpdate
@@ -34,125 +47,392 @@ router = APIRouter(prefix="/pizza", tags=["pizza"])
 ################################################################################
 
 @router.get("/get_designer_pizzas", response_model=List[Pizza])
-async def get_designer_pizzas(db: Session = Depends(get_db)):
+async def get_designer_pizzas():
     """Get all designer pizzas"""
-    pizzas = db.query(PizzaModel).all()
-    return pizzas
+    def build(snapshot: CatalogSnapshot):
+        return SnapshotSchemas(snapshot).pizzas(snapshot.pizzas)
+    return await snapshot_response("designer_pizzas", List[Pizza], build)
 
 @router.get("/get_designer_pizza/{pizza_id}", response_model=Pizza)
-async def get_designer_pizza(pizza_id: int, db: Session = Depends(get_db)):
+async def get_designer_pizza(pizza_id: int):
     """Get a specific designer pizza by ID"""
-    pizza = db.query(PizzaModel).filter(PizzaModel.id == pizza_id).first()
-    if not pizza:
-        raise HTTPException(status_code=404, detail="Pizza not found")
-    return pizza
+    def build(snapshot: CatalogSnapshot):
+        if pizza_id not in snapshot.pizzas:
+            raise HTTPException(status_code=404, detail="Pizza not found")
+        return SnapshotSchemas(snapshot).pizza(pizza_id)
+    return await snapshot_response(f"pizza:{pizza_id}", Pizza, build)
+
+@router.get("/get_designer_pizzas_graph", response_model=MenuGraph)
+async def get_designer_pizzas_graph():
+    """
+    Get all designer pizzas as a normalized menu graph.
+
+    Sizes, sauces, crusts, toppings and categories are returned once, keyed by ID,
+    and each pizza references them by ID instead of embedding full copies.
+    """
+    def build(snapshot: CatalogSnapshot):
+        # Snapshot records have the node fields, relations included as ID tuples
+        pizzas = list(snapshot.pizzas.values())
+        size_ids = {size_id for p in pizzas for size_id in p.size_ids}
+        sauce_ids = {p.sauce_id for p in pizzas}
+        crust_ids = {p.crust_id for p in pizzas}
+        topping_ids = {topping_id for p in pizzas for topping_id in p.topping_ids}
+        toppings = {t.id: t for t in snapshot.toppings.values() if t.id in topping_ids}
+        category_ids = {category_id for t in toppings.values() for category_id in t.category_ids}
+        return {
+            "sizes": {s.id: s for s in snapshot.sizes.values() if s.id in size_ids},
+            "sauces": {s.id: s for s in snapshot.sauces.values() if s.id in sauce_ids},
+            "crusts": {c.id: c for c in snapshot.crusts.values() if c.id in crust_ids},
+            "toppings": toppings,
+            "topping_categories": {c.id: c for c in snapshot.categories.values() if c.id in category_ids},
+            "pizzas": pizzas,
+        }
+    return await snapshot_response("menu_graph", MenuGraph, build)
 
 @router.get("/get_pizza_sizes", response_model=List[Size])
-async def get_pizza_sizes(db: Session = Depends(get_db)):
+async def get_pizza_sizes():
     """Get all pizza sizes"""
-    sizes = db.query(SizeModel).all()
-    return sizes
+    def build(snapshot: CatalogSnapshot):
+        return list(snapshot.sizes.values())
+    return await snapshot_response("sizes", List[Size], build)
 
 @router.get("/get_pizza_size/{size_id}", response_model=Size)
-async def get_pizza_size(size_id: int, db: Session = Depends(get_db)):
+async def get_pizza_size(size_id: int):
     """Get a specific pizza size by ID"""
-    size = db.query(SizeModel).filter(SizeModel.id == size_id).first()
-    if not size:
-        raise HTTPException(status_code=404, detail="Size not found")
-    return size
+    def build(snapshot: CatalogSnapshot):
+        size = snapshot.sizes.get(size_id)
+        if not size:
+            raise HTTPException(status_code=404, detail="Size not found")
+        return size
+    return await snapshot_response(f"size:{size_id}", Size, build)
 
 @router.get("/get_pizza_sauces", response_model=List[Sauce])
-async def get_pizza_sauces(db: Session = Depends(get_db)):
+async def get_pizza_sauces():
     """Get all pizza sauces"""
-    sauces = db.query(SauceModel).all()
-    return sauces
+    def build(snapshot: CatalogSnapshot):
+        return list(snapshot.sauces.values())
+    return await snapshot_response("sauces", List[Sauce], build)
 
 @router.get("/get_pizza_sauce/{sauce_id}", response_model=Sauce)
-async def get_pizza_sauce(sauce_id: int, db: Session = Depends(get_db)):
+async def get_pizza_sauce(sauce_id: int):
     """Get a specific pizza sauce by ID"""
-    sauce = db.query(SauceModel).filter(SauceModel.id == sauce_id).first()
-    if not sauce:
-        raise HTTPException(status_code=404, detail="Sauce not found")
-    return sauce
+    def build(snapshot: CatalogSnapshot):
+        sauce = snapshot.sauces.get(sauce_id)
+        if not sauce:
+            raise HTTPException(status_code=404, detail="Sauce not found")
+        return sauce
+    return await snapshot_response(f"sauce:{sauce_id}", Sauce, build)
 
 @router.get("/get_pizza_crusts", response_model=List[Crust])
-async def get_pizza_crusts(db: Session = Depends(get_db)):
+async def get_pizza_crusts():
     """Get all pizza crusts"""
-    crusts = db.query(CrustModel).all()
-    return crusts
+    def build(snapshot: CatalogSnapshot):
+        return list(snapshot.crusts.values())
+    return await snapshot_response("crusts", List[Crust], build)
 
 @router.get("/get_pizza_crust/{crust_id}", response_model=Crust)
-async def get_pizza_crust(crust_id: int, db: Session = Depends(get_db)):
+async def get_pizza_crust(crust_id: int):
     """Get a specific pizza crust by ID"""
-    crust = db.query(CrustModel).filter(CrustModel.id == crust_id).first()
-    if not crust:
-        raise HTTPException(status_code=404, detail="Crust not found")
-    return crust
+    def build(snapshot: CatalogSnapshot):
+        crust = snapshot.crusts.get(crust_id)
+        if not crust:
+            raise HTTPException(status_code=404, detail="Crust not found")
+        return crust
+    return await snapshot_response(f"crust:{crust_id}", Crust, build)
 
 @router.get("/get_pizza_toppings", response_model=List[Topping])
-async def get_pizza_toppings(db: Session = Depends(get_db)):
+async def get_pizza_toppings():
     """Get all pizza toppings, ordered by their first category name (alphabetically)"""
-    
-    # Subquery to get the minimum (first alphabetically) category name for each topping
-    # This allows us to group/order toppings by their primary category
-    min_category_name = (
-        select(func.min(ToppingCategoryModel.name))
-        .select_from(ToppingCategoryModel)
-        .join(
-            topping_categories,
-            ToppingCategoryModel.id == topping_categories.c.category_id
-        )
-        .where(topping_categories.c.topping_id == ToppingModel.id)
-        .correlate(ToppingModel)
-        .scalar_subquery()
-    )
-    
-    # Query toppings ordered by their first category name, then by topping name
-    # nulls_last() ensures toppings without categories appear at the end
-    toppings = (
-        db.query(ToppingModel)
-        .order_by(min_category_name.nulls_last(), ToppingModel.name)
-        .all()
-    )
-    
-    return toppings
+    def build(snapshot: CatalogSnapshot):
+        # Group toppings by their primary (first alphabetically) category name,
+        # then by topping name; toppings without categories go last
+        def order(topping):
+            names = [snapshot.categories[category_id].name for category_id in topping.category_ids]
+            return (not names, min(names, default=""), topping.name)
+
+        schemas = SnapshotSchemas(snapshot)
+        return [schemas.topping(t.id) for t in sorted(snapshot.toppings.values(), key=order)]
+    return await snapshot_response("toppings", List[Topping], build)
 
 @router.get("/get_pizza_topping/{topping_id}", response_model=Topping)
-async def get_pizza_topping(topping_id: int, db: Session = Depends(get_db)):
+async def get_pizza_topping(topping_id: int):
     """Get a specific pizza topping by ID"""
-    topping = db.query(ToppingModel).filter(ToppingModel.id == topping_id).first()
-    if not topping:
-        raise HTTPException(status_code=404, detail="Topping not found")
-    return topping
+    def build(snapshot: CatalogSnapshot):
+        if topping_id not in snapshot.toppings:
+            raise HTTPException(status_code=404, detail="Topping not found")
+        return SnapshotSchemas(snapshot).topping(topping_id)
+    return await snapshot_response(f"topping:{topping_id}", Topping, build)
 
 @router.get("/get_pizza_topping_categories", response_model=List[ToppingCategory])
-async def get_pizza_topping_categories(db: Session = Depends(get_db)):
+async def get_pizza_topping_categories():
     """Get all topping categories"""
-    categories = db.query(ToppingCategoryModel).all()
-    return categories
+    def build(snapshot: CatalogSnapshot):
+        return list(snapshot.categories.values())
+    return await snapshot_response("topping_categories", List[ToppingCategory], build)
 
 @router.get("/get_pizza_topping_category/{category_id}", response_model=ToppingCategory)
-async def get_pizza_topping_category(category_id: int, db: Session = Depends(get_db)):
+async def get_pizza_topping_category(category_id: int):
     """Get a specific pizza topping category by ID"""
-    category = db.query(ToppingCategoryModel).filter(ToppingCategoryModel.id == category_id).first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Topping category not found")
-    return category
+    def build(snapshot: CatalogSnapshot):
+        category = snapshot.categories.get(category_id)
+        if not category:
+            raise HTTPException(status_code=404, detail="Topping category not found")
+        return category
+    return await snapshot_response(f"topping_category:{category_id}", ToppingCategory, build)
+
+# Multi-get: several IDs per request, answered in the order asked with null
+# for IDs that do not exist (instead of one request and a 404 per ID)
+MAX_BATCH_IDS = 200
+
+# CatalogBatch field -> (snapshot attribute, schema builder)
+_BATCH_KINDS = {
+    "sizes": ("sizes", SnapshotSchemas.size),
+    "sauces": ("sauces", SnapshotSchemas.sauce),
+    "crusts": ("crusts", SnapshotSchemas.crust),
+    "toppings": ("toppings", SnapshotSchemas.topping),
+    "topping_categories": ("categories", SnapshotSchemas.category),
+    "pizzas": ("pizzas", SnapshotSchemas.pizza),
+}
+
+def _parse_ids(value: Optional[str], name: str) -> List[int]:
+    """IDs from a comma-separated query parameter, e.g. "1,2,3" """
+    if not value:
+        return []
+    try:
+        ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"{name} must be comma-separated integer IDs")
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_IDS} IDs can be requested in {name}")
+    return ids
+
+def _lookup(snapshot: CatalogSnapshot, schemas: SnapshotSchemas, kind: str, ids: List[int]) -> list:
+    attribute, build = _BATCH_KINDS[kind]
+    table = getattr(snapshot, attribute)
+    return [build(schemas, entity_id) if entity_id in table else None for entity_id in ids]
+
+async def _multi_get(kind: str, ids: str, response_type):
+    requested = _parse_ids(ids, "ids")
+    def build(snapshot: CatalogSnapshot):
+        return _lookup(snapshot, SnapshotSchemas(snapshot), kind, requested)
+    return await snapshot_response(f"{kind}:ids:{requested}", response_type, build)
+
+IDS_QUERY = Query(..., description="Comma-separated IDs, e.g. 1,2,3")
+
+@router.get("/sizes", response_model=List[Optional[Size]])
+async def get_sizes_by_ids(ids: str = IDS_QUERY):
+    """Get several pizza sizes by ID, in the order given (null for IDs not found)"""
+    return await _multi_get("sizes", ids, List[Optional[Size]])
+
+@router.get("/sauces", response_model=List[Optional[Sauce]])
+async def get_sauces_by_ids(ids: str = IDS_QUERY):
+    """Get several pizza sauces by ID, in the order given (null for IDs not found)"""
+    return await _multi_get("sauces", ids, List[Optional[Sauce]])
+
+@router.get("/crusts", response_model=List[Optional[Crust]])
+async def get_crusts_by_ids(ids: str = IDS_QUERY):
+    """Get several pizza crusts by ID, in the order given (null for IDs not found)"""
+    return await _multi_get("crusts", ids, List[Optional[Crust]])
+
+@router.get("/toppings", response_model=List[Optional[Topping]])
+async def get_toppings_by_ids(ids: str = IDS_QUERY):
+    """Get several pizza toppings by ID, in the order given (null for IDs not found)"""
+    return await _multi_get("toppings", ids, List[Optional[Topping]])
+
+@router.get("/topping_categories", response_model=List[Optional[ToppingCategory]])
+async def get_topping_categories_by_ids(ids: str = IDS_QUERY):
+    """Get several topping categories by ID, in the order given (null for IDs not found)"""
+    return await _multi_get("topping_categories", ids, List[Optional[ToppingCategory]])
+
+@router.get("/pizzas", response_model=List[Optional[Pizza]])
+async def get_pizzas_by_ids(ids: str = IDS_QUERY):
+    """Get several designer pizzas by ID, in the order given (null for IDs not found)"""
+    return await _multi_get("pizzas", ids, List[Optional[Pizza]])
+
+@router.get("/batch", response_model=CatalogBatch)
+async def get_batch(
+    sizes: Optional[str] = Query(None, description="Comma-separated size IDs"),
+    sauces: Optional[str] = Query(None, description="Comma-separated sauce IDs"),
+    crusts: Optional[str] = Query(None, description="Comma-separated crust IDs"),
+    toppings: Optional[str] = Query(None, description="Comma-separated topping IDs"),
+    topping_categories: Optional[str] = Query(None, description="Comma-separated topping category IDs"),
+    pizzas: Optional[str] = Query(None, description="Comma-separated designer pizza IDs")
+):
+    """
+    Look up several kinds of catalog entity by ID in one request, all from
+    the same catalog version. Each list is in the order given, with null
+    for IDs not found; kinds not asked for are empty.
+    """
+    requested = {
+        kind: _parse_ids(value, kind)
+        for kind, value in (
+            ("sizes", sizes), ("sauces", sauces), ("crusts", crusts), ("toppings", toppings),
+            ("topping_categories", topping_categories), ("pizzas", pizzas),
+        )
+    }
+    def build(snapshot: CatalogSnapshot):
+        schemas = SnapshotSchemas(snapshot)
+        return CatalogBatch(**{kind: _lookup(snapshot, schemas, kind, ids) for kind, ids in requested.items()})
+    return await snapshot_response(f"batch:{requested}", CatalogBatch, build)
+
+@router.get("/search", response_model=PizzaSearchResults)
+async def search(
+    q: Optional[str] = Query(None, description="Words to match in pizza names, descriptions and topping names"),
+    category_id: Optional[List[int]] = Query(None, description="Pizzas with a topping in any of these categories"),
+    sauce_id: Optional[int] = None,
+    crust_id: Optional[int] = None,
+    is_available: Optional[bool] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Search designer pizzas by text, with category/sauce/crust/availability/price facets"""
+    def load(db: Session):
+        result = search_pizzas(
+            db, q=q, category_ids=category_id, sauce_id=sauce_id, crust_id=crust_id,
+            is_available=is_available, min_price=min_price, max_price=max_price,
+            limit=limit, offset=offset,
+        )
+        snapshot = catalog_snapshot.current
+        return PizzaSearchResults(
+            total=result.total,
+            # Keep the ranked order from the search. A pizza committed after
+            # the snapshot was taken is left out rather than loaded here.
+            pizzas=SnapshotSchemas(snapshot).pizzas(
+                pizza_id for pizza_id in result.pizza_ids if pizza_id in snapshot.pizzas
+            ),
+            facets=PizzaSearchFacets(
+                categories=result.categories,
+                sauces=result.sauces,
+                crusts=result.crusts,
+                availability=result.availability,
+                price=PriceRange(min=result.min_price, max=result.max_price),
+            ),
+        )
+    return await cached_response(
+        f"search:{(q, category_id, sauce_id, crust_id, is_available, min_price, max_price, limit, offset)}",
+        PizzaSearchResults, load,
+    )
+
+@router.get("/filter", response_model=List[Pizza])
+async def filter_pizzas(
+    topping_id: List[int] = Query([], description="Pizzas must have all of these toppings"),
+    exclude_topping_id: List[int] = Query([], description="Pizzas must have none of these toppings"),
+    category_id: List[int] = Query([], description="Pizzas must have a topping from each of these categories"),
+    exclude_category_id: List[int] = Query([], description="Pizzas must have no topping from these categories")
+):
+    """Filter designer pizzas by included/excluded toppings and topping categories (e.g. "no meat")"""
+    def build(snapshot: CatalogSnapshot):
+        pizza_ids = topping_index.filter_pizzas(
+            include_toppings=topping_id,
+            exclude_toppings=exclude_topping_id,
+            include_categories=category_id,
+            exclude_categories=exclude_category_id,
+        )
+        return SnapshotSchemas(snapshot).pizzas(pizza_id for pizza_id in pizza_ids if pizza_id in snapshot.pizzas)
+    return await snapshot_response(
+        f"filter:{(topping_id, exclude_topping_id, category_id, exclude_category_id)}", List[Pizza], build
+    )
+
+@router.get("/builder", response_model=PizzaBuilderResults)
+async def build_pizza(
+    size_id: Optional[int] = Query(None, description="Size to build in (default: any)"),
+    sauce_id: Optional[int] = Query(None, description="Sauce to use (default: any)"),
+    crust_id: Optional[int] = Query(None, description="Crust to use (default: any)"),
+    budget: Optional[float] = Query(None, gt=0, description="Highest acceptable price"),
+    min_toppings: int = Query(1, ge=0, le=10),
+    max_toppings: int = Query(5, ge=0, le=10),
+    topping_id: List[int] = Query([], description="Toppings the pizza must have"),
+    exclude_topping_id: List[int] = Query([], description="Toppings the pizza must not have"),
+    category_id: List[int] = Query([], description="The pizza needs a topping from each of these categories"),
+    exclude_category_id: List[int] = Query([], description="The pizza must have no topping from these categories"),
+    like_pizza_id: Optional[int] = Query(None, description="Rank by similarity to this designer pizza instead of by price"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """
+    Suggest build-your-own pizzas (size, sauce, crust and toppings) that meet
+    the constraints: the cheapest ones, or the ones with toppings most like
+    ``like_pizza_id``'s (on that pizza's sauce, crust and cheapest size
+    unless given).
+    """
+    constraints = BuilderConstraints(
+        size_id=size_id, sauce_id=sauce_id, crust_id=crust_id, budget=budget,
+        min_toppings=min_toppings, max_toppings=max_toppings,
+        topping_ids=tuple(topping_id), exclude_topping_ids=tuple(exclude_topping_id),
+        category_ids=tuple(category_id), exclude_category_ids=tuple(exclude_category_id),
+    )
+    def build(snapshot: CatalogSnapshot):
+        return build_pizzas(snapshot, constraints, like_pizza_id, limit)
+    return await snapshot_response(f"builder:{(constraints, like_pizza_id, limit)}", PizzaBuilderResults, build)
+
+@router.get("/sync", response_model=CatalogSync)
+async def sync_catalog(
+    since: int = Query(0, ge=0, description="Catalog version the client is current to (0 for everything)"),
+):
+    """
+    Everything created, updated or deleted after catalog version ``since``.
+    Store the returned ``version`` and pass it as ``since`` on the next sync
+    (or to /pizza/changes to follow changes live).
+    """
+    def load(db: Session):
+        return changes_since(db, since)
+    return await coalesced_response(f"sync:{since}", CatalogSync, load)
+
+@router.get("/changes")
+async def stream_catalog_changes(
+    since: Optional[int] = Query(None, ge=0, description="Last catalog version the client has applied"),
+    last_event_id: Optional[int] = Header(None),
+):
+    """
+    Server-Sent Events stream of catalog changes, one ``catalog_change`` event
+    per created, updated or deleted entity: {entity, id, op, version, links}.
+
+    Without ``since`` only changes from now on are sent. A ``reset`` event
+    means the requested version is no longer in the change log; catch up
+    with /pizza/sync and reconnect from the version it returns.
+    """
+    after = last_event_id if last_event_id is not None else since
+    return StreamingResponse(
+        sse_events(catalog_feed, after, settings.CATALOG_FEED_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/cache_stats", response_class=ORJSONResponse)
+async def get_cache_stats():
+    """Hit/miss counters and hit ratio for each cache in this worker process"""
+    return cache_stats()
+
+@router.get("/{pizza_id}/similar", response_model=List[SimilarPizza])
+async def get_similar_pizzas(pizza_id: int, limit: int = Query(10, ge=1, le=NEIGHBOURS)):
+    """Available designer pizzas most like this one ("customers also like"), most similar first"""
+    def build(snapshot: CatalogSnapshot):
+        if pizza_id not in snapshot.pizzas:
+            raise HTTPException(status_code=404, detail="Pizza not found")
+        schemas = SnapshotSchemas(snapshot)
+        return [
+            SimilarPizza(pizza=schemas.pizza(neighbour_id), similarity=round(similarity, 4))
+            for neighbour_id, similarity in pizza_similarity.neighbours(pizza_id, limit)
+            if neighbour_id in snapshot.pizzas
+        ]
+    return await snapshot_response(f"similar:{pizza_id}:{limit}", List[SimilarPizza], build)
 
 @router.get("/{pizza_id}", response_model=Pizza)
-async def get_pizza(pizza_id: int, db: Session = Depends(get_db)):
+async def get_pizza(pizza_id: int):
     """Get a specific pizza by ID"""
-    pizza = db.query(PizzaModel).filter(PizzaModel.id == pizza_id).first()
-    if not pizza:
-        raise HTTPException(status_code=404, detail="Pizza not found")
-    return pizza
+    def build(snapshot: CatalogSnapshot):
+        if pizza_id not in snapshot.pizzas:
+            raise HTTPException(status_code=404, detail="Pizza not found")
+        return SnapshotSchemas(snapshot).pizza(pizza_id)
+    return await snapshot_response(f"pizza:{pizza_id}", Pizza, build)
 
 ################################################################################
 # POST requests
 ################################################################################
 
 @router.post("/add_size", response_model=Size, status_code=201)
-async def add_size(size: SizeCreate, db: Session = Depends(get_db)):
+def add_size(size: SizeCreate, db: Session = Depends(get_db)):
     """Add a new pizza size"""
     # Use model_dump() for Pydantic v2, fallback to dict() for v1
     size_data = size.model_dump() if hasattr(size, 'model_dump') else size.dict()
@@ -163,7 +443,7 @@ async def add_size(size: SizeCreate, db: Session = Depends(get_db)):
     return db_size
 
 @router.post("/add_sauce", response_model=Sauce, status_code=201)
-async def add_sauce(sauce: SauceCreate, db: Session = Depends(get_db)):
+def add_sauce(sauce: SauceCreate, db: Session = Depends(get_db)):
     """Add a new sauce"""
     # Use model_dump() for Pydantic v2, fallback to dict() for v1
     sauce_data = sauce.model_dump() if hasattr(sauce, 'model_dump') else sauce.dict()
@@ -174,7 +454,7 @@ async def add_sauce(sauce: SauceCreate, db: Session = Depends(get_db)):
     return db_sauce
 
 @router.post("/add_crust", response_model=Crust, status_code=201)
-async def add_crust(crust: CrustCreate, db: Session = Depends(get_db)):
+def add_crust(crust: CrustCreate, db: Session = Depends(get_db)):
     """Add a new crust"""
     # Use model_dump() for Pydantic v2, fallback to dict() for v1
     crust_data = crust.model_dump() if hasattr(crust, 'model_dump') else crust.dict()
@@ -185,33 +465,23 @@ async def add_crust(crust: CrustCreate, db: Session = Depends(get_db)):
     return db_crust
 
 @router.post("/add_topping", response_model=Topping, status_code=201)
-async def add_topping(topping: ToppingCreate, db: Session = Depends(get_db)):
+def add_topping(topping: ToppingCreate, db: Session = Depends(get_db)):
     """Add a new topping"""
     # Validate that all category IDs exist
-    categories = db.query(ToppingCategoryModel).filter(
-        ToppingCategoryModel.id.in_(topping.category_ids)
-    ).all()
-    
-    if len(categories) != len(topping.category_ids):
-        found_ids = {cat.id for cat in categories}
-        missing_ids = set(topping.category_ids) - found_ids
-        raise HTTPException(
-            status_code=404, 
-            detail=f"Topping category IDs not found: {list(missing_ids)}"
-        )
+    refs = resolve_references(db, category_ids=topping.category_ids)
     
     db_topping = ToppingModel(
         name=topping.name,
         price=topping.price
     )
-    db_topping.categories = categories
+    db_topping.categories = refs.categories
     db.add(db_topping)
     db.commit()
     db.refresh(db_topping)
     return db_topping
 
 @router.post("/add_pizza_topping_category", response_model=ToppingCategory, status_code=201)
-async def add_pizza_topping_category(
+def add_pizza_topping_category(
     topping_category: ToppingCategoryCreate, 
     db: Session = Depends(get_db)
 ):
@@ -225,45 +495,27 @@ async def add_pizza_topping_category(
     return db_category
 
 @router.post("/add_pizza", response_model=Pizza, status_code=201)
-async def add_pizza(pizza: PizzaCreate, db: Session = Depends(get_db)):
+def add_pizza(pizza: PizzaCreate, db: Session = Depends(get_db)):
     """Add a new designer pizza"""
     # Validate all related objects exist
-    sizes = db.query(SizeModel).filter(SizeModel.id.in_(pizza.size_ids)).all()
-    if len(sizes) != len(pizza.size_ids):
-        found_ids = {s.id for s in sizes}
-        missing_ids = set(pizza.size_ids) - found_ids
-        raise HTTPException(
-            status_code=404, 
-            detail=f"Size IDs not found: {list(missing_ids)}"
-        )
-    
-    sauce = db.query(SauceModel).filter(SauceModel.id == pizza.sauce_id).first()
-    if not sauce:
-        raise HTTPException(status_code=404, detail=f"Sauce ID {pizza.sauce_id} not found")
-    
-    crust = db.query(CrustModel).filter(CrustModel.id == pizza.crust_id).first()
-    if not crust:
-        raise HTTPException(status_code=404, detail=f"Crust ID {pizza.crust_id} not found")
-    
-    toppings = db.query(ToppingModel).filter(ToppingModel.id.in_(pizza.topping_ids)).all()
-    if len(toppings) != len(pizza.topping_ids):
-        found_ids = {t.id for t in toppings}
-        missing_ids = set(pizza.topping_ids) - found_ids
-        raise HTTPException(
-            status_code=404, 
-            detail=f"Topping IDs not found: {list(missing_ids)}"
-        )
+    refs = resolve_references(
+        db,
+        size_ids=pizza.size_ids,
+        sauce_id=pizza.sauce_id,
+        crust_id=pizza.crust_id,
+        topping_ids=pizza.topping_ids,
+    )
     
     db_pizza = PizzaModel(
         name=pizza.name,
         description=pizza.description,
         image_url=pizza.image_url,
         is_available=pizza.is_available,
-        sauce_id=sauce.id,
-        crust_id=crust.id
+        sauce_id=pizza.sauce_id,
+        crust_id=pizza.crust_id
     )
-    db_pizza.sizes = sizes
-    db_pizza.toppings = toppings
+    db_pizza.sizes = refs.sizes
+    db_pizza.toppings = refs.toppings
     
     db.add(db_pizza)
     db.commit()
@@ -274,8 +526,11 @@ async def add_pizza(pizza: PizzaCreate, db: Session = Depends(get_db)):
 # PUT/PATCH requests (Updates)
 ################################################################################
 
+# PATCH fields that may be left out but not set to null
+_REQUIRED_REFERENCES = ("size_ids", "sauce_id", "crust_id", "topping_ids")
+
 @router.patch("/update_pizza/{pizza_id}", response_model=Pizza)
-async def update_pizza(
+def update_pizza(
     pizza_id: int, 
     pizza_update: PizzaUpdate, 
     db: Session = Depends(get_db)
@@ -290,6 +545,11 @@ async def update_pizza(
         k: v for k, v in pizza_update.dict().items() if v is not None
     }
     
+    # A pizza always has a sauce and a crust, and null is not an empty list
+    nulls = [name for name in _REQUIRED_REFERENCES if name in update_data and update_data[name] is None]
+    if nulls:
+        raise HTTPException(status_code=422, detail=f"{', '.join(nulls)} cannot be null")
+
     # Update simple fields if provided
     if "name" in update_data:
         db_pizza.name = update_data["name"]
@@ -300,56 +560,29 @@ async def update_pizza(
     if "is_available" in update_data:
         db_pizza.is_available = update_data["is_available"]
     
-    # Update sauce if provided
+    # Validate every provided reference in one pass (None means "not provided")
+    refs = resolve_references(
+        db,
+        size_ids=update_data.get("size_ids"),
+        sauce_id=update_data.get("sauce_id"),
+        crust_id=update_data.get("crust_id"),
+        topping_ids=update_data.get("topping_ids"),
+    )
     if "sauce_id" in update_data:
-        sauce = db.query(SauceModel).filter(SauceModel.id == update_data["sauce_id"]).first()
-        if not sauce:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Sauce ID {update_data['sauce_id']} not found"
-            )
-        db_pizza.sauce_id = sauce.id
-    
-    # Update crust if provided
+        db_pizza.sauce_id = update_data["sauce_id"]
     if "crust_id" in update_data:
-        crust = db.query(CrustModel).filter(CrustModel.id == update_data["crust_id"]).first()
-        if not crust:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Crust ID {update_data['crust_id']} not found"
-            )
-        db_pizza.crust_id = crust.id
-    
-    # Update sizes if provided
+        db_pizza.crust_id = update_data["crust_id"]
     if "size_ids" in update_data:
-        sizes = db.query(SizeModel).filter(SizeModel.id.in_(update_data["size_ids"])).all()
-        if len(sizes) != len(update_data["size_ids"]):
-            found_ids = {s.id for s in sizes}
-            missing_ids = set(update_data["size_ids"]) - found_ids
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Size IDs not found: {list(missing_ids)}"
-            )
-        db_pizza.sizes = sizes
-    
-    # Update toppings if provided
+        db_pizza.sizes = refs.sizes
     if "topping_ids" in update_data:
-        toppings = db.query(ToppingModel).filter(ToppingModel.id.in_(update_data["topping_ids"])).all()
-        if len(toppings) != len(update_data["topping_ids"]):
-            found_ids = {t.id for t in toppings}
-            missing_ids = set(update_data["topping_ids"]) - found_ids
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Topping IDs not found: {list(missing_ids)}"
-            )
-        db_pizza.toppings = toppings
+        db_pizza.toppings = refs.toppings
     
     db.commit()
     db.refresh(db_pizza)
     return db_pizza
 
 @router.put("/update_pizza/{pizza_id}", response_model=Pizza)
-async def update_pizza_full(
+def update_pizza_full(
     pizza_id: int, 
     pizza: PizzaCreate, 
     db: Session = Depends(get_db)
@@ -365,41 +598,23 @@ async def update_pizza_full(
         raise HTTPException(status_code=404, detail="Pizza not found")
     
     # Validate all related objects exist
-    sizes = db.query(SizeModel).filter(SizeModel.id.in_(pizza.size_ids)).all()
-    if len(sizes) != len(pizza.size_ids):
-        found_ids = {s.id for s in sizes}
-        missing_ids = set(pizza.size_ids) - found_ids
-        raise HTTPException(
-            status_code=404, 
-            detail=f"Size IDs not found: {list(missing_ids)}"
-        )
-    
-    sauce = db.query(SauceModel).filter(SauceModel.id == pizza.sauce_id).first()
-    if not sauce:
-        raise HTTPException(status_code=404, detail=f"Sauce ID {pizza.sauce_id} not found")
-    
-    crust = db.query(CrustModel).filter(CrustModel.id == pizza.crust_id).first()
-    if not crust:
-        raise HTTPException(status_code=404, detail=f"Crust ID {pizza.crust_id} not found")
-    
-    toppings = db.query(ToppingModel).filter(ToppingModel.id.in_(pizza.topping_ids)).all()
-    if len(toppings) != len(pizza.topping_ids):
-        found_ids = {t.id for t in toppings}
-        missing_ids = set(pizza.topping_ids) - found_ids
-        raise HTTPException(
-            status_code=404, 
-            detail=f"Topping IDs not found: {list(missing_ids)}"
-        )
+    refs = resolve_references(
+        db,
+        size_ids=pizza.size_ids,
+        sauce_id=pizza.sauce_id,
+        crust_id=pizza.crust_id,
+        topping_ids=pizza.topping_ids,
+    )
     
     # Update all pizza fields
     db_pizza.name = pizza.name
     db_pizza.description = pizza.description
     db_pizza.image_url = pizza.image_url
     db_pizza.is_available = pizza.is_available
-    db_pizza.sauce_id = sauce.id
-    db_pizza.crust_id = crust.id
-    db_pizza.sizes = sizes
-    db_pizza.toppings = toppings
+    db_pizza.sauce_id = pizza.sauce_id
+    db_pizza.crust_id = pizza.crust_id
+    db_pizza.sizes = refs.sizes
+    db_pizza.toppings = refs.toppings
     
     db.commit()
     db.refresh(db_pizza)
@@ -407,7 +622,7 @@ async def update_pizza_full(
 
 # Size Updates
 @router.patch("/update_size/{size_id}", response_model=Size)
-async def update_size(
+def update_size(
     size_id: int,
     size_update: SizeUpdate,
     db: Session = Depends(get_db)
@@ -431,7 +646,7 @@ async def update_size(
     return db_size
 
 @router.put("/update_size/{size_id}", response_model=Size)
-async def update_size_full(
+def update_size_full(
     size_id: int,
     size: SizeCreate,
     db: Session = Depends(get_db)
@@ -451,7 +666,7 @@ async def update_size_full(
 
 # Sauce Updates
 @router.patch("/update_sauce/{sauce_id}", response_model=Sauce)
-async def update_sauce(
+def update_sauce(
     sauce_id: int,
     sauce_update: SauceUpdate,
     db: Session = Depends(get_db)
@@ -475,7 +690,7 @@ async def update_sauce(
     return db_sauce
 
 @router.put("/update_sauce/{sauce_id}", response_model=Sauce)
-async def update_sauce_full(
+def update_sauce_full(
     sauce_id: int,
     sauce: SauceCreate,
     db: Session = Depends(get_db)
@@ -495,7 +710,7 @@ async def update_sauce_full(
 
 # Crust Updates
 @router.patch("/update_crust/{crust_id}", response_model=Crust)
-async def update_crust(
+def update_crust(
     crust_id: int,
     crust_update: CrustUpdate,
     db: Session = Depends(get_db)
@@ -519,7 +734,7 @@ async def update_crust(
     return db_crust
 
 @router.put("/update_crust/{crust_id}", response_model=Crust)
-async def update_crust_full(
+def update_crust_full(
     crust_id: int,
     crust: CrustCreate,
     db: Session = Depends(get_db)
@@ -539,7 +754,7 @@ async def update_crust_full(
 
 # Topping Category Updates
 @router.patch("/update_pizza_topping_category/{category_id}", response_model=ToppingCategory)
-async def update_pizza_topping_category(
+def update_pizza_topping_category(
     category_id: int,
     category_update: ToppingCategoryUpdate,
     db: Session = Depends(get_db)
@@ -563,7 +778,7 @@ async def update_pizza_topping_category(
     return db_category
 
 @router.put("/update_pizza_topping_category/{category_id}", response_model=ToppingCategory)
-async def update_pizza_topping_category_full(
+def update_pizza_topping_category_full(
     category_id: int,
     category: ToppingCategoryCreate,
     db: Session = Depends(get_db)
@@ -583,7 +798,7 @@ async def update_pizza_topping_category_full(
 
 # Topping Updates
 @router.patch("/update_topping/{topping_id}", response_model=Topping)
-async def update_topping(
+def update_topping(
     topping_id: int,
     topping_update: ToppingUpdate,
     db: Session = Depends(get_db)
@@ -602,24 +817,15 @@ async def update_topping(
     if "price" in update_data:
         db_topping.price = update_data["price"]
     if "category_ids" in update_data:
-        categories = db.query(ToppingCategoryModel).filter(
-            ToppingCategoryModel.id.in_(update_data["category_ids"])
-        ).all()
-        if len(categories) != len(update_data["category_ids"]):
-            found_ids = {cat.id for cat in categories}
-            missing_ids = set(update_data["category_ids"]) - found_ids
-            raise HTTPException(
-                status_code=404,
-                detail=f"Topping category IDs not found: {list(missing_ids)}"
-            )
-        db_topping.categories = categories
+        refs = resolve_references(db, category_ids=update_data["category_ids"])
+        db_topping.categories = refs.categories
     
     db.commit()
     db.refresh(db_topping)
     return db_topping
 
 @router.put("/update_topping/{topping_id}", response_model=Topping)
-async def update_topping_full(
+def update_topping_full(
     topping_id: int,
     topping: ToppingCreate,
     db: Session = Depends(get_db)
@@ -630,20 +836,11 @@ async def update_topping_full(
         raise HTTPException(status_code=404, detail="Topping not found")
     
     # Validate categories exist
-    categories = db.query(ToppingCategoryModel).filter(
-        ToppingCategoryModel.id.in_(topping.category_ids)
-    ).all()
-    if len(categories) != len(topping.category_ids):
-        found_ids = {cat.id for cat in categories}
-        missing_ids = set(topping.category_ids) - found_ids
-        raise HTTPException(
-            status_code=404,
-            detail=f"Topping category IDs not found: {list(missing_ids)}"
-        )
+    refs = resolve_references(db, category_ids=topping.category_ids)
     
     db_topping.name = topping.name
     db_topping.price = topping.price
-    db_topping.categories = categories
+    db_topping.categories = refs.categories
     
     db.commit()
     db.refresh(db_topping)
@@ -674,7 +871,7 @@ async def upload_image(file: UploadFile = File(...)):
         
         # Return the relative path that will be used in the frontend
         # filename includes "dist" for database storage, path is the URL path
-        return JSONResponse(content={"filename": f"dist/images/{unique_filename}", "path": f"/images/{unique_filename}"})
+        return ORJSONResponse(content={"filename": f"dist/images/{unique_filename}", "path": f"/images/{unique_filename}"})
     except Exception as e:
         logger.error(f"Error uploading file: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
@@ -697,7 +894,7 @@ async def delete_image(filename: str):
         
         if file_path.exists() and file_path.is_file():
             file_path.unlink()
-            return JSONResponse(content={"message": "File deleted successfully"})
+            return ORJSONResponse(content={"message": "File deleted successfully"})
         else:
             raise HTTPException(status_code=404, detail="File not found")
     except HTTPException:
@@ -711,7 +908,7 @@ async def delete_image(filename: str):
 ################################################################################
 
 @router.delete("/delete_pizza/{pizza_id}", status_code=204)
-async def delete_pizza(pizza_id: int, db: Session = Depends(get_db)):
+def delete_pizza(pizza_id: int, db: Session = Depends(get_db)):
     """Delete a pizza and its associated image file"""
     pizza = db.query(PizzaModel).filter(PizzaModel.id == pizza_id).first()
     if not pizza:
@@ -744,8 +941,8 @@ async def delete_pizza(pizza_id: int, db: Session = Depends(get_db)):
     return None
 
 @router.delete("/delete_sauce/{sauce_id}", status_code=204)
-async def delete_sauce(sauce_id: int, db: Session = Depends(get_db)):
-    """Delete a sauce"""
+def delete_sauce(sauce_id: int, db: Session = Depends(get_db)):
+    """Delete a sauce (409 while pizzas use it; see catalog_events)"""
     sauce = db.query(SauceModel).filter(SauceModel.id == sauce_id).first()
     if not sauce:
         raise HTTPException(status_code=404, detail="Sauce not found")
@@ -754,8 +951,8 @@ async def delete_sauce(sauce_id: int, db: Session = Depends(get_db)):
     return None
 
 @router.delete("/delete_crust/{crust_id}", status_code=204)
-async def delete_crust(crust_id: int, db: Session = Depends(get_db)):
-    """Delete a crust"""
+def delete_crust(crust_id: int, db: Session = Depends(get_db)):
+    """Delete a crust (409 while pizzas use it; see catalog_events)"""
     crust = db.query(CrustModel).filter(CrustModel.id == crust_id).first()
     if not crust:
         raise HTTPException(status_code=404, detail="Crust not found")
@@ -764,7 +961,7 @@ async def delete_crust(crust_id: int, db: Session = Depends(get_db)):
     return None
 
 @router.delete("/delete_topping/{topping_id}", status_code=204)
-async def delete_topping(topping_id: int, db: Session = Depends(get_db)):
+def delete_topping(topping_id: int, db: Session = Depends(get_db)):
     """Delete a topping"""
     topping = db.query(ToppingModel).filter(ToppingModel.id == topping_id).first()
     if not topping:
@@ -774,7 +971,7 @@ async def delete_topping(topping_id: int, db: Session = Depends(get_db)):
     return None
 
 @router.delete("/delete_size/{size_id}", status_code=204)
-async def delete_size(size_id: int, db: Session = Depends(get_db)):
+def delete_size(size_id: int, db: Session = Depends(get_db)):
     """Delete a size"""
     logger.info(f"Deleting size: {size_id}")
     size = db.query(SizeModel).filter(SizeModel.id == size_id).first()
@@ -786,7 +983,7 @@ async def delete_size(size_id: int, db: Session = Depends(get_db)):
     return None
 
 @router.delete("/delete_pizza_topping_category/{category_id}", status_code=204)
-async def delete_pizza_topping_category(category_id: int, db: Session = Depends(get_db)):
+def delete_pizza_topping_category(category_id: int, db: Session = Depends(get_db)):
     """Delete a topping category"""
     category = db.query(ToppingCategoryModel).filter(ToppingCategoryModel.id == category_id).first()
     if not category:
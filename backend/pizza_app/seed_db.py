@@ -1,9 +1,11 @@
 """
 Seed script to populate the database with initial data
-Run this script once to migrate your fake data to the database
+Run this script once to migrate your fake data to the database:
+    cd backend && python -m pizza_app.seed_db
+For large generated catalogs see pizza_app/datagen.py
 """
-from database import SessionLocal
-from models.pizza_models import (
+from pizza_app.database import SessionLocal
+from pizza_app.models.pizza_models import (
     Size, Sauce, Crust, ToppingCategory, Topping, Pizza
 )
 
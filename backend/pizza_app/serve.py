@@ -0,0 +1,39 @@
+"""
+Production launcher: several uvicorn worker processes sharing one port.
+
+    cd backend && python -m pizza_app.serve
+
+Host, port, worker count and log level come from settings (SERVER_HOST,
+SERVER_PORT, SERVER_WORKERS, SERVER_LOG_LEVEL). ``python -m pizza_app.main``
+remains the single-process development server with auto-reload.
+
+The schema is migrated once here, before the workers start, so they do not
+race each other to run migrations. Each worker keeps its own in-memory
+indexes and feeds and stays coherent with the others through the database
+(see services/coherence.py), so no shared cache service is needed.
+"""
+import logging
+
+from uvicorn import run
+
+from pizza_app import settings
+from pizza_app.models.pizza_models import init_db
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    logger.info("Starting %d worker(s) on %s:%d", settings.SERVER_WORKERS, settings.SERVER_HOST, settings.SERVER_PORT)
+    run(
+        "pizza_app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=settings.SERVER_WORKERS,
+        log_level=settings.SERVER_LOG_LEVEL,
+    )
+
+
+if __name__ == "__main__":
+    main()
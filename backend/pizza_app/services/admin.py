@@ -0,0 +1,26 @@
+"""
+Access control for operator-only endpoints (profiling and the like).
+
+They are enabled by setting ADMIN_TOKEN and called with the token in the
+X-Admin-Token header; without a configured token they do not exist.
+"""
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from pizza_app import settings
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return secrets.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Dependency for admin endpoints"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
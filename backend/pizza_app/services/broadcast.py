@@ -0,0 +1,145 @@
+"""
+In-process publish/subscribe over a shared, bounded event log.
+
+Publishing appends to one log and resolves one "something changed" future, so
+its cost does not depend on how many subscribers are connected. Every
+subscriber keeps its own cursor into the log and catches up at its own pace:
+a slow subscriber only falls behind (and is told it missed events once the log
+has wrapped) - it never blocks publishers or other subscribers.
+
+publish() may be called from any thread (write handlers running in the
+threadpool); waking subscribers is always done on the event loop.
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Optional, Tuple
+
+# Yielded instead of an event when a subscriber fell so far behind that events
+# were dropped from the log; it should reload its state from the API
+RESET = "reset"
+# Yielded when nothing was published for ``idle_timeout`` seconds, so
+# long-lived connections can send a keep-alive
+IDLE = "idle"
+
+
+class Broadcast:
+    def __init__(self, maxlen: int = 1000):
+        self._log: Deque[Tuple[int, Any]] = deque(maxlen=maxlen)
+        self._last_seq = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Future] = None
+        self.subscribers = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Attach to the event loop subscribers run on (called at startup)"""
+        self._loop = loop
+        self._changed = loop.create_future()
+
+    def skip_to(self, seq: int) -> None:
+        """Continue numbering after ``seq`` without publishing (e.g. resuming a persisted counter)"""
+        with self._lock:
+            self._last_seq = max(self._last_seq, seq)
+
+    def publish(self, event: Any, seq: Optional[int] = None) -> int:
+        """
+        Append an event and wake subscribers; returns its sequence number.
+
+        ``seq`` lets the caller supply its own numbering (e.g. a version
+        counter); it must be greater than the last published sequence.
+        """
+        with self._lock:
+            if seq is None:
+                seq = self._last_seq + 1
+            elif seq <= self._last_seq:
+                raise ValueError(f"Sequence {seq} is not after {self._last_seq}")
+            self._last_seq = seq
+            self._log.append((seq, event))
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                self._wake()
+            else:
+                loop.call_soon_threadsafe(self._wake)
+        return seq
+
+    def _wake(self) -> None:
+        # One future per "generation": events published before subscribers get
+        # around to waiting again share a single wake-up
+        changed = self._changed
+        if changed is not None and not changed.done():
+            self._changed = self._loop.create_future()
+            changed.set_result(None)
+
+    def _read_after(self, cursor: int) -> Tuple[bool, list]:
+        """Events newer than ``cursor``, and whether some were already dropped"""
+        with self._lock:
+            if not self._log:
+                return False, []
+            if self._log[-1][0] <= cursor:
+                return False, []
+            missed = cursor + 1 < self._log[0][0]
+            return missed, [entry for entry in self._log if entry[0] > cursor]
+
+    async def listen(
+        self, after: Optional[int] = None, idle_timeout: Optional[float] = None
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Yield (seq, event) for every event published after sequence ``after``
+        (default: only new events). Yields (seq, RESET) if events were missed
+        and (seq, IDLE) after ``idle_timeout`` seconds without events.
+        """
+        if self._changed is None:
+            self.bind(asyncio.get_running_loop())
+        cursor = self.last_seq if after is None else after
+        if cursor > self.last_seq:
+            # A cursor from before a restart; the client's state is stale
+            cursor = self.last_seq
+            yield cursor, RESET
+        self.subscribers += 1
+        try:
+            while True:
+                # Grab the wait handle before reading so nothing published in
+                # between can be missed
+                changed = self._changed
+                missed, entries = self._read_after(cursor)
+                if missed:
+                    yield entries[0][0] - 1, RESET
+                for seq, event in entries:
+                    cursor = seq
+                    yield seq, event
+                if not entries:
+                    try:
+                        # Shielded: the future is shared by every subscriber
+                        await asyncio.wait_for(asyncio.shield(changed), idle_timeout)
+                    except asyncio.TimeoutError:
+                        yield cursor, IDLE
+        finally:
+            self.subscribers -= 1
+
+
+async def sse_events(
+    broadcast: Broadcast, after: Optional[int], idle_timeout: Optional[float]
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events framing for a broadcast whose events are
+    (event type, JSON data) pairs; the sequence number is the event ID.
+    """
+    async for seq, event in broadcast.listen(after, idle_timeout=idle_timeout):
+        if event == IDLE:
+            yield ": keep-alive\n\n"
+        elif event == RESET:
+            yield f"id: {seq}\nevent: {RESET}\ndata: {json.dumps({'last_event_id': seq})}\n\n"
+        else:
+            event_type, data = event
+            yield f"id: {seq}\nevent: {event_type}\ndata: {data}\n\n"
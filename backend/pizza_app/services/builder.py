@@ -0,0 +1,387 @@
+"""
+Build-your-own pizza search.
+
+Finds the best topping combinations for a build-your-own pizza under
+constraints: toppings that must or must not be on it, categories it needs a
+topping from or must avoid, a topping count range and a budget. Results are
+ranked by price, or by similarity to a designer pizza (the Jaccard index of
+the two topping sets, then price).
+
+There are far too many combinations to list (hundreds of toppings, up to ten
+at a time), so the search is a depth-first branch and bound over the allowed
+toppings in a fixed order. Sets are int bitsets: a partial combination
+carries the bitset of its toppings and of the required categories it
+covers (one OR per topping added), and counts of toppings on and off the
+designer pizza for its similarity. Each branch is cut off as soon as an
+optimistic bound on everything below it (cheapest possible completion, best
+reachable similarity) cannot beat the current k-th best result; because
+candidates are ordered so those bounds only get worse further along, the
+rest of a loop is skipped as well. The cheapest completion comes from a
+table of the cheapest cover of each subset of the missing required
+categories by the toppings from each position on, which is why a request
+can require at most MAX_REQUIRED_CATEGORIES categories. The top-k results
+are exact.
+
+Sizes, sauces and crusts only add a base price. In price mode the top-k
+topping sets are searched once and combined with the k cheapest bases; in
+similarity mode the base is fixed (the designer pizza's unless given).
+"""
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from pizza_app.models.order_schemas import OrderItemCreate
+from pizza_app.models.pizza_schemas import BuiltPizza, PizzaBuilderResults
+from pizza_app.services.catalog_snapshot import CatalogSnapshot
+from pizza_app.services.pizza_serialization import SnapshotSchemas
+from pizza_app.services.pricing import load_price_list, price_item
+
+_INFINITY = float("inf")
+MAX_REQUIRED_CATEGORIES = 8
+
+
+@dataclass(frozen=True)
+class BuilderConstraints:
+    size_id: Optional[int] = None
+    sauce_id: Optional[int] = None
+    crust_id: Optional[int] = None
+    budget: Optional[float] = None
+    min_toppings: int = 1
+    max_toppings: int = 5
+    topping_ids: Tuple[int, ...] = ()
+    exclude_topping_ids: Tuple[int, ...] = ()
+    category_ids: Tuple[int, ...] = ()
+    exclude_category_ids: Tuple[int, ...] = ()
+
+
+@dataclass
+class _Candidates:
+    """The allowed optional toppings, in search order, with per-position lookups"""
+    ids: List[int]
+    prices: List[float]
+    # Bitset over the required categories each topping covers
+    covers: List[int]
+    # cover_cost[j][mask]: cheapest set of toppings at positions >= j covering
+    # the required categories in mask (any number of toppings)
+    cover_cost: List[List[float]] = field(default_factory=list)
+    # Cheapest topping at position >= j
+    suffix_min_any: List[float] = field(default_factory=list)
+    # Most required categories any one topping covers
+    widest: int = 1
+
+
+def _check_ids(table, ids, label: str) -> None:
+    missing = [entity_id for entity_id in dict.fromkeys(ids) if entity_id not in table]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"{label} IDs not found: {missing}")
+
+
+def _candidates(snapshot: CatalogSnapshot, allowed: List[int], needed: List[int], order_key) -> _Candidates:
+    allowed = sorted(allowed, key=order_key)
+    needed_bits = {category_id: 1 << position for position, category_id in enumerate(needed)}
+    candidates = _Candidates(
+        ids=allowed,
+        prices=[snapshot.toppings[topping_id].price for topping_id in allowed],
+        covers=[
+            sum(needed_bits.get(category_id, 0) for category_id in set(snapshot.toppings[topping_id].category_ids))
+            for topping_id in allowed
+        ],
+    )
+    candidates.widest = max([bin(bits).count("1") for bits in candidates.covers] + [1])
+    count = len(allowed)
+    masks = range(1 << len(needed))
+    row = [0.0] + [_INFINITY] * (len(masks) - 1)
+    candidates.cover_cost = [row] * (count + 1)
+    candidates.suffix_min_any = [_INFINITY] * (count + 1)
+    for j in range(count - 1, -1, -1):
+        price, covers = candidates.prices[j], candidates.covers[j]
+        candidates.suffix_min_any[j] = min(price, candidates.suffix_min_any[j + 1])
+        if covers:
+            # Toppings covering no required category share the row after them
+            row = [min(row[mask], price + row[mask & ~covers]) for mask in masks]
+        candidates.cover_cost[j] = row
+    return candidates
+
+
+class _TopK:
+    """The k smallest keys seen so far (a max-heap on the negated key)"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple] = []
+        self._counter = itertools.count()
+
+    def beats_worst(self, key: Tuple) -> bool:
+        return len(self._heap) < self.k or key < self._worst()
+
+    def _worst(self) -> Tuple:
+        return tuple(-part for part in self._heap[0][0])
+
+    def offer(self, key: Tuple, value) -> None:
+        entry = (tuple(-part for part in key), next(self._counter), value)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif key < self._worst():
+            heapq.heapreplace(self._heap, entry)
+
+    def sorted(self) -> List[Tuple[Tuple, object]]:
+        return sorted(
+            ((tuple(-part for part in negated), value) for negated, _, value in self._heap),
+            key=lambda item: item[0],
+        )
+
+
+class _Search:
+    """
+    Branch and bound over candidate positions. A result's key is (price,) in
+    price mode and (-similarity, price) in similarity mode; smaller is better.
+    """
+
+    def __init__(
+        self,
+        candidates: _Candidates,
+        needed_count: int,
+        min_extra: int,
+        max_extra: int,
+        price_cap: float,
+        k: int,
+        target_size: Optional[int] = None,
+        target_segment: int = 0,
+    ):
+        """
+        target_size: number of toppings on the designer pizza to rank by
+        similarity to (None ranks by price)
+        target_segment: candidates before this position are on that pizza
+        """
+        self.c = candidates
+        self.all_needed = (1 << needed_count) - 1
+        self.min_extra = min_extra
+        self.max_extra = max_extra
+        self.price_cap = price_cap
+        self.top = _TopK(k)
+        self.by_similarity = target_size is not None
+        self.target_size = target_size or 0
+        self.target_segment = target_segment
+        self.explored = 0
+
+    def _completion_price(self, covered: int, count: int, start: int) -> float:
+        """
+        Lower bound on what a feasible completion adds from position ``start``
+        on (infinite if none fits in the toppings left)
+        """
+        missing = self.all_needed & ~covered
+        # A topping covers at most ``widest`` of the missing categories
+        toppings = max(self.min_extra - count, -(-bin(missing).count("1") // self.c.widest))
+        if toppings > self.max_extra - count:
+            return _INFINITY
+        return max(self.c.cover_cost[start][missing], toppings * self.c.suffix_min_any[start])
+
+    def _similarity(self, matched: int, extra: int) -> Fraction:
+        union = self.target_size + extra
+        return Fraction(matched, union) if union else Fraction(1)
+
+    def run(self, fixed_price: float, fixed_matched: int, fixed_extra: int, fixed_covered: int) -> None:
+        self._visit(0, 0, 0, fixed_price, fixed_covered, fixed_matched, fixed_extra)
+
+    def _visit(self, start: int, chosen: int, count: int, price: float, covered: int, matched: int, extra: int) -> None:
+        self.explored += 1
+        if count >= self.min_extra and covered == self.all_needed:
+            if not self.by_similarity:
+                self.top.offer((price,), chosen)
+            else:
+                self.top.offer((-self._similarity(matched, extra), price), chosen)
+        if count == self.max_extra:
+            return
+
+        prices, covers = self.c.prices, self.c.covers
+        j, end = start, len(prices)
+        while j < end:
+            in_target = j < self.target_segment
+            # Bound for adding j or any later candidate of its segment: those
+            # cost at least prices[j] and can only cover from position j on,
+            # so it never improves further along and fails the whole segment
+            segment_lower = price + max(prices[j], self._completion_price(covered, count, j))
+            if self.by_similarity:
+                reachable = min(self.target_segment - j, self.max_extra - count) if in_target else 0
+                segment_key = (-self._similarity(matched + reachable, extra + (not in_target)), segment_lower)
+            else:
+                segment_key = (segment_lower,)
+            if segment_lower >= self.price_cap or not self.top.beats_worst(segment_key):
+                if in_target:
+                    j = self.target_segment
+                    continue
+                break
+
+            # Tighter bound for adding j itself
+            new_price = price + prices[j]
+            new_covered = covered | covers[j]
+            lower = new_price + self._completion_price(new_covered, count + 1, j + 1)
+            new_matched, new_extra = matched + in_target, extra + (not in_target)
+            if self.by_similarity:
+                reachable = min(self.target_segment - j - 1, self.max_extra - count - 1) if in_target else 0
+                key = (-self._similarity(new_matched + reachable, new_extra), lower)
+            else:
+                key = (lower,)
+            if lower < self.price_cap and self.top.beats_worst(key):
+                self._visit(j + 1, chosen | 1 << j, count + 1, new_price, new_covered, new_matched, new_extra)
+            j += 1
+
+
+def _bit_positions(bits: int) -> List[int]:
+    return [position for position, bit in enumerate(bin(bits)[:1:-1]) if bit == "1"]
+
+
+def build_pizzas(
+    snapshot: CatalogSnapshot,
+    constraints: BuilderConstraints,
+    like_pizza_id: Optional[int] = None,
+    limit: int = 10,
+) -> PizzaBuilderResults:
+    """The ``limit`` best build-your-own pizzas meeting ``constraints``"""
+    if constraints.min_toppings > constraints.max_toppings:
+        raise HTTPException(status_code=422, detail="min_toppings cannot be more than max_toppings")
+    if len(set(constraints.category_ids)) > MAX_REQUIRED_CATEGORIES:
+        raise HTTPException(
+            status_code=422, detail=f"At most {MAX_REQUIRED_CATEGORIES} categories can be required"
+        )
+    for entity_id, table, label in (
+        (constraints.size_id, snapshot.sizes, "Size"),
+        (constraints.sauce_id, snapshot.sauces, "Sauce"),
+        (constraints.crust_id, snapshot.crusts, "Crust"),
+        (like_pizza_id, snapshot.pizzas, "Pizza"),
+    ):
+        if entity_id is not None and entity_id not in table:
+            raise HTTPException(status_code=404, detail=f"{label} ID {entity_id} not found")
+    _check_ids(snapshot.toppings, constraints.topping_ids + constraints.exclude_topping_ids, "Topping")
+    _check_ids(snapshot.categories, constraints.category_ids + constraints.exclude_category_ids, "Topping category")
+
+    excluded_categories = set(constraints.exclude_category_ids)
+    allowed = {
+        topping.id for topping in snapshot.toppings.values()
+        if topping.id not in constraints.exclude_topping_ids and not excluded_categories.intersection(topping.category_ids)
+    }
+    fixed = list(dict.fromkeys(constraints.topping_ids))
+    if any(topping_id not in allowed for topping_id in fixed) or len(fixed) > constraints.max_toppings:
+        return PizzaBuilderResults()
+    allowed.difference_update(fixed)
+
+    # Required categories the fixed toppings do not already cover
+    fixed_categories = {category_id for topping_id in fixed for category_id in snapshot.toppings[topping_id].category_ids}
+    needed = [category_id for category_id in dict.fromkeys(constraints.category_ids) if category_id not in fixed_categories]
+    fixed_price = sum(snapshot.toppings[topping_id].price for topping_id in fixed)
+    min_extra = max(0, constraints.min_toppings - len(fixed))
+    max_extra = constraints.max_toppings - len(fixed)
+
+    target = snapshot.pizzas[like_pizza_id] if like_pizza_id is not None else None
+    if target is None:
+        bases = _price_bases(snapshot, constraints, limit)
+    else:
+        bases = _similar_base(snapshot, constraints, target)
+    if not bases:
+        return PizzaBuilderResults()
+    cheapest_base = bases[0][0]
+    # Search prices include the fixed toppings but not the base; totals are
+    # rounded to cents, so allow for a sum just over the budget rounding down
+    price_cap = _INFINITY if constraints.budget is None else constraints.budget - cheapest_base + 0.005
+
+    if target is None:
+        candidates = _candidates(snapshot, list(allowed), needed, lambda t: (snapshot.toppings[t].price, t))
+        search = _Search(candidates, len(needed), min_extra, max_extra, price_cap, limit)
+        search.run(fixed_price, 0, 0, 0)
+    else:
+        target_toppings = set(target.topping_ids)
+        candidates = _candidates(
+            snapshot, list(allowed), needed,
+            lambda t: (t not in target_toppings, snapshot.toppings[t].price, t),
+        )
+        fixed_matched = sum(1 for topping_id in fixed if topping_id in target_toppings)
+        search = _Search(
+            candidates, len(needed), min_extra, max_extra, price_cap, limit,
+            target_size=len(target_toppings),
+            target_segment=sum(1 for topping_id in allowed if topping_id in target_toppings),
+        )
+        search.run(fixed_price, fixed_matched, len(fixed) - fixed_matched, 0)
+
+    topping_sets = [
+        (key, fixed + [candidates.ids[position] for position in _bit_positions(chosen)])
+        for key, chosen in search.top.sorted()
+    ]
+    return _results(snapshot, bases, topping_sets, constraints.budget, limit, search.explored, target is not None)
+
+
+def _price_bases(snapshot: CatalogSnapshot, constraints: BuilderConstraints, limit: int) -> List[Tuple[float, int, int, int]]:
+    """The ``limit`` cheapest (price, size_id, sauce_id, crust_id) bases"""
+    sizes = [constraints.size_id] if constraints.size_id is not None else list(snapshot.sizes)
+    sauces = [constraints.sauce_id] if constraints.sauce_id is not None else list(snapshot.sauces)
+    crusts = [constraints.crust_id] if constraints.crust_id is not None else list(snapshot.crusts)
+    return heapq.nsmallest(limit, (
+        (snapshot.sizes[size_id].base_price + snapshot.sauces[sauce_id].price + snapshot.crusts[crust_id].price,
+         size_id, sauce_id, crust_id)
+        for size_id in sizes for sauce_id in sauces for crust_id in crusts
+    ))
+
+
+def _similar_base(snapshot: CatalogSnapshot, constraints: BuilderConstraints, target) -> List[Tuple[float, int, int, int]]:
+    """The designer pizza's own base (its cheapest size), overridden by any given IDs"""
+    def pick(given, own, table, price):
+        if given is not None:
+            return given
+        if own is not None and own in table:
+            return own
+        return min(table, key=lambda entity_id: price(table[entity_id]), default=None)
+
+    own_sizes = {size_id: snapshot.sizes[size_id] for size_id in target.size_ids if size_id in snapshot.sizes}
+    size_id = pick(constraints.size_id, None, own_sizes or snapshot.sizes, lambda size: size.base_price)
+    sauce_id = pick(constraints.sauce_id, target.sauce_id, snapshot.sauces, lambda sauce: sauce.price)
+    crust_id = pick(constraints.crust_id, target.crust_id, snapshot.crusts, lambda crust: crust.price)
+    if size_id is None or sauce_id is None or crust_id is None:
+        return []
+    price = snapshot.sizes[size_id].base_price + snapshot.sauces[sauce_id].price + snapshot.crusts[crust_id].price
+    return [(price, size_id, sauce_id, crust_id)]
+
+
+def _results(
+    snapshot: CatalogSnapshot,
+    bases: List[Tuple[float, int, int, int]],
+    topping_sets: List[Tuple[Tuple, List[int]]],
+    budget: Optional[float],
+    limit: int,
+    explored: int,
+    by_similarity: bool,
+) -> PizzaBuilderResults:
+    # The best k pairs only use the best k of each list
+    items = [
+        OrderItemCreate(size_id=size_id, sauce_id=sauce_id, crust_id=crust_id, topping_ids=topping_ids)
+        for _, size_id, sauce_id, crust_id in bases for _, topping_ids in topping_sets
+    ]
+    prices = load_price_list(snapshot, items)
+    ranked = []
+    for position, item in enumerate(items):
+        base_rank, set_rank = divmod(position, len(topping_sets))
+        key, _ = topping_sets[set_rank]
+        price = price_item(prices, item)
+        if budget is not None and price > budget:
+            continue
+        similarity = -key[0] if by_similarity else None
+        ranked.append(((-similarity if by_similarity else 0, price, base_rank, set_rank), item, similarity))
+    ranked.sort(key=lambda entry: entry[0])
+
+    schemas = SnapshotSchemas(snapshot)
+    return PizzaBuilderResults(
+        pizzas=[
+            BuiltPizza(
+                size=schemas.size(item.size_id),
+                sauce=schemas.sauce(item.sauce_id),
+                crust=schemas.crust(item.crust_id),
+                toppings=[schemas.topping(topping_id) for topping_id in item.topping_ids],
+                price=price,
+                similarity=round(float(similarity), 4) if similarity is not None else None,
+            )
+            for (_, price, _, _), item, similarity in ranked[:limit]
+        ],
+        explored=explored,
+    )
@@ -0,0 +1,268 @@
+"""
+Catalog change tracking for ORM sessions.
+
+Every flush records which catalog rows were created, updated or deleted.
+When the transaction commits, the accumulated changes are handed to the
+registered listeners; rolled back changes are dropped. In-memory structures
+(indexes, caches, feeds) subscribe with ``on_commit`` instead of each write
+handler having to notify them.
+
+Each change is also given the next catalog version: the counter in
+catalog_meta is bumped in the same transaction, stamped on the changed row
+and recorded in the catalog_changes log. SQLite admits one writer at a time,
+so versions are committed in increasing order. The session hooks below are
+registered on SessionLocal in database.py, so every session is tracked, not
+only those of code that happens to import this module.
+
+Listeners see every change exactly once and in version order, including
+changes committed by other processes: whenever a commit's versions do not
+directly follow the last dispatched one, the missing range is read back from
+the catalog_changes log (see ``catch_up``).
+"""
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from pizza_app.database import engine
+from pizza_app.models.pizza_models import (
+    Pizza, Size, Sauce, Crust, Topping, ToppingCategory, CatalogMeta, CatalogChangeLog
+)
+
+logger = logging.getLogger(__name__)
+
+# model -> (entity name, relationships owned by this side of a many-to-many)
+CATALOG_ENTITIES = {
+    Size: ("size", ()),
+    Sauce: ("sauce", ()),
+    Crust: ("crust", ()),
+    ToppingCategory: ("topping_category", ()),
+    Topping: ("topping", ("categories",)),
+    Pizza: ("pizza", ("sizes", "toppings")),
+}
+
+# Rows every pizza needs one of: model -> Pizza relationship
+_PIZZA_PARENTS = {Sauce: "sauce", Crust: "crust"}
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+
+@dataclass(frozen=True)
+class CatalogChange:
+    entity: str
+    id: int
+    op: str
+    version: int = 0
+    # For create/update: current IDs of any owned relationship that changed,
+    # e.g. {"toppings": (1, 4)} when a pizza's toppings were replaced
+    links: Dict[str, Tuple[int, ...]] = field(default_factory=dict, compare=False)
+
+
+class ReferencedByPizzas(HTTPException):
+    """409 raised by a flush that would delete a sauce or crust pizzas still use"""
+
+    def __init__(self, label: str, pizzas: int):
+        super().__init__(status_code=409, detail=f"{label} is used by {pizzas} pizza(s)")
+
+
+CommitListener = Callable[[List[CatalogChange]], None]
+_commit_listeners: List[CommitListener] = []
+
+# Last version handed to the listeners by this process (None until start())
+_dispatched_version: Optional[int] = None
+_dispatch_lock = threading.Lock()
+
+
+def on_commit(listener: CommitListener) -> CommitListener:
+    """Register ``listener(changes)`` to run after each commit that changed the catalog"""
+    _commit_listeners.append(listener)
+    return listener
+
+
+def current_version(connection: Connection) -> int:
+    """The version of the last committed catalog change"""
+    return connection.execute(select(CatalogMeta.version).where(CatalogMeta.id == 1)).scalar_one()
+
+
+def dispatched_version() -> Optional[int]:
+    return _dispatched_version
+
+
+def start(connection: Connection) -> None:
+    """Treat everything up to the database's current version as already dispatched"""
+    global _dispatched_version
+    with _dispatch_lock:
+        _dispatched_version = current_version(connection)
+
+
+def _dispatch(changes: List[CatalogChange]) -> None:
+    global _dispatched_version
+    for listener in _commit_listeners:
+        try:
+            listener(changes)
+        except Exception:
+            # The transaction is already committed; one bad listener must not
+            # fail the request or starve the others
+            logger.exception("Catalog change listener %r failed", listener)
+    _dispatched_version = changes[-1].version
+
+
+def _catch_up_locked() -> None:
+    global _dispatched_version
+    with engine.connect() as connection:
+        if _dispatched_version is None:
+            # Not started (scripts); nothing earlier needs replaying
+            _dispatched_version = current_version(connection)
+            return
+        rows = connection.execute(
+            select(CatalogChangeLog)
+            .where(CatalogChangeLog.version > _dispatched_version)
+            .order_by(CatalogChangeLog.version)
+        ).all()
+    if rows:
+        _dispatch([
+            CatalogChange(
+                row.entity, row.entity_id, row.op, row.version,
+                {name: tuple(ids) for name, ids in (row.links or {}).items()},
+            )
+            for row in rows
+        ])
+
+
+def catch_up() -> None:
+    """Dispatch every logged change newer than the last dispatched version (e.g. from other processes)"""
+    with _dispatch_lock:
+        _catch_up_locked()
+
+
+def _changed_links(state, relationships, include_unchanged: bool) -> Dict[str, Tuple[int, ...]]:
+    links = {}
+    for name in relationships:
+        attr = state.attrs[name]
+        if include_unchanged or attr.history.has_changes():
+            links[name] = tuple(related.id for related in (attr.value or ()))
+    return links
+
+
+def _is_changed(state, relationships) -> bool:
+    """True if a column or an owned relationship changed (ignores backref-only collection edits)"""
+    for attr in state.mapper.column_attrs:
+        if state.attrs[attr.key].history.has_changes():
+            return True
+    return any(state.attrs[name].history.has_changes() for name in relationships)
+
+
+def _pending_changes(session: Session) -> List[Tuple[object, str]]:
+    """(instance, op) for every catalog row this flush will write"""
+    pending = [(obj, CREATE) for obj in session.new if type(obj) in CATALOG_ENTITIES]
+    pending += [
+        (obj, UPDATE) for obj in session.dirty
+        if type(obj) in CATALOG_ENTITIES and _is_changed(inspect(obj), CATALOG_ENTITIES[type(obj)][1])
+    ]
+    pending += [(obj, DELETE) for obj in session.deleted if type(obj) in CATALOG_ENTITIES]
+    return pending
+
+
+def _refuse_deleting_used(session: Session) -> None:
+    """A pizza always has a sauce and a crust, so one still in use cannot be deleted"""
+    for obj in session.deleted:
+        relationship = _PIZZA_PARENTS.get(type(obj))
+        if relationship is None:
+            continue
+        users = [
+            pizza for pizza in obj.pizzas
+            if pizza not in session.deleted and getattr(pizza, f"{relationship}_id") == obj.id
+        ]
+        if users:
+            raise ReferencedByPizzas(relationship.capitalize(), len(users))
+
+
+def assign_versions(session: Session, flush_context, instances) -> None:
+    _refuse_deleting_used(session)
+    pending = _pending_changes(session)
+    if not pending:
+        return
+    # Takes the database write lock until commit, which serializes versions
+    last = session.execute(
+        update(CatalogMeta.__table__)
+        .where(CatalogMeta.__table__.c.id == 1)
+        .values(version=CatalogMeta.__table__.c.version + len(pending))
+        .returning(CatalogMeta.__table__.c.version)
+    ).scalar_one()
+    now = datetime.now(timezone.utc)
+    versions = session.info.setdefault("catalog_versions", {})
+    for version, (obj, op) in enumerate(pending, start=last - len(pending) + 1):
+        versions[id(obj)] = version
+        if op != DELETE:
+            obj.version = version
+            obj.updated_at = now
+
+
+def collect_changes(session: Session, flush_context) -> None:
+    versions = session.info.pop("catalog_versions", None)
+    if not versions:
+        return
+    flushed = []
+    for obj in session.new:
+        entity = CATALOG_ENTITIES.get(type(obj))
+        if entity:
+            name, relationships = entity
+            flushed.append(CatalogChange(
+                name, obj.id, CREATE, versions[id(obj)], _changed_links(inspect(obj), relationships, True)
+            ))
+    for obj in session.dirty:
+        entity = CATALOG_ENTITIES.get(type(obj))
+        if entity and id(obj) in versions:
+            name, relationships = entity
+            flushed.append(CatalogChange(
+                name, obj.id, UPDATE, versions[id(obj)], _changed_links(inspect(obj), relationships, False)
+            ))
+    for obj in session.deleted:
+        entity = CATALOG_ENTITIES.get(type(obj))
+        if entity:
+            flushed.append(CatalogChange(entity[0], obj.id, DELETE, versions[id(obj)]))
+    flushed.sort(key=lambda change: change.version)
+    session.info.setdefault("catalog_changes", []).extend(flushed)
+
+    now = datetime.now(timezone.utc)
+    session.connection().execute(insert(CatalogChangeLog.__table__), [
+        {
+            "version": change.version,
+            "entity": change.entity,
+            "entity_id": change.id,
+            "op": change.op,
+            "links": {name: list(ids) for name, ids in change.links.items()} or None,
+            "changed_at": now,
+        }
+        for change in flushed
+    ])
+
+
+def publish_changes(session: Session) -> None:
+    changes = session.info.pop("catalog_changes", None)
+    if not changes:
+        return
+    with _dispatch_lock:
+        if _dispatched_version is not None:
+            changes = [change for change in changes if change.version > _dispatched_version]
+            if not changes:
+                return
+        if _dispatched_version is None or changes[0].version == _dispatched_version + 1:
+            _dispatch(changes)
+        else:
+            # Another process (or a local commit still running its hooks)
+            # committed versions in between; replay them all from the log
+            _catch_up_locked()
+
+
+def discard_changes(session: Session) -> None:
+    session.info.pop("catalog_changes", None)
+    session.info.pop("catalog_versions", None)
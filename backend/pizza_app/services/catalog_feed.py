@@ -0,0 +1,43 @@
+"""
+Catalog change feed.
+
+Every committed catalog change becomes one typed event in a bounded change
+log, numbered with its catalog version. Clients remember the last version
+they applied and resume from it, so they update incrementally instead of
+re-fetching the menu. Changes arrive from catalog_events in version order,
+including those committed by other processes.
+"""
+import asyncio
+import json
+from typing import List
+
+from sqlalchemy.engine import Connection
+
+from pizza_app import settings
+from pizza_app.services import catalog_events
+from pizza_app.services.broadcast import Broadcast
+
+CATALOG_CHANGE = "catalog_change"
+
+catalog_feed = Broadcast(maxlen=settings.CATALOG_FEED_BACKLOG)
+
+
+def start(connection: Connection, loop: asyncio.AbstractEventLoop) -> None:
+    """Attach the feed to the event loop and number it from the database's catalog version"""
+    catalog_feed.bind(loop)
+    catalog_feed.skip_to(catalog_events.current_version(connection))
+
+
+def _publish_changes(changes: List[catalog_events.CatalogChange]) -> None:
+    for change in changes:
+        data = json.dumps({
+            "entity": change.entity,
+            "id": change.id,
+            "op": change.op,
+            "version": change.version,
+            "links": {name: list(ids) for name, ids in change.links.items()},
+        })
+        catalog_feed.publish((CATALOG_CHANGE, data), seq=change.version)
+
+
+catalog_events.on_commit(_publish_changes)
@@ -0,0 +1,313 @@
+"""
+Immutable in-memory snapshot of the catalog for the read path.
+
+Reads through the ORM pay for identity-map bookkeeping and attribute
+instrumentation on every object they load. The snapshot instead holds the
+whole catalog as slotted, frozen records - relations as tuples of IDs - built
+with one query per table. A snapshot is never modified: each committed
+catalog change produces a new one (re-reading only the changed rows) that is
+swapped in with a single assignment, so a reader that took ``current`` keeps
+a consistent view of one catalog version for as long as it holds it, with
+no lock and no Session.
+
+Changes arrive from catalog_events in version order, including those
+committed by other processes.
+"""
+import logging
+import sys
+import threading
+import time
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from typing import Callable, Collection, Dict, List, Mapping, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from pizza_app.database import engine
+from pizza_app.models.pizza_models import (
+    Pizza, Size, Sauce, Crust, Topping, ToppingCategory, pizza_sizes, pizza_toppings, topping_categories
+)
+from pizza_app.services import catalog_events
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class SizeRecord:
+    id: int
+    size: str
+    base_price: float
+
+
+@dataclass(frozen=True, slots=True)
+class SauceRecord:
+    id: int
+    name: str
+    price: float
+
+
+@dataclass(frozen=True, slots=True)
+class CrustRecord:
+    id: int
+    name: str
+    price: float
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryRecord:
+    id: int
+    name: str
+    description: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class ToppingRecord:
+    id: int
+    name: str
+    price: float
+    category_ids: Tuple[int, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class PizzaRecord:
+    id: int
+    name: str
+    description: Optional[str]
+    image_url: Optional[str]
+    is_available: Optional[bool]
+    sauce_id: Optional[int]
+    crust_id: Optional[int]
+    size_ids: Tuple[int, ...]
+    topping_ids: Tuple[int, ...]
+
+
+# ----------------------
+# Loading
+# ----------------------
+# Each loader reads the rows with the given IDs (all rows for None), in ID order
+
+def _where_ids(query, column, ids: Optional[Collection[int]]):
+    return query if ids is None else query.where(column.in_(ids))
+
+
+def _group_links(connection: Connection, query) -> Dict[int, List[int]]:
+    grouped: Dict[int, List[int]] = {}
+    for owner_id, related_id in connection.execute(query):
+        grouped.setdefault(owner_id, []).append(related_id)
+    return grouped
+
+
+def _load_sizes(connection: Connection, ids: Optional[Collection[int]]) -> Dict[int, SizeRecord]:
+    query = _where_ids(select(Size.id, Size.size, Size.base_price), Size.id, ids)
+    return {row.id: SizeRecord(*row) for row in connection.execute(query.order_by(Size.id))}
+
+
+def _load_sauces(connection: Connection, ids: Optional[Collection[int]]) -> Dict[int, SauceRecord]:
+    query = _where_ids(select(Sauce.id, Sauce.name, Sauce.price), Sauce.id, ids)
+    return {row.id: SauceRecord(*row) for row in connection.execute(query.order_by(Sauce.id))}
+
+
+def _load_crusts(connection: Connection, ids: Optional[Collection[int]]) -> Dict[int, CrustRecord]:
+    query = _where_ids(select(Crust.id, Crust.name, Crust.price), Crust.id, ids)
+    return {row.id: CrustRecord(*row) for row in connection.execute(query.order_by(Crust.id))}
+
+
+def _load_categories(connection: Connection, ids: Optional[Collection[int]]) -> Dict[int, CategoryRecord]:
+    query = _where_ids(
+        select(ToppingCategory.id, ToppingCategory.name, ToppingCategory.description), ToppingCategory.id, ids
+    )
+    return {row.id: CategoryRecord(*row) for row in connection.execute(query.order_by(ToppingCategory.id))}
+
+
+def _load_toppings(connection: Connection, ids: Optional[Collection[int]]) -> Dict[int, ToppingRecord]:
+    links = _group_links(connection, _where_ids(
+        select(topping_categories.c.topping_id, topping_categories.c.category_id),
+        topping_categories.c.topping_id, ids,
+    ))
+    query = _where_ids(select(Topping.id, Topping.name, Topping.price), Topping.id, ids)
+    return {
+        row.id: ToppingRecord(*row, category_ids=tuple(links.get(row.id, ())))
+        for row in connection.execute(query.order_by(Topping.id))
+    }
+
+
+def _load_pizzas(connection: Connection, ids: Optional[Collection[int]]) -> Dict[int, PizzaRecord]:
+    sizes = _group_links(connection, _where_ids(
+        select(pizza_sizes.c.pizza_id, pizza_sizes.c.size_id), pizza_sizes.c.pizza_id, ids
+    ))
+    toppings = _group_links(connection, _where_ids(
+        select(pizza_toppings.c.pizza_id, pizza_toppings.c.topping_id), pizza_toppings.c.pizza_id, ids
+    ))
+    query = _where_ids(select(
+        Pizza.id, Pizza.name, Pizza.description, Pizza.image_url,
+        Pizza.is_available, Pizza.sauce_id, Pizza.crust_id,
+    ), Pizza.id, ids)
+    return {
+        row.id: PizzaRecord(
+            *row, size_ids=tuple(sizes.get(row.id, ())), topping_ids=tuple(toppings.get(row.id, ()))
+        )
+        for row in connection.execute(query.order_by(Pizza.id))
+    }
+
+
+# entity name (as in catalog_events) -> (snapshot attribute, loader)
+_TABLES: Dict[str, Tuple[str, Callable[[Connection, Optional[Collection[int]]], Dict[int, object]]]] = {
+    "size": ("sizes", _load_sizes),
+    "sauce": ("sauces", _load_sauces),
+    "crust": ("crusts", _load_crusts),
+    "topping_category": ("categories", _load_categories),
+    "topping": ("toppings", _load_toppings),
+    "pizza": ("pizzas", _load_pizzas),
+}
+
+
+def _read_only(rows: Mapping[int, object]) -> Mapping[int, object]:
+    return MappingProxyType(rows) if isinstance(rows, dict) else rows
+
+
+def _record_size(record) -> int:
+    return sys.getsizeof(record) + sum(sys.getsizeof(getattr(record, f.name)) for f in fields(record))
+
+
+class CatalogSnapshot:
+    """One catalog version. Every mapping is keyed by ID, in ID order, and read-only."""
+    __slots__ = (
+        "version", "sizes", "sauces", "crusts", "categories", "toppings", "pizzas",
+        "build_seconds", "_memory_bytes",
+    )
+
+    def __init__(self, version: int, tables: Dict[str, Mapping[int, object]], build_seconds: float):
+        """tables: records by ID for each attribute; tables of another snapshot are shared as they are"""
+        self.version = version
+        self.sizes: Mapping[int, SizeRecord] = _read_only(tables["sizes"])
+        self.sauces: Mapping[int, SauceRecord] = _read_only(tables["sauces"])
+        self.crusts: Mapping[int, CrustRecord] = _read_only(tables["crusts"])
+        self.categories: Mapping[int, CategoryRecord] = _read_only(tables["categories"])
+        self.toppings: Mapping[int, ToppingRecord] = _read_only(tables["toppings"])
+        self.pizzas: Mapping[int, PizzaRecord] = _read_only(tables["pizzas"])
+        self.build_seconds = build_seconds
+        self._memory_bytes: Optional[int] = None
+
+    @classmethod
+    def load(cls, connection: Connection) -> "CatalogSnapshot":
+        """The whole catalog, one query per table and link table"""
+        started = time.perf_counter()
+        version = catalog_events.current_version(connection)
+        tables = {attribute: loader(connection, None) for attribute, loader in _TABLES.values()}
+        return cls(version, tables, time.perf_counter() - started)
+
+    def apply(self, connection: Connection, changes: List[catalog_events.CatalogChange]) -> "CatalogSnapshot":
+        """A new snapshot with ``changes`` applied; only the changed rows are read"""
+        started = time.perf_counter()
+        stale: Dict[str, Set[int]] = {}
+        deleted: Dict[str, Set[int]] = {}
+        for change in changes:
+            stale.setdefault(change.entity, set()).add(change.id)
+            if change.op == catalog_events.DELETE:
+                deleted.setdefault(change.entity, set()).add(change.id)
+        # Deleting a size, topping or category also deletes its link rows,
+        # which changes the pizzas or toppings that referenced it. Sauces and
+        # crusts in use cannot be deleted, but a pizza still pointing at one
+        # (written outside the ORM) is re-read rather than left dangling
+        deleted_sizes, deleted_toppings = deleted.get("size", set()), deleted.get("topping", set())
+        deleted_sauces, deleted_crusts = deleted.get("sauce", set()), deleted.get("crust", set())
+        if deleted_sizes or deleted_toppings or deleted_sauces or deleted_crusts:
+            stale.setdefault("pizza", set()).update(
+                pizza.id for pizza in self.pizzas.values()
+                if deleted_sizes.intersection(pizza.size_ids) or deleted_toppings.intersection(pizza.topping_ids)
+                or pizza.sauce_id in deleted_sauces or pizza.crust_id in deleted_crusts
+            )
+        deleted_categories = deleted.get("topping_category", set())
+        if deleted_categories:
+            stale.setdefault("topping", set()).update(
+                topping.id for topping in self.toppings.values()
+                if deleted_categories.intersection(topping.category_ids)
+            )
+
+        tables = {attribute: getattr(self, attribute) for attribute, _ in _TABLES.values()}
+        for entity, ids in stale.items():
+            attribute, loader = _TABLES[entity]
+            fresh = loader(connection, ids)
+            rows = dict(tables[attribute])
+            for entity_id in ids - fresh.keys():
+                # Gone from the database: deleted, possibly by a later commit
+                rows.pop(entity_id, None)
+            last = next(reversed(rows), None)
+            added = fresh.keys() - rows.keys()
+            rows.update(fresh)
+            if added and last is not None and min(added) < last:
+                rows = dict(sorted(rows.items()))
+            tables[attribute] = rows
+        return CatalogSnapshot(changes[-1].version, tables, time.perf_counter() - started)
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by this snapshot's containers and records (computed once)"""
+        if self._memory_bytes is None:
+            total = 0
+            for attribute, _ in _TABLES.values():
+                records = getattr(self, attribute)
+                total += sys.getsizeof(dict(records))
+                total += sum(_record_size(record) for record in records.values())
+            self._memory_bytes = total
+        return self._memory_bytes
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "version": self.version,
+            **{attribute: len(getattr(self, attribute)) for attribute, _ in _TABLES.values()},
+            "memory_bytes": self.memory_bytes(),
+            "build_ms": round(self.build_seconds * 1000, 2),
+        }
+
+
+class SnapshotHolder:
+    """The current CatalogSnapshot, replaced (never mutated) on every catalog change"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current: Optional[CatalogSnapshot] = None
+        self.swaps = 0
+
+    @property
+    def current(self) -> CatalogSnapshot:
+        """The latest snapshot; loaded on first use if the app has not started (scripts)"""
+        snapshot = self._current
+        if snapshot is None:
+            with engine.connect() as connection:
+                self.rebuild(connection)
+            snapshot = self._current
+        return snapshot
+
+    def rebuild(self, connection: Connection) -> None:
+        """Load a complete snapshot from the database, replacing the current one"""
+        snapshot = CatalogSnapshot.load(connection)
+        with self._lock:
+            self._current = snapshot
+        logger.info(
+            "Catalog snapshot v%s: %d pizzas, %d toppings, ~%.1f KiB, built in %.1f ms",
+            snapshot.version, len(snapshot.pizzas), len(snapshot.toppings),
+            snapshot.memory_bytes() / 1024, snapshot.build_seconds * 1000,
+        )
+
+    def apply(self, changes: List[catalog_events.CatalogChange]) -> None:
+        with self._lock:
+            if self._current is None:
+                return
+            # A rebuild may already include some of them
+            changes = [change for change in changes if change.version > self._current.version]
+            if not changes:
+                return
+            with engine.connect() as connection:
+                self._current = self._current.apply(connection, changes)
+            self.swaps += 1
+
+    def stats(self) -> Dict[str, object]:
+        snapshot = self._current
+        if snapshot is None:
+            return {"loaded": False}
+        return {"loaded": True, "swaps": self.swaps, **snapshot.stats()}
+
+
+catalog_snapshot = SnapshotHolder()
+catalog_events.on_commit(catalog_snapshot.apply)
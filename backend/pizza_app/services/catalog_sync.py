@@ -0,0 +1,108 @@
+"""
+Delta sync: everything in the catalog that changed after a given version.
+
+Created and updated rows are found through the per-row version column,
+deletions through the catalog_changes log, so a reconnecting client pays for
+the size of the change rather than the size of the menu.
+"""
+from typing import Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from pizza_app.models.pizza_models import (
+    Pizza as PizzaModel,
+    Size as SizeModel,
+    Sauce as SauceModel,
+    Crust as CrustModel,
+    Topping as ToppingModel,
+    ToppingCategory as ToppingCategoryModel,
+    CatalogMeta, CatalogChangeLog,
+    pizza_sizes, pizza_toppings, topping_categories,
+)
+from pizza_app.services import catalog_events
+
+
+def _links(db: Session, column, target, owner_ids: List[int]) -> Dict[int, List[int]]:
+    links = {owner_id: [] for owner_id in owner_ids}
+    if owner_ids:
+        for owner_id, target_id in db.execute(select(column, target).where(column.in_(owner_ids))):
+            links[owner_id].append(target_id)
+    return links
+
+
+def changes_since(db: Session, since: int) -> dict:
+    """
+    Catalog rows created/updated and deleted after version ``since``, plus the
+    version the result is current to. ``since`` 0 is a full download of every
+    row, whatever its version; a ``since`` newer than the database (e.g. after
+    a restore) returns the whole catalog with ``reset`` set.
+    """
+    # The first read pins the transaction's snapshot, so the version and the
+    # rows below are consistent with each other
+    version = db.execute(select(CatalogMeta.version).where(CatalogMeta.id == 1)).scalar_one()
+    reset = since > version
+    if reset:
+        since = 0
+
+    def changed(model):
+        query = db.query(model)
+        if since:
+            query = query.filter(model.version > since)
+        return query.order_by(model.id).all()
+
+    toppings = [
+        {"id": t.id, "name": t.name, "price": t.price}
+        for t in changed(ToppingModel)
+    ]
+    category_links = _links(db, topping_categories.c.topping_id, topping_categories.c.category_id, [t["id"] for t in toppings])
+    for topping in toppings:
+        topping["category_ids"] = category_links[topping["id"]]
+
+    pizzas = [
+        {
+            "id": p.id, "name": p.name, "description": p.description, "image_url": p.image_url,
+            "is_available": p.is_available, "sauce_id": p.sauce_id, "crust_id": p.crust_id,
+        }
+        for p in changed(PizzaModel)
+    ]
+    pizza_ids = [p["id"] for p in pizzas]
+    size_links = _links(db, pizza_sizes.c.pizza_id, pizza_sizes.c.size_id, pizza_ids)
+    topping_links = _links(db, pizza_toppings.c.pizza_id, pizza_toppings.c.topping_id, pizza_ids)
+    for pizza in pizzas:
+        pizza["size_ids"] = size_links[pizza["id"]]
+        pizza["topping_ids"] = topping_links[pizza["id"]]
+
+    result = {
+        "version": version,
+        "reset": reset,
+        "sizes": changed(SizeModel),
+        "sauces": changed(SauceModel),
+        "crusts": changed(CrustModel),
+        "toppings": toppings,
+        "topping_categories": changed(ToppingCategoryModel),
+        "pizzas": pizzas,
+    }
+
+    # IDs can be reused after a delete; a row that exists again is sent as an
+    # upsert rather than a tombstone
+    live = {
+        (entity, row["id"] if isinstance(row, dict) else row.id)
+        for entity, key in (
+            ("size", "sizes"), ("sauce", "sauces"), ("crust", "crusts"),
+            ("topping", "toppings"), ("topping_category", "topping_categories"), ("pizza", "pizzas"),
+        )
+        for row in result[key]
+    }
+    deleted = db.execute(
+        select(CatalogChangeLog.entity, CatalogChangeLog.entity_id, func.max(CatalogChangeLog.version))
+        .where(CatalogChangeLog.version > since, CatalogChangeLog.op == catalog_events.DELETE)
+        .group_by(CatalogChangeLog.entity, CatalogChangeLog.entity_id)
+        .order_by(func.max(CatalogChangeLog.version))
+    )
+    result["deleted"] = [
+        {"entity": entity, "id": entity_id, "version": deleted_version}
+        for entity, entity_id, deleted_version in deleted
+        if (entity, entity_id) not in live
+    ]
+    return result
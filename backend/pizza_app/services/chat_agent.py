@@ -0,0 +1,290 @@
+"""
+The chat assistant's agents, built on first use.
+
+Importing the agents/openai packages and rendering every route and schema
+into the prompt takes seconds, so nothing here runs at import time: workers
+become ready without it, and only the first chat request (or the optional
+preload at startup, see CHAT_PRELOAD) pays for it.
+"""
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+import httpx
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from pizza_app import settings
+from pizza_app.models.chat_schemas import PizzaRoute
+from pizza_app.models.order_schemas import OrderItemCreate
+from pizza_app.models.pizza_schemas import Pizza, Size, Sauce, Crust, Topping, ToppingCategory, CatalogBatch
+from pizza_app.services.catalog_snapshot import CatalogSnapshot, catalog_snapshot
+from pizza_app.services.pricing import load_price_list, price_item
+
+logger = logging.getLogger(__name__)
+
+_agents: Optional[Dict[str, Any]] = None
+_build_lock = threading.Lock()
+
+
+def find_menu_pizzas(snapshot: CatalogSnapshot, name: str, available_only: bool, limit: int = 20) -> List[dict]:
+    """Pizzas whose name contains ``name`` (case-insensitive), priced per size like an order would be"""
+    needle = name.lower()
+    matches = [
+        pizza for pizza in snapshot.pizzas.values()
+        if needle in pizza.name.lower() and (pizza.is_available or not available_only)
+    ][:limit]
+    items = [OrderItemCreate(pizza_id=pizza.id, size_id=size_id) for pizza in matches for size_id in pizza.size_ids]
+    prices = load_price_list(snapshot, items)
+    results = []
+    for pizza in matches:
+        sizes = {}
+        for size_id in pizza.size_ids:
+            try:
+                sizes[snapshot.sizes[size_id].size] = price_item(prices, OrderItemCreate(pizza_id=pizza.id, size_id=size_id))
+            except HTTPException:
+                continue  # not orderable, e.g. unavailable
+        results.append({
+            "id": pizza.id,
+            "name": pizza.name,
+            "description": pizza.description,
+            "is_available": pizza.is_available,
+            "toppings": [snapshot.toppings[topping_id].name for topping_id in pizza.topping_ids],
+            "prices": sizes,
+        })
+    return results
+
+
+def _build_agents() -> Dict[str, Any]:
+    from openai import AsyncOpenAI
+    from agents import Agent, OpenAIChatCompletionsModel, function_tool, set_tracing_disabled
+
+    set_tracing_disabled(True)
+
+    client = AsyncOpenAI(
+        api_key=settings.CHAT_API_KEY,
+        base_url=settings.CHAT_BASE_URL
+    )
+
+    model = OpenAIChatCompletionsModel(
+        model=settings.CHAT_MODEL,
+        openai_client=client
+    )
+
+    pizza_routes = [
+        PizzaRoute(
+            # you specify the ID (integer) in the route
+            route="/pizza/get_pizza_size/{size_id}",
+            method="GET",
+            description="Get a specific pizza size by ID",
+            parameters=["size_id"],
+            response={"type": "object", "properties": Size.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            route="/pizza/get_pizza_sizes",
+            method="GET",
+            description="Get all pizza sizes",
+            parameters=[],
+            response={"type": "object", "properties": Size.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            # you specify the ID (integer) in the route
+            route="/pizza/get_pizza_sauce/{sauce_id}",
+            method="GET",
+            description="Get a specific pizza sauce by ID",
+            parameters=["sauce_id"],
+            response={"type": "object", "properties": Sauce.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            route="/pizza/get_pizza_sauces",
+            method="GET",
+            description="Get all pizza sauces",
+            parameters=[],
+            response={"type": "object", "properties": Sauce.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            # you specify the ID (integer) in the route
+            route="/pizza/get_pizza_crust/{crust_id}",
+            method="GET",
+            description="Get a specific pizza crust by ID",
+            parameters=["crust_id"],
+            response={"type": "object", "properties": Crust.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            route="/pizza/get_pizza_crusts",
+            method="GET",
+            description="Get all pizza crusts",
+            parameters=[],
+            response={"type": "object", "properties": Crust.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            # you specify the ID (integer) in the route
+            route="/pizza/get_pizza_topping/{topping_id}",
+            method="GET",
+            description="Get a specific pizza topping by ID",
+            parameters=["topping_id"],
+            response={"type": "object", "properties": Topping.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            route="/pizza/get_pizza_toppings",
+            method="GET",
+            description="Get all pizza toppings",
+            parameters=[],
+            response={"type": "object", "properties": Topping.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            # you specify the ID (integer) in the route
+            route="/pizza/get_pizza_topping_category/{category_id}",
+            method="GET",
+            description="Get a specific pizza topping category by ID",
+            parameters=["category_id"],
+            response={"type": "object", "properties": ToppingCategory.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            route="/pizza/get_pizza_topping_categories",
+            method="GET",
+            description="Get all pizza topping categories",
+            parameters=[],
+            response={"type": "object", "properties": ToppingCategory.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            # you specify the ID (integer) in the route
+            route="/pizza/get_designer_pizza/{pizza_id}",
+            method="GET",
+            description="Get a specific designer pizza by ID",
+            parameters=["pizza_id"],
+            response={"type": "object", "properties": Pizza.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            route="/pizza/get_designer_pizzas",
+            method="GET",
+            description="Get all designer pizzas",
+            parameters=[],
+            response={"type": "object", "properties": Pizza.model_json_schema()}
+        ).model_dump(),
+        PizzaRoute(
+            # you specify comma-separated IDs (e.g. 1,2,3) for each kind needed and leave out the rest
+            route="/pizza/batch?sizes={size_ids}&sauces={sauce_ids}&crusts={crust_ids}&toppings={topping_ids}"
+                  "&topping_categories={category_ids}&pizzas={pizza_ids}",
+            method="GET",
+            description="Get several sizes, sauces, crusts, toppings, topping categories and designer pizzas by ID "
+                        "in one request; each list is in the order given, with null for IDs not found",
+            parameters=["size_ids", "sauce_ids", "crust_ids", "topping_ids", "category_ids", "pizza_ids"],
+            response={"type": "object", "properties": CatalogBatch.model_json_schema()}
+        ).model_dump()
+    ]
+
+    pizza_schemes = [
+        Size.model_json_schema(),
+        Sauce.model_json_schema(),
+        Crust.model_json_schema(),
+        Topping.model_json_schema(),
+        ToppingCategory.model_json_schema(),
+        Pizza.model_json_schema()
+    ]
+
+    for schema in pizza_schemes:
+        if '$defs' in schema:
+            del schema['$defs']
+
+    @function_tool()
+    def get_pizza_route(index: int) -> dict:
+        """Get a specific pizza route by ID"""
+        logger.debug(f"Getting pizza route for index {index}")
+        return pizza_routes[index]
+
+    @function_tool()
+    def get_pizza_route_attribute(index: int, attribute: str) -> Union[str, int, float, bool, list, dict]:
+        """Get a specific attribute from a pizza route"""
+        logger.debug(f"Getting pizza route attribute {attribute} for index {index}")
+        return pizza_routes[index].get(attribute)
+
+    @function_tool()
+    def get_pizza_scheme(index: int) -> dict:
+        """Get a specific pizza scheme by ID"""
+        logger.debug(f"Getting pizza scheme for index {index}")
+        return pizza_schemes[index]
+
+    @function_tool()
+    def get_pizza_scheme_attribute(index: int, attribute: str) -> Union[str, int, float, bool, list, dict]:
+        """Get a specific attribute from a pizza scheme"""
+        logger.info(f"Getting pizza scheme attribute {attribute} for index {index}")
+        return pizza_schemes[index].get(attribute)
+
+    @function_tool()
+    async def http_request(method: str, route: str) -> dict:
+        """When passing the route, you DON'T include the base url, just the route"""
+        logger.debug(f"Making HTTP request to {method} {route}")
+        async with httpx.AsyncClient() as client:
+            response = await client.request(method, f"http://localhost:9002{route}")
+            return response.json()
+
+    @function_tool()
+    def find_pizzas(name: str = "", available_only: bool = True) -> list:
+        """Find designer pizzas whose name contains the given text, with their toppings and price for each size"""
+        logger.info(f"Finding pizzas matching {name!r}")
+        return find_menu_pizzas(catalog_snapshot.current, name, available_only)
+
+    tools = [
+        http_request, find_pizzas, get_pizza_route, get_pizza_scheme, get_pizza_route_attribute, get_pizza_scheme_attribute
+    ]
+
+    pizza_agent = Agent(
+        name="pizza_agent",
+        instructions=f"""
+            You are a helpful assistant that thinks critically about the user's request and thinks step by step about how to best fulfill it, then fullfills it.
+            In addition to conversational responses, you can also do anything described in the routes available to you.
+            You also have these routes to use with your HTTP requests tool:
+            {json.dumps(pizza_routes)}
+            Important notes on the PizzaRoutes:
+             - Pay attention to the "route" key in the PizzaRoutes object. It's all you need to use the HTTP requests tool.
+             - DO NOT use any other route other than the ones provided to you in the PizzaRoutes object.
+             - The method is the HTTP method to use, GET, POST, PUT, DELETE, etc.
+             - The parameters are the parameters to pass in the route.
+             - The response is the expected response from the endpoint.
+             - You can also use the get_pizza_route and get_pizza_route_attribute tools to get the PizzaRoute and its attributes. It is 0 indexed.
+            If you need to access information on those routes, please use the HTTP requests tool.
+            To look up pizzas, their toppings and prices by name, prefer the find_pizzas tool; it is much faster than fetching every pizza.
+            To look up several things by ID, use the /pizza/batch route once instead of one request per ID.
+            To help you determine which route to use and what information you will have available to you, you have these schemes available to you:
+            {json.dumps(pizza_schemes)}.
+            Important notes on the PizzaSchemes:
+            - You can use the get_pizza_scheme and get_pizza_scheme_attribute tools to get the PizzaScheme and its attributes. It is 0 indexed.
+            If you can't access information on those routes, tools, schemes, or need more information, please let the user know.
+            You might have to get all pizzas by using the HTTP requests tool to get all pizzas and then use the get_pizza_scheme tool to get the PizzaScheme and its attributes for each pizza.
+        """,
+        tools=tools,
+        model=model
+    )
+
+    test_agent = Agent(
+        name="test_agent",
+        instructions=f"""
+            You are a helpful assistant that only outputs the text "test".
+        """,
+        tools=tools,
+        model=model
+    )
+
+    return {"pizza_agent": pizza_agent, "test_agent": test_agent}
+
+
+def get_agent(name: str) -> Any:
+    """The named agent ("pizza_agent" or "test_agent"), building them all on the first call"""
+    global _agents
+    if _agents is None:
+        with _build_lock:
+            if _agents is None:
+                _agents = _build_agents()
+                logger.info("Chat agents initialized")
+    return _agents[name]
+
+
+async def run_agent(name: str, message: str) -> str:
+    """Run the named agent on ``message`` and return its final output"""
+    # The first build takes seconds; keep it off the event loop
+    agent = _agents[name] if _agents is not None else await run_in_threadpool(get_agent, name)
+    from agents import Runner
+    response = await Runner.run(agent, message)
+    return response.final_output
@@ -0,0 +1,104 @@
+"""
+Cross-process coherence for in-memory state.
+
+Every worker process keeps state derived from the database: the topping
+index and the catalog change feed follow catalog changes, the kitchen feed
+follows order events. Writes made by this process reach that state through
+commit hooks; writes made by other workers (or scripts) are noticed by a
+cheap probe of two counters - the catalog version and the last kitchen
+event ID - on a dedicated SQLite connection, outside the connection pool.
+When either counter is ahead of this process, the missed changes are
+replayed from the catalog_changes and kitchen_events logs.
+
+The probe runs before requests, at most once per check interval, and, for
+workers holding SSE/WebSocket subscribers but receiving no requests,
+periodically in the background. It always runs in the threadpool: a write
+holding the database lock can stall it, and that must not stall the event
+loop with it.
+"""
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from typing import Tuple
+
+from sqlalchemy.engine import make_url
+from starlette.concurrency import run_in_threadpool
+
+from pizza_app import settings
+from pizza_app.database import DATABASE_URL
+from pizza_app.services import catalog_events, kitchen
+
+logger = logging.getLogger(__name__)
+
+_PROBE_SQL = (
+    "SELECT (SELECT version FROM catalog_meta WHERE id = 1), "
+    "(SELECT COALESCE(MAX(id), 0) FROM kitchen_events)"
+)
+
+
+class CoherenceProbe:
+    def __init__(self, database: str, interval: float = 0.0):
+        """
+        database: path of the SQLite database file
+        interval: minimum seconds between request-time probes (0 probes on every request)
+        """
+        self.database = database
+        self.interval = interval
+        self._connection = None
+        self._lock = threading.Lock()
+        self._next_probe = 0.0
+        self.probes = 0
+        self.refreshes = 0
+
+    def _read_counters(self) -> Tuple[int, int]:
+        with self._lock:
+            if self._connection is None:
+                # Autocommit: every probe reads the latest committed state
+                self._connection = sqlite3.connect(self.database, check_same_thread=False, isolation_level=None)
+            self.probes += 1
+            return self._connection.execute(_PROBE_SQL).fetchone()
+
+    def due(self) -> bool:
+        """True, once per interval, when a probe should run (no I/O; safe on the event loop)"""
+        now = time.monotonic()
+        if now < self._next_probe:
+            return False
+        self._next_probe = now + self.interval
+        return True
+
+    def is_stale(self) -> bool:
+        """True if another process committed changes this process has not applied yet (does database I/O)"""
+        catalog_version, kitchen_event_id = self._read_counters()
+        dispatched = catalog_events.dispatched_version()
+        return (
+            (dispatched is not None and catalog_version > dispatched)
+            or kitchen_event_id > kitchen.kitchen_feed.last_seq
+        )
+
+    def refresh(self) -> None:
+        """Replay missed catalog changes and kitchen events (does database I/O)"""
+        self.refreshes += 1
+        catalog_events.catch_up()
+        kitchen.catch_up()
+
+    def check(self) -> None:
+        """Probe, and refresh if stale (does database I/O)"""
+        if self.is_stale():
+            self.refresh()
+
+    async def poll(self, interval: float) -> None:
+        """Probe every ``interval`` seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await run_in_threadpool(self.check)
+            except Exception:
+                logger.exception("Coherence refresh failed")
+
+
+coherence_probe = CoherenceProbe(
+    make_url(DATABASE_URL).database,
+    interval=settings.COHERENCE_CHECK_INTERVAL_MS / 1000,
+)
@@ -0,0 +1,125 @@
+"""
+Kitchen display feed and order status workflow.
+
+New and updated orders are published once to a shared broadcast log; each
+kitchen screen (SSE or WebSocket) reads it at its own pace. Events are
+serialized once when recorded, so adding screens adds no per-event encoding
+work.
+
+Events are also written to the kitchen_events table inside the order's
+transaction and numbered by its row ID. A worker process publishes its own
+events directly; events committed by other workers (a gap in the numbering)
+are read back from the table, so every screen sees every order whichever
+worker it is connected to.
+"""
+import asyncio
+import threading
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from pizza_app import settings
+from pizza_app.database import engine
+from pizza_app.models.order_models import ORDER_STATUSES, Order as OrderModel, KitchenEvent
+from pizza_app.models.order_schemas import Order
+from pizza_app.services.broadcast import Broadcast
+
+ORDER_PLACED = "order_placed"
+STATUS_CHANGED = "status_changed"
+
+kitchen_feed = Broadcast(maxlen=settings.KITCHEN_FEED_BACKLOG)
+# Events must be published in ID order
+_publish_lock = threading.Lock()
+
+
+def start(connection: Connection, loop: asyncio.AbstractEventLoop) -> None:
+    """Attach the feed to the event loop and continue numbering from the event table"""
+    kitchen_feed.bind(loop)
+    kitchen_feed.skip_to(last_event_id(connection))
+
+
+def last_event_id(connection: Connection) -> int:
+    return connection.execute(select(func.coalesce(func.max(KitchenEvent.id), 0))).scalar_one()
+
+
+def record_event(db: Session, event_type: str, order: Order) -> KitchenEvent:
+    """Add an event to the current transaction; publish it with publish_events() after commit"""
+    event = KitchenEvent(event_type=event_type, order_id=order.id, payload=order.model_dump_json())
+    db.add(event)
+    return event
+
+
+def prune_events(db: Session) -> None:
+    """Drop events older than the feed backlog (run inside a write transaction)"""
+    last = db.execute(select(func.max(KitchenEvent.id))).scalar()
+    if last is not None:
+        db.execute(delete(KitchenEvent).where(KitchenEvent.id <= last - settings.KITCHEN_FEED_BACKLOG))
+
+
+def _publish_locked(events) -> None:
+    for event in events:
+        if event.id > kitchen_feed.last_seq:
+            kitchen_feed.publish((event.event_type, event.payload), seq=event.id)
+
+
+def _catch_up_locked() -> None:
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(KitchenEvent).where(KitchenEvent.id > kitchen_feed.last_seq).order_by(KitchenEvent.id)
+        ).all()
+    _publish_locked(rows)
+
+
+def catch_up() -> None:
+    """Publish events committed (by any process) since the last published one"""
+    with _publish_lock:
+        _catch_up_locked()
+
+
+def publish_events(events: Iterable[KitchenEvent]) -> None:
+    """Push committed events to every kitchen screen connected to this process"""
+    events = sorted(events, key=lambda event: event.id)
+    with _publish_lock:
+        events = [event for event in events if event.id > kitchen_feed.last_seq]
+        if not events:
+            return
+        if events[0].id == kitchen_feed.last_seq + 1:
+            _publish_locked(events)
+        else:
+            _catch_up_locked()
+
+
+def next_status(status: str) -> Optional[str]:
+    position = ORDER_STATUSES.index(status)
+    return ORDER_STATUSES[position + 1] if position + 1 < len(ORDER_STATUSES) else None
+
+
+def change_status(db: Session, order_id: int, status: str) -> OrderModel:
+    """
+    Move an order one step along received -> baking -> ready (the caller commits).
+
+    The UPDATE is conditional on the status the order had when it was read,
+    so two screens bumping the same order cannot both succeed.
+    """
+    order = db.query(OrderModel).filter(OrderModel.id == order_id).first()
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if next_status(order.status) != status:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Order {order_id} is '{order.status}' and cannot move to '{status}'",
+        )
+
+    result = db.execute(
+        update(OrderModel)
+        .where(OrderModel.id == order_id, OrderModel.status == order.status)
+        .values(status=status)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"Order {order_id} was updated concurrently")
+    db.expire(order, ["status"])
+    return order
@@ -0,0 +1,207 @@
+"""
+Per-request performance metrics.
+
+MetricsMiddleware (middleware/metrics.py) opens a RequestTimings for every
+HTTP request in a context variable; SQLAlchemy cursor events and timed()
+blocks add database and serialization time to it. Threadpool work started
+by the request (run_in_threadpool copies the context) is attributed to it
+as well. When the response finishes, the totals are folded into per-route
+histograms and counters, which /metrics renders in the Prometheus text
+format.
+
+Metrics are kept per worker process; scrape each worker (or run one) for
+totals across a multi-worker server.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from pizza_app.cache.cache import cache_stats
+from pizza_app.database import engine
+from pizza_app.services.catalog_snapshot import catalog_snapshot
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestTimings:
+    __slots__ = ("start", "db_seconds", "queries", "phases")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_seconds = 0.0
+        self.queries = 0
+        # Other timed phases, e.g. {"serialize": 0.002}
+        self.phases: Dict[str, float] = {}
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (durations in milliseconds)"""
+        entries = [
+            f"total;dur={self.elapsed() * 1000:.1f}",
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"',
+        ]
+        entries.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items())
+        return ", ".join(entries)
+
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def begin_request() -> Tuple[RequestTimings, contextvars.Token]:
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the time spent in the block to the current request's ``phase``"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_phase(phase, time.perf_counter() - start)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    starts = conn.info.get("query_start")
+    if timings is None or not starts:
+        return
+    timings.db_seconds += time.perf_counter() - starts.pop()
+    timings.queries += 1
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RouteMetrics:
+    __slots__ = ("duration", "db_seconds", "queries", "response_bytes", "phases")
+
+    def __init__(self):
+        self.duration = Histogram()
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.response_bytes = 0
+        self.phases: Dict[str, float] = {}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str, int], RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status: int, timings: RequestTimings, duration: float, size: int) -> None:
+        key = (method, route, status)
+        with self._lock:
+            metrics = self._routes.get(key)
+            if metrics is None:
+                metrics = self._routes[key] = RouteMetrics()
+            metrics.duration.observe(duration)
+            metrics.db_seconds += timings.db_seconds
+            metrics.queries += timings.queries
+            metrics.response_bytes += size
+            for name, seconds in timings.phases.items():
+                metrics.phases[name] = metrics.phases.get(name, 0.0) + seconds
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines: List[str] = [
+                "# HELP pizza_request_duration_seconds Time to handle a request (to the first byte for event streams), by route",
+                "# TYPE pizza_request_duration_seconds histogram",
+            ]
+            for (method, route, status), metrics in routes:
+                labels = f'method="{method}",route="{route}",status="{status}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), metrics.duration.counts):
+                    cumulative += count
+                    lines.append(f'pizza_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"pizza_request_duration_seconds_sum{{{labels}}} {metrics.duration.sum:.6f}")
+                lines.append(f"pizza_request_duration_seconds_count{{{labels}}} {metrics.duration.count}")
+            for name, help_text, attribute in (
+                ("pizza_request_db_seconds_total", "Time spent executing SQL, by route", "db_seconds"),
+                ("pizza_request_queries_total", "SQL statements executed, by route", "queries"),
+                ("pizza_response_bytes_total", "Response body bytes sent, by route", "response_bytes"),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (method, route, status), metrics in routes:
+                    value = getattr(metrics, attribute)
+                    value = f"{value:.6f}" if isinstance(value, float) else value
+                    lines.append(f'{name}{{method="{method}",route="{route}",status="{status}"}} {value}')
+            lines.append("# HELP pizza_request_phase_seconds_total Time spent in timed phases (e.g. serialize), by route")
+            lines.append("# TYPE pizza_request_phase_seconds_total counter")
+            for (method, route, status), metrics in routes:
+                for phase, seconds in sorted(metrics.phases.items()):
+                    lines.append(
+                        f'pizza_request_phase_seconds_total{{method="{method}",route="{route}",'
+                        f'status="{status}",phase="{phase}"}} {seconds:.6f}'
+                    )
+
+        caches = cache_stats()
+        for stat in ("hits", "misses", "coalesced", "errors"):
+            name = f"pizza_cache_{stat}_total"
+            lines.append(f"# HELP {name} Cache {stat}, by cache")
+            lines.append(f"# TYPE {name} counter")
+            for namespace, stats in sorted(caches.items()):
+                lines.append(f'{name}{{cache="{namespace}"}} {stats[stat]}')
+
+        snapshot = catalog_snapshot.stats()
+        if snapshot["loaded"]:
+            for name, kind, help_text, stat in (
+                ("pizza_catalog_snapshot_version", "gauge", "Catalog version of the current snapshot", "version"),
+                ("pizza_catalog_snapshot_bytes", "gauge", "Approximate memory held by the current snapshot", "memory_bytes"),
+                ("pizza_catalog_snapshot_pizzas", "gauge", "Pizzas in the current snapshot", "pizzas"),
+                ("pizza_catalog_snapshot_swaps_total", "counter", "Snapshots replaced after catalog changes", "swaps"),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {snapshot[stat]}")
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
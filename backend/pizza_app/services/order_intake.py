@@ -0,0 +1,175 @@
+"""
+Group-commit order intake.
+
+Instead of one transaction per POST, incoming orders are queued and a single
+writer task drains the queue in batches: one price lookup for the whole batch,
+one INSERT round per table and one COMMIT (one fsync). SQLite allows a single
+writer at a time, so funnelling every order through one writer also removes
+lock contention between concurrent requests. Each caller awaits its own
+result; an invalid order fails on its own without affecting the rest of its
+batch.
+"""
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from pizza_app.database import SessionLocal
+from pizza_app.models.order_models import Order as OrderModel, OrderItem as OrderItemModel
+from pizza_app.models.order_schemas import Order, OrderCreate
+from pizza_app.models.pizza_models import Topping as ToppingModel
+from pizza_app.services.catalog_snapshot import catalog_snapshot
+from pizza_app.services.kitchen import ORDER_PLACED, prune_events, publish_events, record_event
+from pizza_app.services.pricing import load_price_list, price_item
+from pizza_app.services.references import attach_reference
+
+logger = logging.getLogger(__name__)
+
+
+def order_to_schema(order: OrderModel) -> Order:
+    return Order(
+        id=order.id,
+        customer_name=order.customer_name,
+        status=order.status,
+        total=order.total,
+        created_at=order.created_at,
+        items=[
+            {
+                "id": item.id,
+                "pizza_id": item.pizza_id,
+                "size_id": item.size_id,
+                "sauce_id": item.sauce_id,
+                "crust_id": item.crust_id,
+                "topping_ids": [topping.id for topping in item.toppings],
+                "quantity": item.quantity,
+                "unit_price": item.unit_price,
+            }
+            for item in order.items
+        ],
+    )
+
+
+class OrderIntake:
+    def __init__(self, max_batch_size: int = 128, max_wait: float = 0.002):
+        """
+        max_batch_size: most orders committed in one transaction
+        max_wait: how long (seconds) the writer waits for more orders to
+                  join a batch once it has one
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self.committed_orders = 0
+        self.committed_batches = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Commit whatever is queued, then stop the writer"""
+        if self._writer is None:
+            return
+        await self._queue.put(None)
+        await self._writer
+        self._writer = None
+
+    async def submit(self, order: OrderCreate) -> Order:
+        """Queue an order and wait until it has been committed (or rejected)"""
+        if self._writer is None:
+            raise RuntimeError("Order intake is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((order, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    entry = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            try:
+                results = await run_in_threadpool(self._commit_batch, [order for order, _ in batch])
+            except Exception as e:
+                logger.exception("Order batch of %d failed to commit", len(batch))
+                results = [e] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _commit_batch(self, orders: List[OrderCreate]) -> List[object]:
+        """Price, insert and commit a batch; returns an Order or an exception per input"""
+        # Keep the committed rows loaded so responses need no re-SELECT
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            prices = load_price_list(catalog_snapshot.current, (item for order in orders for item in order.items))
+            results: List[object] = []
+            accepted: List[Tuple[int, OrderModel]] = []
+            for position, order in enumerate(orders):
+                try:
+                    unit_prices = [price_item(prices, item) for item in order.items]
+                except HTTPException as e:
+                    results.append(e)
+                    continue
+                db_order = OrderModel(
+                    customer_name=order.customer_name,
+                    total=round(sum(price * item.quantity for price, item in zip(unit_prices, order.items)), 2),
+                )
+                for price, item in zip(unit_prices, order.items):
+                    db_item = OrderItemModel(
+                        pizza_id=item.pizza_id,
+                        size_id=item.size_id,
+                        sauce_id=item.sauce_id,
+                        crust_id=item.crust_id,
+                        quantity=item.quantity,
+                        unit_price=price,
+                    )
+                    # IDs were validated by pricing, attach without loading
+                    db_item.toppings = [attach_reference(db, ToppingModel, topping_id) for topping_id in dict.fromkeys(item.topping_ids)]
+                    db_order.items.append(db_item)
+                db.add(db_order)
+                results.append(None)
+                accepted.append((position, db_order))
+
+            if accepted:
+                # Order IDs are needed for the kitchen events in the same transaction
+                db.flush()
+                events = []
+                for position, db_order in accepted:
+                    results[position] = order_to_schema(db_order)
+                    events.append(record_event(db, ORDER_PLACED, results[position]))
+                prune_events(db)
+                db.commit()
+                self.committed_orders += len(accepted)
+                self.committed_batches += 1
+                publish_events(events)
+            return results
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+order_intake = OrderIntake()
@@ -0,0 +1,116 @@
+"""
+Server-side pricing of order items from the catalog.
+
+A pizza's unit price is size.base_price + sauce.price + crust.price + the
+prices of its toppings. Designer pizzas use their own sauce, crust and
+toppings, plus any extra toppings ordered on top. Prices come from the
+catalog snapshot, which is current as of the last catalog commit this
+process has seen (see services/coherence.py for other processes' commits).
+"""
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from fastapi import HTTPException
+
+from pizza_app.models.order_schemas import OrderItemCreate
+from pizza_app.services.catalog_snapshot import CatalogSnapshot
+
+
+class PricingError(HTTPException):
+    def __init__(self, detail: str, status_code: int = 422):
+        super().__init__(status_code=status_code, detail=detail)
+
+
+@dataclass(frozen=True)
+class DesignerPizza:
+    sauce_id: Optional[int]
+    crust_id: Optional[int]
+    is_available: bool
+    size_ids: FrozenSet[int]
+    topping_ids: Tuple[int, ...]
+
+
+@dataclass
+class PriceList:
+    """Prices for just the catalog rows referenced by a batch of order items"""
+    sizes: Dict[int, float] = field(default_factory=dict)
+    sauces: Dict[int, float] = field(default_factory=dict)
+    crusts: Dict[int, float] = field(default_factory=dict)
+    toppings: Dict[int, float] = field(default_factory=dict)
+    pizzas: Dict[int, DesignerPizza] = field(default_factory=dict)
+
+
+def load_price_list(snapshot: CatalogSnapshot, items: Iterable[OrderItemCreate]) -> PriceList:
+    """Prices for everything ``items`` reference, read from the catalog snapshot (no queries)"""
+    items = list(items)
+    size_ids = {item.size_id for item in items}
+    sauce_ids = {item.sauce_id for item in items if item.sauce_id is not None}
+    crust_ids = {item.crust_id for item in items if item.crust_id is not None}
+    topping_ids = {topping_id for item in items for topping_id in item.topping_ids}
+
+    prices = PriceList()
+    for pizza_id in {item.pizza_id for item in items if item.pizza_id is not None}:
+        pizza = snapshot.pizzas.get(pizza_id)
+        if pizza is None:
+            continue
+        prices.pizzas[pizza_id] = DesignerPizza(
+            sauce_id=pizza.sauce_id,
+            crust_id=pizza.crust_id,
+            is_available=bool(pizza.is_available),
+            size_ids=frozenset(pizza.size_ids),
+            topping_ids=pizza.topping_ids,
+        )
+        if pizza.sauce_id is not None:
+            sauce_ids.add(pizza.sauce_id)
+        if pizza.crust_id is not None:
+            crust_ids.add(pizza.crust_id)
+        topping_ids.update(pizza.topping_ids)
+
+    prices.sizes = {size_id: snapshot.sizes[size_id].base_price for size_id in size_ids if size_id in snapshot.sizes}
+    prices.sauces = {sauce_id: snapshot.sauces[sauce_id].price for sauce_id in sauce_ids if sauce_id in snapshot.sauces}
+    prices.crusts = {crust_id: snapshot.crusts[crust_id].price for crust_id in crust_ids if crust_id in snapshot.crusts}
+    prices.toppings = {
+        topping_id: snapshot.toppings[topping_id].price for topping_id in topping_ids if topping_id in snapshot.toppings
+    }
+    return prices
+
+
+def _lookup(table: Dict[int, float], entity_id: int, label: str) -> float:
+    try:
+        return table[entity_id]
+    except KeyError:
+        raise PricingError(f"{label} ID {entity_id} not found", status_code=404)
+
+
+def price_item(prices: PriceList, item: OrderItemCreate) -> float:
+    """Unit price for one order item; raises PricingError if it cannot be ordered"""
+    size_price = _lookup(prices.sizes, item.size_id, "Size")
+    extras = sum(_lookup(prices.toppings, topping_id, "Topping") for topping_id in dict.fromkeys(item.topping_ids))
+
+    if item.pizza_id is None:
+        if item.sauce_id is None or item.crust_id is None:
+            raise PricingError("Build-your-own pizzas need a sauce_id and a crust_id")
+        return round(
+            size_price
+            + _lookup(prices.sauces, item.sauce_id, "Sauce")
+            + _lookup(prices.crusts, item.crust_id, "Crust")
+            + extras,
+            2,
+        )
+
+    pizza = prices.pizzas.get(item.pizza_id)
+    if pizza is None:
+        raise PricingError(f"Pizza ID {item.pizza_id} not found", status_code=404)
+    if not pizza.is_available:
+        raise PricingError(f"Pizza ID {item.pizza_id} is not available")
+    if item.size_id not in pizza.size_ids:
+        raise PricingError(f"Pizza ID {item.pizza_id} is not offered in size ID {item.size_id}")
+    if item.sauce_id is not None or item.crust_id is not None:
+        raise PricingError("Designer pizzas use their own sauce and crust")
+
+    base = sum(prices.toppings[topping_id] for topping_id in pizza.topping_ids)
+    if pizza.sauce_id is not None:
+        base += prices.sauces[pizza.sauce_id]
+    if pizza.crust_id is not None:
+        base += prices.crusts[pizza.crust_id]
+    return round(size_price + base + extras, 2)
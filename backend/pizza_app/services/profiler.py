@@ -0,0 +1,108 @@
+"""
+Sampling profiler for diagnosing a live worker.
+
+While a profile runs, a background thread snapshots the stack of every
+other thread in the process (sys._current_frames) at a fixed interval and
+counts identical stacks. Nothing runs between profiles, so an idle profiler
+costs nothing. Output is in the "collapsed stack" format (one
+``frame;frame;frame count`` line per distinct stack) read by flamegraph.pl,
+speedscope and most other flame graph tools; the root frame is the thread
+name, so the event loop and threadpool threads show up separately.
+
+Only one profile runs per process at a time.
+"""
+import os
+import sys
+import sysconfig
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+# Longest prefixes first, so site-packages wins over the stdlib directory
+_PATH_PREFIXES = sorted(
+    {path for path in (sysconfig.get_path("purelib"), sysconfig.get_path("stdlib"), os.getcwd()) if path},
+    key=len,
+    reverse=True,
+)
+_short_paths: Dict[str, str] = {}
+
+
+def _short_path(filename: str) -> str:
+    short = _short_paths.get(filename)
+    if short is None:
+        short = filename
+        for prefix in _PATH_PREFIXES:
+            if filename.startswith(prefix + os.sep):
+                short = filename[len(prefix) + 1:]
+                break
+        _short_paths[filename] = short
+    return short
+
+
+def _frame_label(code) -> str:
+    # ';' separates frames in the collapsed format
+    return f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = False
+        self._stop = threading.Event()
+        self._samples: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self.sample_count = 0
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self, interval: float) -> None:
+        """Start sampling every ``interval`` seconds; raises ProfilerBusy if already running"""
+        with self._lock:
+            if self._running:
+                raise ProfilerBusy("A profile is already running in this worker")
+            self._running = True
+        self._stop.clear()
+        self._samples = Counter()
+        self.sample_count = 0
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        samples = self._samples
+        with self._lock:
+            self._running = False
+        return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+    def _run(self, interval: float) -> None:
+        own_id = threading.get_ident()
+        labels: Dict[object, str] = {}
+        while not self._stop.wait(interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    frames.append(label)
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, f"thread-{thread_id}").replace(" ", "_"))
+                self._samples[";".join(reversed(frames))] += 1
+            self.sample_count += 1
+
+
+profiler = SamplingProfiler()
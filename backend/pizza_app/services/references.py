@@ -0,0 +1,132 @@
+"""
+Set-based resolution of the IDs referenced by pizza/topping write requests.
+
+All referenced sizes, sauces, crusts, toppings and topping categories are
+checked for existence with one UNION ALL query. Missing IDs across every
+entity type are reported together in a single 404.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from pizza_app.models.pizza_models import (
+    Size as SizeModel,
+    Sauce as SauceModel,
+    Crust as CrustModel,
+    Topping as ToppingModel,
+    ToppingCategory as ToppingCategoryModel,
+)
+
+# kind -> (model, label used in error messages)
+_KINDS = {
+    "size": (SizeModel, "Size"),
+    "sauce": (SauceModel, "Sauce"),
+    "crust": (CrustModel, "Crust"),
+    "topping": (ToppingModel, "Topping"),
+    "category": (ToppingCategoryModel, "Topping category"),
+}
+
+
+class MissingReferences(HTTPException):
+    """404 raised when one or more referenced IDs do not exist"""
+
+    def __init__(self, missing: Dict[str, List[int]]):
+        self.missing = missing
+        messages = []
+        for kind, ids in missing.items():
+            label = _KINDS[kind][1]
+            if kind in ("sauce", "crust"):
+                messages.append(f"{label} ID {ids[0]} not found")
+            else:
+                messages.append(f"{label} IDs not found: {ids}")
+        super().__init__(status_code=404, detail="; ".join(messages))
+
+
+@dataclass
+class ResolvedReferences:
+    sizes: List[SizeModel] = field(default_factory=list)
+    sauce: Optional[SauceModel] = None
+    crust: Optional[CrustModel] = None
+    toppings: List[ToppingModel] = field(default_factory=list)
+    categories: List[ToppingCategoryModel] = field(default_factory=list)
+
+
+def _unique(ids: Iterable[int]) -> List[int]:
+    return list(dict.fromkeys(ids))
+
+
+def attach_reference(db: Session, model, entity_id: int):
+    """
+    Return a persistent instance for a row known to exist, without loading it.
+
+    Reuses the instance already in the session's identity map if there is one,
+    otherwise attaches an unloaded stub whose attributes load lazily on access.
+    """
+    existing = db.identity_map.get(db.identity_key(model, entity_id))
+    if existing is not None:
+        return existing
+    stub = model(id=entity_id)
+    make_transient_to_detached(stub)
+    db.add(stub)
+    return stub
+
+
+def find_missing(db: Session, requested: Dict[str, List[int]]) -> Dict[str, List[int]]:
+    """Check every requested ID in one compound query, returning the missing ones per kind"""
+    selects = [
+        select(literal(kind).label("kind"), _KINDS[kind][0].id.label("id"))
+        .where(_KINDS[kind][0].id.in_(ids))
+        for kind, ids in requested.items()
+        if ids
+    ]
+    if not selects:
+        return {}
+
+    found = {(kind, entity_id) for kind, entity_id in db.execute(union_all(*selects))}
+    missing = {}
+    for kind, ids in requested.items():
+        absent = [entity_id for entity_id in ids if (kind, entity_id) not in found]
+        if absent:
+            missing[kind] = absent
+    return missing
+
+
+def resolve_references(
+    db: Session,
+    size_ids: Optional[Iterable[int]] = None,
+    sauce_id: Optional[int] = None,
+    crust_id: Optional[int] = None,
+    topping_ids: Optional[Iterable[int]] = None,
+    category_ids: Optional[Iterable[int]] = None,
+) -> ResolvedReferences:
+    """
+    Validate all referenced IDs at once and return session-bound references.
+
+    Arguments left as None are not checked. Raises MissingReferences listing
+    every unknown ID if any are missing.
+    """
+    requested = {
+        "size": _unique(size_ids) if size_ids is not None else [],
+        "sauce": [sauce_id] if sauce_id is not None else [],
+        "crust": [crust_id] if crust_id is not None else [],
+        "topping": _unique(topping_ids) if topping_ids is not None else [],
+        "category": _unique(category_ids) if category_ids is not None else [],
+    }
+
+    missing = find_missing(db, requested)
+    if missing:
+        raise MissingReferences(missing)
+
+    def refs(kind):
+        return [attach_reference(db, _KINDS[kind][0], entity_id) for entity_id in requested[kind]]
+
+    return ResolvedReferences(
+        sizes=refs("size"),
+        sauce=attach_reference(db, SauceModel, sauce_id) if sauce_id is not None else None,
+        crust=attach_reference(db, CrustModel, crust_id) if crust_id is not None else None,
+        toppings=refs("topping"),
+        categories=refs("category"),
+    )
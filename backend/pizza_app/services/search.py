@@ -0,0 +1,153 @@
+"""
+Full-text and faceted pizza search.
+
+Text matching uses the ``pizza_search`` FTS5 table (see migration 0003), which
+SQLite triggers keep up to date on every write. Facet filters are applied with
+indexed lookups on the regular tables. A pizza's price for a size is
+size.base_price + sauce.price + crust.price + the sum of its topping prices.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+# bm25 column weights: name, description, toppings (lower rank = better match)
+_RANK = "bm25(pizza_search, 10.0, 2.0, 5.0)"
+
+# Everything on a pizza except the size
+_EXTRAS_PRICE = """
+    COALESCE(sa.price, 0) + COALESCE(cr.price, 0)
+    + COALESCE((SELECT SUM(t.price) FROM pizza_toppings pt
+                JOIN toppings t ON t.id = pt.topping_id
+                WHERE pt.pizza_id = p.id), 0)
+"""
+
+
+@dataclass
+class SearchResult:
+    total: int
+    pizza_ids: List[int]
+    categories: Dict[int, int] = field(default_factory=dict)
+    sauces: Dict[int, int] = field(default_factory=dict)
+    crusts: Dict[int, int] = field(default_factory=dict)
+    availability: Dict[bool, int] = field(default_factory=dict)
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+
+def build_match_query(q: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix.
+
+    Words are quoted so FTS5 operators typed by users are treated as text.
+    """
+    words = re.findall(r"\w+", q.lower())
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_pizzas(
+    db: Session,
+    q: Optional[str] = None,
+    category_ids: Optional[List[int]] = None,
+    sauce_id: Optional[int] = None,
+    crust_id: Optional[int] = None,
+    is_available: Optional[bool] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> SearchResult:
+    """
+    Search pizzas by text and facets.
+
+    Returns one page of matching pizza IDs (best match first when ``q`` is
+    given) along with facet counts over the full matched set.
+    """
+    params = {}
+    joins = ["LEFT JOIN sauces sa ON sa.id = p.sauce_id", "LEFT JOIN crusts cr ON cr.id = p.crust_id"]
+    where = []
+    rank = "0"
+
+    match = build_match_query(q) if q else None
+    if match:
+        joins.insert(0, "JOIN pizza_search ON pizza_search.rowid = p.id")
+        where.append("pizza_search MATCH :match")
+        params["match"] = match
+        rank = _RANK
+    if sauce_id is not None:
+        where.append("p.sauce_id = :sauce_id")
+        params["sauce_id"] = sauce_id
+    if crust_id is not None:
+        where.append("p.crust_id = :crust_id")
+        params["crust_id"] = crust_id
+    if is_available is not None:
+        where.append("p.is_available = :is_available")
+        params["is_available"] = is_available
+    bind_categories = bool(category_ids)
+    if bind_categories:
+        # Any topping in any of the requested categories
+        where.append("""EXISTS (
+            SELECT 1 FROM pizza_toppings pt
+            JOIN topping_categories_link l ON l.topping_id = pt.topping_id
+            WHERE pt.pizza_id = p.id AND l.category_id IN :category_ids)""")
+        params["category_ids"] = list(category_ids)
+
+    matched = f"""
+        SELECT p.id, p.sauce_id, p.crust_id, p.is_available, {rank} AS rank, {_EXTRAS_PRICE} AS extras
+        FROM pizzas p {' '.join(joins)}
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+    """
+
+    # Price range: at least one of the pizza's sizes must fall inside it
+    price_where = []
+    if min_price is not None:
+        price_where.append("s.base_price + m.extras >= :min_price")
+        params["min_price"] = min_price
+    if max_price is not None:
+        price_where.append("s.base_price + m.extras <= :max_price")
+        params["max_price"] = max_price
+    priced = "SELECT * FROM matched m"
+    if price_where:
+        priced += f""" WHERE EXISTS (
+            SELECT 1 FROM pizza_sizes ps JOIN sizes s ON s.id = ps.size_id
+            WHERE ps.pizza_id = m.id AND {' AND '.join(price_where)})"""
+
+    cte = f"WITH matched AS ({matched}), hits AS ({priced}) "
+
+    def run(sql, **extra):
+        statement = text(cte + sql)
+        if bind_categories:
+            statement = statement.bindparams(bindparam("category_ids", expanding=True))
+        return db.execute(statement, {**params, **extra})
+
+    page = run(
+        "SELECT id FROM hits ORDER BY rank, id LIMIT :limit OFFSET :offset",
+        limit=limit, offset=offset,
+    )
+    result = SearchResult(total=run("SELECT COUNT(*) FROM hits").scalar(), pizza_ids=[row.id for row in page])
+    if result.total == 0:
+        return result
+
+    result.sauces = dict(run("SELECT sauce_id, COUNT(*) FROM hits WHERE sauce_id IS NOT NULL GROUP BY sauce_id").all())
+    result.crusts = dict(run("SELECT crust_id, COUNT(*) FROM hits WHERE crust_id IS NOT NULL GROUP BY crust_id").all())
+    result.availability = {
+        bool(available): count
+        for available, count in run("SELECT is_available, COUNT(*) FROM hits GROUP BY is_available")
+        if available is not None
+    }
+    result.categories = dict(run("""
+        SELECT l.category_id, COUNT(DISTINCT h.id) FROM hits h
+        JOIN pizza_toppings pt ON pt.pizza_id = h.id
+        JOIN topping_categories_link l ON l.topping_id = pt.topping_id
+        GROUP BY l.category_id
+    """).all())
+    result.min_price, result.max_price = run("""
+        SELECT MIN(s.base_price + h.extras), MAX(s.base_price + h.extras) FROM hits h
+        JOIN pizza_sizes ps ON ps.pizza_id = h.id
+        JOIN sizes s ON s.id = ps.size_id
+    """).one()
+    return result
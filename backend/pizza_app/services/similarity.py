@@ -0,0 +1,222 @@
+"""
+"Customers also like": the designer pizzas most similar to each pizza.
+
+A pizza's features are its toppings, sauce and crust, held as one int
+bitset, and two pizzas are as similar as the Jaccard index of their
+features. Each pizza's NEIGHBOURS most similar available pizzas are kept as
+a ranked row, so serving them is a dict lookup.
+
+Rows are scored one pizza against all the others (a popcount per pair) the
+first time they are asked for. With numpy installed, precompute() scores
+every row up front instead: a 0/1 feature matrix multiplied by its own
+transpose, a block of rows at a time. A catalog change re-scores only what
+it touched: the changed pizzas' rows are dropped, other rows that ranked a
+changed pizza are dropped too, and rows a changed pizza now belongs in get
+it inserted. Dropped rows are scored again on next use.
+
+Features come from the catalog snapshot, whose commit listener is
+registered (by importing it) before this index's and so has already applied
+a change when this index sees it.
+"""
+import heapq
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pizza_app.services import catalog_events
+from pizza_app.services.catalog_snapshot import CatalogSnapshot, PizzaRecord, catalog_snapshot
+from pizza_app.services.topping_index import from_bitset
+
+try:
+    import numpy
+except ImportError:  # optional
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+# Neighbours kept per pizza (the most /similar can return)
+NEIGHBOURS = 20
+# Cells of the pairwise score matrix held at once while precomputing
+_BLOCK_CELLS = 4_000_000
+# Above this many changed pizzas, patching every row costs more than starting over
+_MAX_PATCHED = 64
+
+# (pizza ID, similarity), most similar first, then by ID
+Row = Tuple[Tuple[int, float], ...]
+
+
+def features(pizza: PizzaRecord) -> int:
+    """Bitset of the pizza's toppings (bit 3N), sauce (3N + 1) and crust (3N + 2)"""
+    bits = 0
+    for topping_id in pizza.topping_ids:
+        bits |= 1 << 3 * topping_id
+    if pizza.sauce_id is not None:
+        bits |= 1 << 3 * pizza.sauce_id + 1
+    if pizza.crust_id is not None:
+        bits |= 1 << 3 * pizza.crust_id + 2
+    return bits
+
+
+def jaccard(a: int, b: int) -> float:
+    shared = (a & b).bit_count()
+    return shared / (a | b).bit_count() if shared else 0.0
+
+
+def _ranked(scored) -> Row:
+    """The best NEIGHBOURS of (pizza ID, similarity) pairs with a similarity above 0"""
+    best = heapq.nsmallest(NEIGHBOURS, ((-score, pizza_id) for pizza_id, score in scored if score > 0))
+    return tuple((pizza_id, -negated) for negated, pizza_id in best)
+
+
+def _score_row(pizza_id: int, bits: int, listed: Dict[int, int]) -> Row:
+    return _ranked(
+        (other_id, jaccard(bits, other)) for other_id, other in listed.items() if other_id != pizza_id
+    )
+
+
+def _score_all(features_by_pizza: Dict[int, int], listed: Dict[int, int]) -> Dict[int, Row]:
+    """Every pizza's row, scored with numpy in blocks of rows"""
+    pizza_ids, listed_ids = list(features_by_pizza), list(listed)
+    if not listed_ids:
+        return {pizza_id: () for pizza_id in pizza_ids}
+    positions = {pizza_id: from_bitset(bits) for pizza_id, bits in features_by_pizza.items()}
+    columns = {position: column for column, position in enumerate(sorted(set().union(*positions.values())))}
+
+    def matrix(ids: List[int]):
+        rows = numpy.zeros((len(ids), len(columns)), dtype=numpy.float32)
+        for row, pizza_id in enumerate(ids):
+            rows[row, [columns[position] for position in positions[pizza_id]]] = 1
+        return rows
+
+    everyone, candidates = matrix(pizza_ids), matrix(listed_ids)
+    candidate_sizes = candidates.sum(axis=1, dtype=numpy.float64)
+    listed_column = {pizza_id: column for column, pizza_id in enumerate(listed_ids)}
+    block_rows = max(1, _BLOCK_CELLS // len(listed_ids))
+    rows: Dict[int, Row] = {}
+    for start in range(0, len(pizza_ids), block_rows):
+        block = everyone[start:start + block_rows]
+        # Counts are small integers, exact in float32
+        shared = (block @ candidates.T).astype(numpy.float64)
+        union = block.sum(axis=1, dtype=numpy.float64)[:, None] + candidate_sizes[None, :] - shared
+        scores = numpy.divide(shared, union, out=numpy.zeros_like(shared), where=shared > 0)
+        for offset, pizza_id in enumerate(pizza_ids[start:start + block_rows]):
+            row_scores = scores[offset]
+            if pizza_id in listed_column:
+                row_scores[listed_column[pizza_id]] = 0
+            top = numpy.flatnonzero(row_scores)
+            if len(top) > NEIGHBOURS:
+                # Everything tied with the last place, so ties rank by ID as in _score_row
+                threshold = numpy.partition(row_scores[top], -NEIGHBOURS)[-NEIGHBOURS]
+                top = top[row_scores[top] >= threshold]
+            rows[pizza_id] = _ranked((listed_ids[column], float(row_scores[column])) for column in top)
+    return rows
+
+
+class SimilarityIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        # Features of every pizza, and of the available ones (the candidates)
+        self._features: Dict[int, int] = {}
+        self._listed: Dict[int, int] = {}
+        self._rows: Dict[int, Row] = {}
+        # Bumped on every change, so work started on older features is discarded
+        self._generation = 0
+        self.version = 0
+
+    def load(self, snapshot: CatalogSnapshot) -> None:
+        """Take every pizza's features from the snapshot; rows are scored on use"""
+        features_by_pizza = {pizza.id: features(pizza) for pizza in snapshot.pizzas.values()}
+        listed = {pizza.id: features_by_pizza[pizza.id] for pizza in snapshot.pizzas.values() if pizza.is_available}
+        with self._lock:
+            self._features, self._listed, self._rows = features_by_pizza, listed, {}
+            self._generation += 1
+            self.version = snapshot.version
+            self._loaded = True
+
+    def precompute(self) -> None:
+        """Score every row now (with numpy; without it rows are left to be scored on use)"""
+        if numpy is None:
+            return
+        with self._lock:
+            generation, features_by_pizza, listed = self._generation, self._features, self._listed
+        started = time.perf_counter()
+        rows = _score_all(features_by_pizza, listed)
+        with self._lock:
+            if self._generation != generation:
+                return
+            self._rows = rows
+        logger.info(
+            "Similarity index: %d pizzas scored in %.1f ms", len(rows), (time.perf_counter() - started) * 1000
+        )
+
+    def neighbours(self, pizza_id: int, limit: int = NEIGHBOURS) -> List[Tuple[int, float]]:
+        """Up to ``limit`` (pizza ID, similarity) pairs, most similar first"""
+        if not self._loaded:
+            self.load(catalog_snapshot.current)
+        row = self._rows.get(pizza_id)
+        if row is None:
+            with self._lock:
+                generation, bits, listed = self._generation, self._features.get(pizza_id), self._listed
+            if bits is None:
+                return []
+            row = _score_row(pizza_id, bits, listed)
+            with self._lock:
+                if self._generation == generation:
+                    self._rows[pizza_id] = row
+        return list(row[:limit])
+
+    def apply(self, changes: List[catalog_events.CatalogChange]) -> None:
+        if not self._loaded:
+            return
+        snapshot = catalog_snapshot.current
+        pizza_ids = {change.id for change in changes if change.entity == "pizza"}
+        if any(change.entity == "topping" and change.op == catalog_events.DELETE for change in changes):
+            # Removed from every pizza that had it
+            pizza_ids.update(self._features)
+
+        with self._lock:
+            features_by_pizza, listed = dict(self._features), dict(self._listed)
+            changed: List[Tuple[int, Optional[int]]] = []
+            for pizza_id in pizza_ids:
+                pizza = snapshot.pizzas.get(pizza_id)
+                bits = features(pizza) if pizza is not None else None
+                listed_bits = bits if pizza is not None and pizza.is_available else None
+                if bits == features_by_pizza.get(pizza_id) and listed_bits == listed.get(pizza_id):
+                    continue
+                for table, value in ((features_by_pizza, bits), (listed, listed_bits)):
+                    if value is None:
+                        table.pop(pizza_id, None)
+                    else:
+                        table[pizza_id] = value
+                changed.append((pizza_id, listed_bits))
+            self.version = snapshot.version
+            if not changed:
+                return
+
+            if len(changed) > _MAX_PATCHED:
+                rows = {}
+            else:
+                rows = self._patched_rows(changed, features_by_pizza)
+            self._features, self._listed, self._rows = features_by_pizza, listed, rows
+            self._generation += 1
+
+    def _patched_rows(self, changed: List[Tuple[int, Optional[int]]], features_by_pizza: Dict[int, int]) -> Dict[int, Row]:
+        changed_ids = {pizza_id for pizza_id, _ in changed}
+        rows = {}
+        for pizza_id, row in self._rows.items():
+            if pizza_id in changed_ids or any(neighbour_id in changed_ids for neighbour_id, _ in row):
+                # Scored again on use: a changed neighbour may have dropped
+                # below pizzas that are not in the row
+                continue
+            bits = features_by_pizza[pizza_id]
+            additions = [(other_id, jaccard(bits, other)) for other_id, other in changed if other is not None]
+            if any(score > 0 for _, score in additions):
+                row = _ranked(row + tuple(additions))
+            rows[pizza_id] = row
+        return rows
+
+
+pizza_similarity = SimilarityIndex()
+catalog_events.on_commit(pizza_similarity.apply)
@@ -0,0 +1,165 @@
+"""
+In-memory inverted indexes: topping -> pizzas and category -> toppings.
+
+Sets of IDs are stored as Python ints used as bitsets (bit N set = ID N is a
+member), so include/exclude filters are a handful of AND/OR/AND-NOT operations
+regardless of how many pizzas match. The index is rebuilt from the association
+tables at startup and kept current from catalog commit events.
+"""
+import threading
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from pizza_app.models.pizza_models import Pizza, pizza_toppings, topping_categories
+from pizza_app.services import catalog_events
+
+
+def to_bitset(ids: Iterable[int]) -> int:
+    bits = 0
+    for entity_id in ids:
+        bits |= 1 << entity_id
+    return bits
+
+
+def from_bitset(bits: int) -> List[int]:
+    """IDs of the set bits, ascending"""
+    # Scanning the binary string is linear; peeling bits off one at a time
+    # would copy the whole (possibly very large) int for every member
+    binary = bin(bits)[:1:-1]
+    return [position for position, bit in enumerate(binary) if bit == "1"]
+
+
+class ToppingIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.all_pizzas = 0
+        self.pizzas_by_topping: Dict[int, int] = {}
+        self.toppings_by_pizza: Dict[int, int] = {}
+        self.toppings_by_category: Dict[int, int] = {}
+        self.categories_by_topping: Dict[int, int] = {}
+
+    def rebuild(self, connection: Connection) -> None:
+        """Load everything from the database, replacing the current contents"""
+        pizza_ids = connection.execute(select(Pizza.id)).scalars().all()
+        pizza_links = connection.execute(select(pizza_toppings.c.pizza_id, pizza_toppings.c.topping_id)).all()
+        category_links = connection.execute(
+            select(topping_categories.c.topping_id, topping_categories.c.category_id)
+        ).all()
+
+        pizzas_by_topping, toppings_by_pizza = {}, {}
+        for pizza_id, topping_id in pizza_links:
+            pizzas_by_topping[topping_id] = pizzas_by_topping.get(topping_id, 0) | (1 << pizza_id)
+            toppings_by_pizza[pizza_id] = toppings_by_pizza.get(pizza_id, 0) | (1 << topping_id)
+        toppings_by_category, categories_by_topping = {}, {}
+        for topping_id, category_id in category_links:
+            toppings_by_category[category_id] = toppings_by_category.get(category_id, 0) | (1 << topping_id)
+            categories_by_topping[topping_id] = categories_by_topping.get(topping_id, 0) | (1 << category_id)
+
+        with self._lock:
+            self.all_pizzas = to_bitset(pizza_ids)
+            self.pizzas_by_topping = pizzas_by_topping
+            self.toppings_by_pizza = toppings_by_pizza
+            self.toppings_by_category = toppings_by_category
+            self.categories_by_topping = categories_by_topping
+
+    # ----------------------
+    # Incremental updates
+    # ----------------------
+    def _set_members(self, forward: Dict[int, int], reverse: Dict[int, int], key: int, members: Iterable[int]) -> None:
+        """Replace ``forward[key]`` and patch the reverse bitsets to match"""
+        old = forward.get(key, 0)
+        new = to_bitset(members)
+        bit = 1 << key
+        for member in from_bitset(old & ~new):
+            reverse[member] = reverse.get(member, 0) & ~bit
+        for member in from_bitset(new & ~old):
+            reverse[member] = reverse.get(member, 0) | bit
+        forward[key] = new
+
+    def set_pizza_toppings(self, pizza_id: int, topping_ids: Iterable[int]) -> None:
+        with self._lock:
+            self.all_pizzas |= 1 << pizza_id
+            self._set_members(self.toppings_by_pizza, self.pizzas_by_topping, pizza_id, topping_ids)
+
+    def add_pizza(self, pizza_id: int) -> None:
+        with self._lock:
+            self.all_pizzas |= 1 << pizza_id
+
+    def remove_pizza(self, pizza_id: int) -> None:
+        with self._lock:
+            self._set_members(self.toppings_by_pizza, self.pizzas_by_topping, pizza_id, ())
+            del self.toppings_by_pizza[pizza_id]
+            self.all_pizzas &= ~(1 << pizza_id)
+
+    def set_topping_categories(self, topping_id: int, category_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._set_members(self.categories_by_topping, self.toppings_by_category, topping_id, category_ids)
+
+    def remove_topping(self, topping_id: int) -> None:
+        with self._lock:
+            self._set_members(self.categories_by_topping, self.toppings_by_category, topping_id, ())
+            self.categories_by_topping.pop(topping_id, None)
+            bit = ~(1 << topping_id)
+            for pizza_id in from_bitset(self.pizzas_by_topping.pop(topping_id, 0)):
+                self.toppings_by_pizza[pizza_id] &= bit
+
+    def remove_category(self, category_id: int) -> None:
+        with self._lock:
+            bit = ~(1 << category_id)
+            for topping_id in from_bitset(self.toppings_by_category.pop(category_id, 0)):
+                self.categories_by_topping[topping_id] &= bit
+
+    def apply(self, changes: List[catalog_events.CatalogChange]) -> None:
+        for change in changes:
+            if change.entity == "pizza":
+                if change.op == catalog_events.DELETE:
+                    self.remove_pizza(change.id)
+                elif "toppings" in change.links:
+                    self.set_pizza_toppings(change.id, change.links["toppings"])
+                else:
+                    self.add_pizza(change.id)
+            elif change.entity == "topping":
+                if change.op == catalog_events.DELETE:
+                    self.remove_topping(change.id)
+                elif "categories" in change.links:
+                    self.set_topping_categories(change.id, change.links["categories"])
+            elif change.entity == "topping_category" and change.op == catalog_events.DELETE:
+                self.remove_category(change.id)
+
+    # ----------------------
+    # Queries
+    # ----------------------
+    def pizzas_in_category(self, category_id: int) -> int:
+        """Bitset of pizzas with at least one topping in the category"""
+        bits = 0
+        for topping_id in from_bitset(self.toppings_by_category.get(category_id, 0)):
+            bits |= self.pizzas_by_topping.get(topping_id, 0)
+        return bits
+
+    def filter_pizzas(
+        self,
+        include_toppings: Iterable[int] = (),
+        exclude_toppings: Iterable[int] = (),
+        include_categories: Iterable[int] = (),
+        exclude_categories: Iterable[int] = (),
+    ) -> List[int]:
+        """
+        Pizza IDs that have every included topping, a topping from every
+        included category, and none of the excluded toppings or categories.
+        """
+        bits = self.all_pizzas
+        for topping_id in include_toppings:
+            bits &= self.pizzas_by_topping.get(topping_id, 0)
+        for category_id in include_categories:
+            bits &= self.pizzas_in_category(category_id)
+        for topping_id in exclude_toppings:
+            bits &= ~self.pizzas_by_topping.get(topping_id, 0)
+        for category_id in exclude_categories:
+            bits &= ~self.pizzas_in_category(category_id)
+        return from_bitset(bits)
+
+
+topping_index = ToppingIndex()
+catalog_events.on_commit(topping_index.apply)
@@ -0,0 +1,144 @@
+"""
+Runtime settings for the pizza API.
+Every value can be overridden with an environment variable of the same name.
+"""
+import os
+from typing import Tuple
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_list(name: str, default: Tuple[str, ...]) -> Tuple[str, ...]:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+# ----------------------
+# Database
+# ----------------------
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./pizza.db")
+
+# ----------------------
+# Response compression
+# ----------------------
+COMPRESSION_ENABLED = _env_bool("COMPRESSION_ENABLED", True)
+# Responses smaller than this (in bytes) are sent uncompressed
+COMPRESSION_MINIMUM_SIZE = _env_int("COMPRESSION_MINIMUM_SIZE", 500)
+# zlib level (1-9) for gzip
+COMPRESSION_GZIP_LEVEL = _env_int("COMPRESSION_GZIP_LEVEL", 6)
+# brotli quality (0-11); only used when the brotli package is installed
+COMPRESSION_BROTLI_QUALITY = _env_int("COMPRESSION_BROTLI_QUALITY", 4)
+# Only these media types are compressed; images are already compressed
+COMPRESSION_CONTENT_TYPES = _env_list("COMPRESSION_CONTENT_TYPES", (
+    "application/json",
+    "application/javascript",
+    "text/html",
+    "text/css",
+    "text/plain",
+    "image/svg+xml",
+))
+
+
+# ----------------------
+# Kitchen displays
+# ----------------------
+# Order events kept for screens that reconnect or fall behind
+KITCHEN_FEED_BACKLOG = _env_int("KITCHEN_FEED_BACKLOG", 1000)
+# Seconds between keep-alives on idle kitchen connections
+KITCHEN_HEARTBEAT_SECONDS = _env_int("KITCHEN_HEARTBEAT_SECONDS", 15)
+
+# ----------------------
+# Catalog change feed
+# ----------------------
+# Catalog changes kept for clients resuming with ?since=<version>
+CATALOG_FEED_BACKLOG = _env_int("CATALOG_FEED_BACKLOG", 1000)
+# Seconds between keep-alives on idle change-feed connections
+CATALOG_FEED_HEARTBEAT_SECONDS = _env_int("CATALOG_FEED_HEARTBEAT_SECONDS", 15)
+
+# ----------------------
+# Server (pizza_app.serve)
+# ----------------------
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = _env_int("SERVER_PORT", 9002)
+# Worker processes; each keeps its own in-memory indexes and feeds
+SERVER_WORKERS = _env_int("SERVER_WORKERS", os.cpu_count() or 1)
+SERVER_LOG_LEVEL = os.getenv("SERVER_LOG_LEVEL", "info")
+# Minimum milliseconds between request-time checks for changes made by other
+# processes (one indexed read on a dedicated connection, in the threadpool);
+# another worker's write can go unseen for this long. 0 checks on every request
+COHERENCE_CHECK_INTERVAL_MS = _env_int("COHERENCE_CHECK_INTERVAL_MS", 50)
+# Background check interval, so push feeds on a worker that receives no
+# requests still deliver other workers' events; 0 disables it
+COHERENCE_POLL_INTERVAL_MS = _env_int("COHERENCE_POLL_INTERVAL_MS", 500)
+
+# ----------------------
+# Caching
+# ----------------------
+CACHE_ENABLED = _env_bool("CACHE_ENABLED", True)
+# "memory" (per process) or "redis" (shared; needs the redis package)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+# How values are encoded for the redis backend: json, orjson or msgpack
+CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "json")
+# Entries kept by the memory backend before the least recently used are evicted
+CACHE_MAX_ENTRIES = _env_int("CACHE_MAX_ENTRIES", 1024)
+# Catalog entries are also keyed by catalog version, so the TTL only bounds
+# how long superseded entries linger
+CACHE_TTL_SECONDS = _env_int("CACHE_TTL_SECONDS", 300)
+CHAT_CACHE_TTL_SECONDS = _env_int("CHAT_CACHE_TTL_SECONDS", 600)
+
+# ----------------------
+# Idempotent writes (Idempotency-Key header)
+# ----------------------
+IDEMPOTENCY_ENABLED = _env_bool("IDEMPOTENCY_ENABLED", True)
+# POST/PUT/PATCH requests to paths starting with one of these honour the header
+IDEMPOTENCY_PATHS = _env_list("IDEMPOTENCY_PATHS", ("/pizza/", "/orders"))
+# How long a key's response is replayed for
+IDEMPOTENCY_TTL_SECONDS = _env_int("IDEMPOTENCY_TTL_SECONDS", 86400)
+# Keys are stored on CACHE_BACKEND: with "memory" each worker process keeps
+# its own (up to this many, least recently used evicted first), so only
+# "redis" deduplicates retries that reach a different worker
+IDEMPOTENCY_MAX_ENTRIES = _env_int("IDEMPOTENCY_MAX_ENTRIES", 10000)
+
+# ----------------------
+# Chat assistant (/chat)
+# ----------------------
+CHAT_ENABLED = _env_bool("CHAT_ENABLED", True)
+# Build the agents in the background at startup instead of on the first chat
+# request (they are never built if chat is unused and this is off)
+CHAT_PRELOAD = _env_bool("CHAT_PRELOAD", False)
+# OpenAI-compatible endpoint and model (Ollama by default)
+CHAT_BASE_URL = os.getenv("CHAT_BASE_URL", "http://localhost:11434/v1")
+CHAT_API_KEY = os.getenv("CHAT_API_KEY", "ollama")
+CHAT_MODEL = os.getenv("CHAT_MODEL", "llama3.2:latest")
+
+# ----------------------
+# Metrics (/metrics)
+# ----------------------
+METRICS_ENABLED = _env_bool("METRICS_ENABLED", True)
+# Add a Server-Timing header (total, db and serialize time) to every response
+METRICS_SERVER_TIMING = _env_bool("METRICS_SERVER_TIMING", True)
+# Log requests slower than this many milliseconds; 0 disables it
+METRICS_SLOW_REQUEST_MS = _env_int("METRICS_SLOW_REQUEST_MS", 1000)
+
+# ----------------------
+# Admin endpoints (/admin)
+# ----------------------
+# Token expected in the X-Admin-Token header; admin endpoints and request
+# profiling are disabled while it is unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# Sampling interval and longest allowed run for the profiler
+PROFILER_INTERVAL_MS = _env_int("PROFILER_INTERVAL_MS", 5)
+PROFILER_MAX_SECONDS = _env_int("PROFILER_MAX_SECONDS", 60)
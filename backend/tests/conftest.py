@@ -0,0 +1,35 @@
+"""
+Shared fixtures. A test session runs against its own SQLite file, chosen
+through DATABASE_URL before pizza_app is imported, so the development
+pizza.db is never touched.
+"""
+import os
+import tempfile
+
+_DATABASE_DIR = tempfile.mkdtemp(prefix="pizza-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DATABASE_DIR, 'pizza.db')}"
+
+import pytest  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    """The migrated schema with the seed_db catalog"""
+    from pizza_app.models.pizza_models import init_db
+    from pizza_app.seed_db import seed_database
+
+    init_db()
+    seed_database()
+
+
+@pytest.fixture(scope="session")
+def client(seeded_db):
+    """The pizza routes alone, without the app's startup work or middleware"""
+    from pizza_app.router import pizza_route
+
+    app = FastAPI()
+    app.include_router(pizza_route.router)
+    with TestClient(app) as test_client:
+        yield test_client
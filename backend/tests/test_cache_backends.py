@@ -0,0 +1,163 @@
+"""
+Cache backends and the Cache layer over them. The Redis backend runs against
+fakeredis (skipped when it is not installed), so no server is needed.
+"""
+import asyncio
+
+import pytest
+
+from pizza_app.cache.backends import CacheBackend, MemoryBackend, RedisBackend
+from pizza_app.cache.cache import Cache
+from pizza_app.cache.serializers import Serializer, get_serializer
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryBackend(max_entries=16)
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisBackend(client=fakeredis.FakeAsyncRedis(), prefix="test:")
+
+
+def _serializers():
+    for name in ("json", "orjson", "msgpack"):
+        try:
+            yield get_serializer(name)
+        except ValueError:
+            # Optional package not installed
+            continue
+
+
+async def test_set_get_delete(backend):
+    cache = Cache("menu", backend)
+    await cache.set("pizzas", [{"id": 1, "name": "Margherita"}])
+
+    assert await cache.get("pizzas") == [{"id": 1, "name": "Margherita"}]
+    await cache.delete("pizzas")
+    assert await cache.get("pizzas") is None
+
+
+@pytest.mark.parametrize("serializer", list(_serializers()), ids=lambda serializer: serializer.name)
+async def test_values_survive_each_serializer(backend, serializer):
+    cache = Cache("menu", backend, serializer=serializer)
+    value = {"id": 7, "price": 12.5, "toppings": [1, 2], "name": "Veggie"}
+    await cache.set("pizza", value)
+    await cache.set("body", b'{"raw":true}')
+
+    assert await cache.get("pizza") == value
+    assert await cache.get("body") == b'{"raw":true}'
+
+
+async def test_entries_expire_after_their_ttl(backend):
+    cache = Cache("menu", backend, ttl=0.05)
+    await cache.set("pizzas", [1, 2])
+    assert await cache.get("pizzas") == [1, 2]
+
+    await asyncio.sleep(0.1)
+    assert await cache.get("pizzas") is None
+
+
+async def test_add_only_sets_absent_keys(backend):
+    assert await backend.add("key", b"first", None)
+    assert not await backend.add("key", b"second", None)
+    assert bytes(await backend.get("key")) == b"first"
+
+
+async def test_clear_removes_every_entry(backend):
+    await backend.set("a", b"1", None)
+    await backend.set("b", b"2", None)
+    await backend.clear()
+
+    assert await backend.get("a") is None and await backend.get("b") is None
+
+
+async def test_redis_clear_keeps_other_prefixes():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis()
+    ours, theirs = RedisBackend(client=client, prefix="ours:"), RedisBackend(client=client, prefix="theirs:")
+    await ours.set("key", b"1", None)
+    await theirs.set("key", b"2", None)
+    await ours.clear()
+
+    assert await ours.get("key") is None
+    assert await theirs.get("key") == b"2"
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class NoClear(CacheBackend):
+        async def get(self, key):
+            return None
+
+        async def set(self, key, value, ttl):
+            pass
+
+        async def add(self, key, value, ttl):
+            return True
+
+        async def delete(self, key):
+            pass
+
+    with pytest.raises(TypeError, match="clear"):
+        NoClear()
+
+
+def test_incomplete_serializer_fails_at_instantiation():
+    class DumpsOnly(Serializer):
+        def dumps(self, value):
+            return b""
+
+    with pytest.raises(TypeError, match="loads"):
+        DumpsOnly()
+
+
+def test_memory_backend_evicts_least_recently_used():
+    async def fill():
+        backend = MemoryBackend(max_entries=2)
+        await backend.set("a", 1, None)
+        await backend.set("b", 2, None)
+        await backend.get("a")
+        await backend.set("c", 3, None)
+        return [await backend.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(fill()) == [1, None, 3]
+
+
+async def test_concurrent_misses_compute_once(backend):
+    cache = Cache("menu", backend)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"pizzas": 3}
+
+    results = await asyncio.gather(*(cache.get_or_compute("pizzas", compute) for _ in range(10)))
+    assert results == [{"pizzas": 3}] * 10
+    assert calls == 1
+
+    assert await cache.get_or_compute("pizzas", compute) == {"pizzas": 3}
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 9, 1)
+    assert stats["hit_ratio"] == round(10 / 11, 4)
+
+
+async def test_backend_failures_are_misses():
+    class Broken(MemoryBackend):
+        async def get(self, key):
+            raise ConnectionError("cache down")
+
+    cache = Cache("menu", Broken())
+
+    async def compute():
+        return [1]
+
+    assert await cache.get_or_compute("pizzas", compute) == [1]
+    assert cache.stats()["errors"] == 1
@@ -0,0 +1,46 @@
+import pytest
+
+from pizza_app.database import SessionLocal
+from pizza_app.models.pizza_models import Crust, Pizza, Sauce
+from pizza_app.services.catalog_events import ReferencedByPizzas
+
+
+def test_deleting_a_used_sauce_or_crust_is_a_conflict(client):
+    pizza = client.get("/pizza/get_designer_pizzas").json()[0]
+
+    assert client.delete(f"/pizza/delete_sauce/{pizza['sauce']['id']}").status_code == 409
+    assert client.delete(f"/pizza/delete_crust/{pizza['crust']['id']}").status_code == 409
+    assert client.get("/pizza/get_designer_pizzas").status_code == 200
+
+
+@pytest.mark.parametrize("parent", ["sauce", "crust"])
+def test_orm_delete_of_a_used_sauce_or_crust_is_refused(client, parent):
+    with SessionLocal() as db:
+        pizza = db.get(Pizza, 1)
+        parent_id = getattr(pizza, f"{parent}_id")
+        with pytest.raises(ReferencedByPizzas):
+            db.delete(getattr(pizza, parent))
+            db.commit()
+        db.rollback()
+
+    assert client.get("/pizza/get_designer_pizzas").status_code == 200
+    assert client.get("/pizza/search", params={"q": "pepperoni"}).status_code == 200
+    assert client.get("/pizza/get_designer_pizza/1").json()[parent]["id"] == parent_id
+
+
+def test_unused_sauce_and_crust_can_be_deleted_with_their_pizza(client):
+    with SessionLocal() as db:
+        sauce, crust = Sauce(name="Pesto", price=2.0), Crust(name="Cracker", price=1.0)
+        pizza = Pizza(name="Pesto Special", is_available=True, sauce=sauce, crust=crust)
+        db.add(pizza)
+        db.commit()
+        pizza_id = pizza.id
+
+        db.delete(pizza)
+        db.delete(sauce)
+        db.delete(crust)
+        db.commit()
+
+    pizzas = client.get("/pizza/get_designer_pizzas")
+    assert pizzas.status_code == 200
+    assert pizza_id not in [pizza["id"] for pizza in pizzas.json()]
@@ -0,0 +1,33 @@
+from sqlalchemy import func, select
+
+from pizza_app.database import engine
+from pizza_app.models.pizza_models import CatalogChangeLog, Pizza
+
+
+def test_seeded_rows_are_versioned(seeded_db):
+    with engine.connect() as connection:
+        assert connection.execute(select(func.min(Pizza.version))).scalar_one() > 0
+        assert connection.execute(select(func.count()).select_from(CatalogChangeLog)).scalar_one() > 0
+
+
+def test_sync_from_zero_returns_the_seeded_catalog(client):
+    sync = client.get("/pizza/sync", params={"since": 0}).json()
+
+    assert sync["version"] > 1
+    assert not sync["reset"]
+    assert len(sync["sizes"]) == 4
+    assert len(sync["sauces"]) == 3
+    assert len(sync["crusts"]) == 5
+    assert len(sync["topping_categories"]) == 2
+    assert len(sync["toppings"]) == 19
+    designer = client.get("/pizza/get_designer_pizzas").json()
+    assert sorted(pizza["id"] for pizza in sync["pizzas"]) == sorted(pizza["id"] for pizza in designer)
+    assert len(sync["pizzas"]) == 3
+
+
+def test_sync_from_current_version_is_empty(client):
+    version = client.get("/pizza/sync", params={"since": 0}).json()["version"]
+    sync = client.get("/pizza/sync", params={"since": version}).json()
+
+    assert sync["version"] == version
+    assert sync["pizzas"] == [] and sync["toppings"] == [] and sync["deleted"] == []
@@ -0,0 +1,42 @@
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pizza_app.middleware.coherence import CoherenceMiddleware
+from pizza_app.services.coherence import CoherenceProbe
+
+
+class RecordingProbe(CoherenceProbe):
+    def __init__(self, interval: float):
+        super().__init__(":memory:", interval)
+        self.checked_on = []
+
+    def check(self) -> None:
+        self.checked_on.append(threading.get_ident())
+
+
+def test_probe_runs_once_per_interval():
+    probe = CoherenceProbe(":memory:", interval=60)
+
+    assert probe.due()
+    assert not probe.due()
+
+
+def test_request_probe_runs_off_the_event_loop():
+    probe = RecordingProbe(interval=0)
+    app = FastAPI()
+    loop_threads = []
+
+    @app.get("/ping")
+    async def ping():
+        loop_threads.append(threading.get_ident())
+        return {}
+
+    app.add_middleware(CoherenceMiddleware, probe=probe)
+    with TestClient(app) as client:
+        client.get("/ping")
+        client.get("/ping")
+
+    assert len(probe.checked_on) == 2
+    assert not set(probe.checked_on) & set(loop_threads)
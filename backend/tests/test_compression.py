@@ -0,0 +1,56 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
+from fastapi.testclient import TestClient
+
+from pizza_app.middleware.compression import CompressionMiddleware
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+
+    @app.get("/large")
+    def large():
+        return JSONResponse([{"id": i, "name": "Margherita"} for i in range(100)])
+
+    @app.get("/small")
+    def small():
+        return JSONResponse({"id": 1})
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" * 500, media_type="image/png")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=500, content_types=("application/json",))
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_compressed_response_varies_on_accept_encoding(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_response_below_minimum_size_still_varies(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_client_without_compression_still_gets_vary(client):
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert len(response.json()) == 100
+
+
+def test_other_media_types_are_left_alone(client):
+    response = client.get("/image", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
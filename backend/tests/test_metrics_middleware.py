@@ -0,0 +1,56 @@
+import asyncio
+import logging
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from pizza_app.middleware.metrics import MetricsMiddleware
+from pizza_app.services.metrics import MetricsRegistry
+
+
+def _app(registry: MetricsRegistry) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/events")
+    async def events():
+        async def stream():
+            yield b"data: hello\n\n"
+            # The client keeps listening well past the slow-request threshold
+            await asyncio.sleep(0.3)
+            yield b"data: bye\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.3)
+        return {"ok": True}
+
+    app.add_middleware(MetricsMiddleware, registry=registry, slow_request_ms=200)
+    return app
+
+
+def _duration_sum(registry: MetricsRegistry, route: str) -> float:
+    prefix = f'pizza_request_duration_seconds_sum{{method="GET",route="{route}",status="200"}} '
+    line = next(line for line in registry.render().splitlines() if line.startswith(prefix))
+    return float(line[len(prefix):])
+
+
+def test_event_streams_are_timed_to_the_first_byte(caplog):
+    registry = MetricsRegistry()
+    with caplog.at_level(logging.WARNING, logger="pizza_app.middleware.metrics"):
+        with TestClient(_app(registry)) as client:
+            assert client.get("/events").text == "data: hello\n\ndata: bye\n\n"
+
+    assert _duration_sum(registry, "/events") < 0.2
+    assert "Slow request" not in caplog.text
+
+
+def test_other_responses_are_timed_to_the_end(caplog):
+    registry = MetricsRegistry()
+    with caplog.at_level(logging.WARNING, logger="pizza_app.middleware.metrics"):
+        with TestClient(_app(registry)) as client:
+            client.get("/slow")
+
+    assert _duration_sum(registry, "/slow") >= 0.3
+    assert "Slow request: GET /slow" in caplog.text
@@ -0,0 +1,56 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pizza_app.database import engine
+from pizza_app.models.order_models import KitchenEvent
+from pizza_app.router import kitchen_route, order_route
+from pizza_app.services import kitchen
+from pizza_app.services.order_intake import order_intake
+
+
+@pytest.fixture(scope="module")
+def orders_client(seeded_db):
+    @asynccontextmanager
+    async def lifespan(app):
+        with engine.connect() as connection:
+            kitchen.start(connection, asyncio.get_running_loop())
+        await order_intake.start()
+        yield
+        await order_intake.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(order_route.router)
+    app.include_router(kitchen_route.router)
+    with TestClient(app) as client:
+        yield client
+
+
+def test_created_at_serializes_the_same_everywhere(orders_client):
+    created = orders_client.post("/orders/", json={"items": [{"pizza_id": 1, "size_id": 1}]})
+    assert created.status_code == 201
+    order = created.json()
+    assert order["created_at"].endswith("Z")
+
+    updated = orders_client.patch(f"/orders/{order['id']}/status", json={"status": "baking"}).json()
+    listed = next(o for o in orders_client.get("/orders/").json() if o["id"] == order["id"])
+    fetched = orders_client.get(f"/orders/{order['id']}").json()
+    queued = next(o for o in orders_client.get("/kitchen/queue").json()["orders"] if o["id"] == order["id"])
+
+    assert {updated["created_at"], listed["created_at"], fetched["created_at"], queued["created_at"]} == {
+        order["created_at"]
+    }
+
+    with engine.connect() as connection:
+        payloads = [
+            json.loads(row.payload)
+            for row in connection.execute(
+                KitchenEvent.__table__.select().where(KitchenEvent.order_id == order["id"])
+            )
+        ]
+    assert len(payloads) == 2
+    assert {payload["created_at"] for payload in payloads} == {order["created_at"]}
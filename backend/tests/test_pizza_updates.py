@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.mark.parametrize("field", ["sauce_id", "crust_id", "size_ids", "topping_ids"])
+def test_patch_rejects_null_references(client, field):
+    before = client.get("/pizza/get_designer_pizza/1").json()
+
+    response = client.patch("/pizza/update_pizza/1", json={"name": "Renamed", field: None})
+
+    assert response.status_code == 422
+    assert client.get("/pizza/get_designer_pizza/1").json() == before
+    assert client.get("/pizza/get_designer_pizzas").status_code == 200
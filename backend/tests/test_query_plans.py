@@ -0,0 +1,58 @@
+"""
+The indexes from migration 0002 (query_indexes) stay in use: EXPLAIN QUERY PLAN for
+each lookup they were added for must search an index, not scan the table.
+"""
+import pytest
+from sqlalchemy import func, select
+
+from pizza_app.database import engine
+from pizza_app.models.pizza_models import (
+    Pizza, Topping, ToppingCategory, pizza_sizes, pizza_toppings, topping_categories,
+)
+
+
+def _plan(statement) -> str:
+    sql = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    with engine.connect() as connection:
+        return "\n".join(row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+@pytest.mark.parametrize("statement, expected", [
+    # Pizzas with a given topping / in a given size, toppings in a category
+    (select(pizza_toppings.c.pizza_id).where(pizza_toppings.c.topping_id == 1),
+     "SEARCH pizza_toppings USING COVERING INDEX ix_pizza_toppings_topping_id (topping_id=?)"),
+    (select(pizza_sizes.c.pizza_id).where(pizza_sizes.c.size_id == 1),
+     "SEARCH pizza_sizes USING COVERING INDEX ix_pizza_sizes_size_id (size_id=?)"),
+    (select(topping_categories.c.topping_id).where(topping_categories.c.category_id == 1),
+     "SEARCH topping_categories_link USING COVERING INDEX ix_topping_categories_link_category_id (category_id=?)"),
+    # Pizzas still using a sauce or crust (the delete checks)
+    (select(func.count()).select_from(Pizza).where(Pizza.sauce_id == 1),
+     "SEARCH pizzas USING COVERING INDEX ix_pizzas_sauce_id (sauce_id=?)"),
+    (select(func.count()).select_from(Pizza).where(Pizza.crust_id == 1),
+     "SEARCH pizzas USING COVERING INDEX ix_pizzas_crust_id (crust_id=?)"),
+    (select(Pizza.id).where(Pizza.is_available.is_(True)),
+     "SEARCH pizzas USING COVERING INDEX ix_pizzas_is_available (is_available=?)"),
+    # Toppings in name order, categories by name
+    (select(Topping.id, Topping.name, Topping.price).order_by(Topping.name),
+     "SCAN toppings USING INDEX ix_toppings_name"),
+    (select(ToppingCategory.id).where(ToppingCategory.name == "Meat"),
+     "SEARCH topping_categories USING COVERING INDEX ix_topping_categories_name (name=?)"),
+    # Delta sync: rows changed after a version
+    (select(Pizza.id).where(Pizza.version > 1),
+     "SEARCH pizzas USING COVERING INDEX ix_pizzas_version (version>?)"),
+])
+def test_lookup_uses_its_index(seeded_db, statement, expected):
+    assert expected in _plan(statement)
+
+
+def test_min_category_name_subquery_searches_the_link_table(seeded_db):
+    min_category_name = (
+        select(func.min(ToppingCategory.name))
+        .join(topping_categories, topping_categories.c.category_id == ToppingCategory.id)
+        .where(topping_categories.c.topping_id == Topping.id)
+        .scalar_subquery()
+    )
+    plan = _plan(select(Topping.id, min_category_name.label("category")))
+
+    assert "SCAN topping_categories_link" not in plan
+    assert "SEARCH topping_categories_link USING COVERING INDEX" in plan
@@ -0,0 +1,43 @@
+"""
+Worker cold start stays within budget: each check starts a fresh interpreter,
+as a newly scaled or restarted worker would.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pizza_app.bench.startup import measure
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+# Median time from the first import to a started app (about 0.8 s on a
+# developer machine), with room for slower CI hosts
+READY_BUDGET_MS = 3000
+
+# Only imported once chat is first used
+CHAT_MODULES = ("agents", "openai")
+
+
+@pytest.fixture
+def backend_cwd(monkeypatch):
+    # main.py serves ../frontend/dist relative to the working directory
+    monkeypatch.chdir(BACKEND_DIR)
+
+
+def test_importing_the_app_skips_the_chat_stack(seeded_db, backend_cwd):
+    probe = (
+        "import json, sys\n"
+        "import pizza_app.main\n"
+        f"print(json.dumps([name for name in {CHAT_MODULES!r} if name in sys.modules]))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+def test_worker_is_ready_within_budget(seeded_db, backend_cwd):
+    result = measure(runs=3)
+
+    assert result["ready_ms"] <= READY_BUDGET_MS, result
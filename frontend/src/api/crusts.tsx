@@ -16,6 +16,11 @@ export const getCrust = async (id: number) => {
   return await apiFetch<Crust>(`/pizza/get_pizza_crust/${id}`);
 };
 
+// Several crusts in one request, in the order given (null for IDs not found)
+export const getCrustsByIds = async (ids: number[]) => {
+  return await apiFetch<Array<Crust | null>>(`/pizza/crusts?ids=${ids.join(",")}`);
+};
+
 export const addCrust = async (crust: Crust) => {
     return await apiFetch<Crust>(`/pizza/add_crust`, {
         method: "POST",
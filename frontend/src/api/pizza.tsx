@@ -5,6 +5,7 @@ import type { Size } from "./sizes";
 import type { Sauce } from "./sauces";
 import type { Crust } from "./crusts";
 import type { Topping } from "./toppings";
+import type { ToppingCategory } from "./topping_categories";
 
 import { Modal } from "bootstrap";
 import "bootstrap/dist/css/bootstrap.min.css";
@@ -48,14 +49,109 @@ export type PizzaUpdatePayload = {
     topping_ids?: number[];
 };
 
+// Normalized menu graph (matches backend MenuGraph schema): shared sizes, sauces,
+// crusts, toppings and categories are sent once, keyed by ID, and pizzas reference them by ID.
+export type ToppingNode = {
+    id: number;
+    name: string;
+    price: number;
+    category_ids: number[];
+};
+
+export type PizzaNode = {
+    id: number;
+    name: string;
+    description: string;
+    image_url: string;
+    is_available: boolean;
+    size_ids: number[];
+    sauce_id: number;
+    crust_id: number;
+    topping_ids: number[];
+};
+
+export type MenuGraph = {
+    sizes: Record<number, Size>;
+    sauces: Record<number, Sauce>;
+    crusts: Record<number, Crust>;
+    toppings: Record<number, ToppingNode>;
+    topping_categories: Record<number, ToppingCategory>;
+    pizzas: PizzaNode[];
+};
+
+// Rebuild full Pizza objects from a menu graph. Shared entities are reused by
+// reference, so memory scales with the number of unique entities.
+export const denormalizeMenuGraph = (graph: MenuGraph): Pizza[] => {
+    const toppings: Record<number, Topping> = {};
+    for (const node of Object.values(graph.toppings)) {
+        toppings[node.id] = {
+            id: node.id,
+            name: node.name,
+            price: node.price,
+            categories: node.category_ids.map(id => graph.topping_categories[id]),
+        };
+    }
+
+    return graph.pizzas.map(p => ({
+        id: p.id,
+        name: p.name,
+        description: p.description,
+        image_url: p.image_url,
+        is_available: p.is_available,
+        sizes: p.size_ids.map(id => graph.sizes[id]),
+        sauce: graph.sauces[p.sauce_id],
+        crust: graph.crusts[p.crust_id],
+        toppings: p.topping_ids.map(id => toppings[id]),
+    }));
+};
+
+export const getPizzasGraph = async () => {
+    return await apiFetch<MenuGraph>("/pizza/get_designer_pizzas_graph");
+};
+
 export const getPizzas = async () => {
-    return await apiFetch<Pizza[]>("/pizza/get_designer_pizzas");
+    return denormalizeMenuGraph(await getPizzasGraph());
 };
 
 export const getPizza = async (pizza_id: number) => {
     return await apiFetch<Pizza>(`/pizza/get_pizza/${pizza_id}`);
 };
 
+// Several pizzas in one request, in the order given (null for IDs not found)
+export const getPizzasByIds = async (pizza_ids: number[]) => {
+    return await apiFetch<Array<Pizza | null>>(`/pizza/pizzas?ids=${pizza_ids.join(",")}`);
+};
+
+// Lookups of several kinds of entity by ID (matches backend CatalogBatch schema)
+export type CatalogBatchRequest = {
+    sizes?: number[];
+    sauces?: number[];
+    crusts?: number[];
+    toppings?: number[];
+    topping_categories?: number[];
+    pizzas?: number[];
+};
+
+export type CatalogBatch = {
+    sizes: Array<Size | null>;
+    sauces: Array<Sauce | null>;
+    crusts: Array<Crust | null>;
+    toppings: Array<Topping | null>;
+    topping_categories: Array<ToppingCategory | null>;
+    pizzas: Array<Pizza | null>;
+};
+
+// One request for all of them; each list comes back in the order given
+export const getCatalogBatch = async (request: CatalogBatchRequest) => {
+    const params = new URLSearchParams();
+    for (const [kind, ids] of Object.entries(request)) {
+        if (ids && ids.length > 0) {
+            params.set(kind, ids.join(","));
+        }
+    }
+    return await apiFetch<CatalogBatch>(`/pizza/batch?${params.toString()}`);
+};
+
 export const addPizza = async (pizza: PizzaCreatePayload) => {
     return await apiFetch<Pizza>(`/pizza/add_pizza`, {
         method: "POST",
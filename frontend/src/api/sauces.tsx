@@ -15,6 +15,11 @@ export const getSauce = async (sauce_id: number) => {
     return await apiFetch<Sauce>(`/pizza/get_pizza_sauce/${sauce_id}`);
 };
 
+// Several sauces in one request, in the order given (null for IDs not found)
+export const getSaucesByIds = async (sauce_ids: number[]) => {
+    return await apiFetch<Array<Sauce | null>>(`/pizza/sauces?ids=${sauce_ids.join(",")}`);
+};
+
 export const addSauce = async (sauce: Sauce) => {
     return await apiFetch<Sauce>(`/pizza/add_sauce`, {
         method: "POST",
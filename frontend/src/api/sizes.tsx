@@ -16,6 +16,11 @@ export const getSize = async (size_id: number) => {
     return await apiFetch<Size>(`/pizza/get_pizza_size/${size_id}`);
 };
 
+// Several sizes in one request, in the order given (null for IDs not found)
+export const getSizesByIds = async (size_ids: number[]) => {
+    return await apiFetch<Array<Size | null>>(`/pizza/sizes?ids=${size_ids.join(",")}`);
+};
+
 export const addSize = async (size: Size) => {
     return await apiFetch<Size>(`/pizza/add_size`, {
         method: "POST",
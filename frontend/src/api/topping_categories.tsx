@@ -15,6 +15,11 @@ export const getToppingCategory = async(category_id: number) => {
     return await apiFetch<ToppingCategory>(`/pizza/get_pizza_topping_category/${category_id}`);
 }
 
+// Several topping categories in one request, in the order given (null for IDs not found)
+export const getToppingCategoriesByIds = async(category_ids: number[]) => {
+    return await apiFetch<Array<ToppingCategory | null>>(`/pizza/topping_categories?ids=${category_ids.join(",")}`);
+}
+
 export const addToppingCategory = async(toppingCategory: ToppingCategory) => {
     return await apiFetch<ToppingCategory>(`/pizza/add_pizza_topping_category`, {
         method: "POST",
@@ -30,6 +30,11 @@ export const getTopping = async (topping_id: number) => {
     return await apiFetch<Topping>(`/pizza/get_pizza_topping/${topping_id}`);
 };
 
+// Several toppings in one request, in the order given (null for IDs not found)
+export const getToppingsByIds = async (topping_ids: number[]) => {
+    return await apiFetch<Array<Topping | null>>(`/pizza/toppings?ids=${topping_ids.join(",")}`);
+};
+
 export const addTopping = async (topping: ToppingCreatePayload) => {
     // Backend route is /pizza/add_topping
     return await apiFetch<Topping>(`/pizza/add_topping`, {